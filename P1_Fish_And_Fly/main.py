@@ -2,14 +2,18 @@
 
 import cv2
 import time
+from collections import deque
 
 from src.common.logging import logger
 from src.common.config.configuration import ConfigurationManager
 from src.common.projection.world_projection import WorldProjector
 from src.common.visualization.visualizer import Visualizer
+from src.common.profiling.latency import LatencyMonitor
 
 from src.fish.stage1_vision.io.factory import build_vision_input
+from src.fish.stage1_vision.io.prefetcher import LOSSLESS
 from src.fish.stage1_vision.pipeline import VisionPipeline
+from src.fish.stage1_vision.snapshot import MissionSnapshotter
 
 from src.fish.stage2_decision.pipeline import DecisionPipeline
 
@@ -41,7 +45,8 @@ def main():
         # Instantiating the pipelines
         vision_pipeline_obj = VisionPipeline(vision_cfg = vision_config)
 
-        decision_pipeline_obj = DecisionPipeline(decision_cfg = decision_config)
+        world_projector_obj = WorldProjector()
+        decision_pipeline_obj = DecisionPipeline(decision_cfg = decision_config, projector = world_projector_obj.projector)   # travel cost: same world frame as Action
 
         mission_planner_obj = FishMissionPlanner(
             mission_cfg = mission_config,
@@ -51,42 +56,83 @@ def main():
             dump_location_cfg = dump_location_config
         )
 
-        world_projector_obj = WorldProjector()
         visualization_obj = Visualizer()
         result_logger = OutcomeLogger()
+        latency_monitor = LatencyMonitor()
+
+        # Mission resume (opt-in): aggregation memory + locked target of the interrupted mission, if any.
+        # Only history and counters survive: new tracks get new ids, so a restored record never matches the same debris again.
+        snapshot_config = vision_config.aggregation.get("snapshot")
+        snapshotter = MissionSnapshotter(snapshot_config) if snapshot_config and snapshot_config.enabled else None
+        if snapshotter:
+            if snapshotter.restore(vision_pipeline_obj, decision_pipeline_obj.selector):
+                # The locked targets of the interrupted mission are released (UNATTEMPTED), the next frames select new ones.
+                for release_command in decision_pipeline_obj.selector.release_restored_targets():
+                    vision_pipeline_obj.aggregator.apply_lifecycle_changes(release_command)
+            snapshotter.start()
 
         
         # Getting the vision input
-        vision_input = build_vision_input(vision_config.io)
+        batch_size = vision_config.inference.get("batch_size") or 1
+        vision_input = build_vision_input(vision_config.io, class_names= vision_config.class_names, inference_size= vision_config.inference.imgsz, backlog_size= batch_size)
 
         # Start consuming the visual feed
         vision_input.start()
 
+        # Backlog batching only on a lossless feed: on a live feed (LATEST_FRAME_WINS) it would add up to `batch_size` frames of latency.
+        if batch_size > 1 and vision_input.policy != LOSSLESS:
+            logger.info(f"inference.batch_size = {batch_size} ignored: the feed is not lossless (policy: {vision_input.policy})")
+            batch_size = 1
+
         # ---------------------------------------------------------------------------------------------------------------------------------
 
+        # Lossless feed (recorded video): YOLO runs on a backlog of `batch_size` frames per forward pass.
+        backlog = deque()
+
         mission_start_time = time.time()
 
         while mission_planner_obj.mission_is_active():
 
-            # Reading the frame of visual feed
-            frame = vision_input.read()                             
-            if frame is None:
+            # Reading the frame packet (frame + capture timestamp + sequence number) of visual feed
+            if batch_size > 1:
+                if not backlog:
+                    backlog.extend(vision_input.read_many(batch_size))
+                    vision_pipeline_obj.detect_backlog(list(backlog))
+                packet = backlog.popleft() if backlog else None
+            else:
+                packet = vision_input.read()                             
+
+            if packet is None:
                 logger.info("No frame is captured.")
                 break
             
-            logger.info(f"Original frame shape: {frame.shape}")
-        
-            # PERCEPTION | VISION: Getting aggregated tracked objects(from Vision Aggregator)
-            active_tracked_agg_objects = vision_pipeline_obj.run(frame)
+            # Pre-scaled display view of the frame, when prepared at capture time.
+            display_frame = packet.frame
+            if packet.scaled is not None and packet.scaled.display_image is not None:
+                display_frame = packet.scaled.display_image
 
-            # REASONING | DECISION: Getting 1 action intent (Decision -> Action module) and select command (Decision -> Vision module) 
-            action_intent, select_command = decision_pipeline_obj.run(active_tracked_agg_objects)
+            logger.info(f"Original frame shape: {packet.frame.shape}, source: {packet.source_id}, sequence: {packet.sequence}")
+
+            # PERCEPTION | VISION: Getting aggregated tracked objects(from Vision Aggregator)
+            active_tracked_agg_objects = vision_pipeline_obj.run(packet)
+            latency_monitor.mark("vision", packet.received_time)
+
+            # REASONING | DECISION: Getting the action intents (Decision -> Action module) and select commands (Decision -> Vision module):
+            # 1 locked target, or a locked batch in pickup order in sequencing mode (the 1st intent is the locked target).
+            if decision_pipeline_obj.planner.sequencing:
+                action_plan, select_commands = decision_pipeline_obj.run_sequence(active_tracked_agg_objects, heading_offset = mission_planner_obj.navigator.heading_offset())
+            else:
+                action_intent, select_command = decision_pipeline_obj.run(active_tracked_agg_objects, heading_offset = mission_planner_obj.navigator.heading_offset())
+                action_plan = [action_intent] if action_intent else []
+                select_commands = [select_command] if select_command else []
+            action_intent = action_plan[0] if action_plan else None
+            latency_monitor.mark("decision", packet.received_time)
 
             # PROJECTOR: Coverts active_objects(image frame) -> world objects(world frame)
             world_objects, selected_world_object = world_projector_obj.transform_to_world_frame(active_objects= active_tracked_agg_objects, action_intent= action_intent)
 
             # VISUALIZATION: Create the labelled view for the tracked detections. 
-            visualization_obj.visualize_objects(frame = frame, active_objects= active_tracked_agg_objects, selected_world_obj= selected_world_object)
+            visualization_obj.visualize_objects(frame = display_frame, active_objects= active_tracked_agg_objects, selected_world_obj= selected_world_object)
             
             if cv2.waitKey(1) & 0xFF == ord('q'):                       # Exit when 'q' is pressed
                 break 
@@ -104,8 +150,8 @@ def main():
                 logger.info("No action intent is generated from Decision Module")
                 navigation_only = True
 
-            # If an object is not selected.
-            if select_command is None:
+            # If an object is not selected (a batch locked in an earlier frame is still a target).
+            if not select_commands and not action_plan:
                 logger.info("No select command is generated")
                 navigation_only = True
 
@@ -114,13 +160,17 @@ def main():
                 logger.info(f"No world object is created for the action intent")
                 navigation_only = True
 
-            # Emitting select command(from Decision -> Vision Aggregator) to update the object's current status as SELECTED.
-            if select_command:
+            # Emitting select commands(from Decision -> Vision Aggregator) to update the objects' current status as SELECTED.
+            for select_command in select_commands:
                 select_status_updated = vision_pipeline_obj.aggregator.apply_lifecycle_changes(select_command)
                 if not select_status_updated:
                     logger.info("The object's status is not updated to SELECTED")
                     navigation_only = True               
 
+            # Periodic snapshot of the mission state (copied here, written by a background thread).
+            if snapshotter:
+                snapshotter.capture(vision_pipeline_obj, decision_pipeline_obj.selector, packet.timestamp)
+
             # Checking if taking action is allowed or not.
             if not mission_planner_obj.action_is_allowed():
                 logger.info("Action is not allowed, so Action module is not triggered")
@@ -130,35 +180,51 @@ def main():
             if navigation_only:
                 logger.info(f"Fish machine will only perform Navigation in this iteration")
 
-            # ACTION: Execute the action intent(from Decision -> Action) to collect the target garbage, following the mission planner.
-            action_feedback = mission_planner_obj.tick(action_intent, selected_world_object)       
+            # ACTION: Execute the action intents(from Decision -> Action) to collect the target garbage, following the mission planner.
+            # The near targets of a locked batch are collected in 1 navigation pause (1 feedback each, in pickup order).
+            targets = [(action_intent, selected_world_object)] + [(intent, world_objects.get(intent.track_id)) for intent in action_plan[1:]]
+            action_feedbacks = mission_planner_obj.tick_plan(targets)
+            latency_monitor.mark("action", packet.received_time)
             if action_intent is None:
                 logger.info("No action intent is present")
                 continue
 
-            # Release the locked target and generate the feedback command.
-            feedback_command = decision_pipeline_obj.selector.handle_action_feedback(action_feedback)
-            if feedback_command is None:
-                logger.info("No feedback command is generted from Decision module, maybe track_id mismatch.")
-                continue
-
-            # Emitting action feedback command(from Decision -> Vision Aggregator) to update the object's final status as DONE/LOST.
-            final_status_updated = vision_pipeline_obj.aggregator.apply_lifecycle_changes(feedback_command)
-            if not final_status_updated:
-                logger.info("The object's final status is not updated to DONE/LOST")
-                continue   
-
-            # Logging the final action results for the target in a .csv file.
-            result_logger.log_action_results(action_intent, action_feedback)   
+            action_intents = {intent.track_id: intent for intent in action_plan}
+            for action_feedback in action_feedbacks:
+                # Release the locked target and generate the feedback command.
+                feedback_command = decision_pipeline_obj.selector.handle_action_feedback(action_feedback)
+                if feedback_command is None:
+                    logger.info("No feedback command is generted from Decision module, maybe track_id mismatch.")
+                    continue
+
+                # Emitting action feedback command(from Decision -> Vision Aggregator) to update the object's final status as DONE/LOST.
+                final_status_updated = vision_pipeline_obj.aggregator.apply_lifecycle_changes(feedback_command)
+                if not final_status_updated:
+                    logger.info("The object's final status is not updated to DONE/LOST")
+                    continue   
+
+                # An attempted target is never selected again, even after a restart.
+                if snapshotter:
+                    snapshotter.capture(vision_pipeline_obj, decision_pipeline_obj.selector, packet.timestamp, force = True)
+
+                # Logging the final action results for the target in a .csv file.
+                result_logger.log_action_results(action_intents[action_feedback.track_id], action_feedback)   
                    
 
         mission_end_time = time.time()
 
-        # Final mission status.
+        # Final mission status. The snapshot of an aborted mission is kept to resume it, the one of a completed mission is removed.
         if mission_planner_obj.phase == MissionPhase.DONE:
             logger.info(f"Mission is completed successfully, final phase: {mission_planner_obj.phase}")
+            if snapshotter:
+                snapshotter.clear()
         else:
             logger.info(f"Mission is aborted and failed, final phase: {mission_planner_obj.phase}")
+            if snapshotter:
+                snapshotter.capture(vision_pipeline_obj, decision_pipeline_obj.selector, force = True)
+
+        if snapshotter:
+            snapshotter.close()
 
 
         # Calculating time taken in the entire mission.
@@ -166,10 +232,15 @@ def main():
         logger.info(f"MISSION STARTING TIME: {mission_start_time}, MISSION ENDING TIME: {mission_end_time}")
         logger.info(f"Total time taken in this mission is: {mission_time}")
 
+        # Capture -> stage latencies, frames skipped between the source and the vision pipeline.
+        latency_monitor.log_summary()
+        logger.info(f"Frames skipped before the vision pipeline: {vision_pipeline_obj.skipped_frames}")
+
         # ---------------------------------------------------------------------------------------------------------------------------------
 
         # Stop consuming the visual feed
         vision_input.stop()
+        vision_pipeline_obj.close()
         cv2.destroyAllWindows()
 
         logger.info("********************************************FISH MODULE SYSTEM: ENDS**********************************************")
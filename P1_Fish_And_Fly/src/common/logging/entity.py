@@ -7,7 +7,7 @@ class GarbageLogEntry:
     class_name: str
     first_seen_frame: int
     last_seen_frame: int
-    final_state: str                                # collected / lost / ignored / failed
+    final_state: str                                # collected / lost / ignored / failed / evicted
     lifecycle_state: str                            # NEW / STABLE / SELECTED / DONE / LOST     
     age: int
     avg_confidence: float
@@ -1,6 +1,7 @@
 import os
 import csv
 from datetime import datetime, timezone
+from typing import List
 
 from src.common.logging import logger
 from src.common.logging.entity import GarbageLogEntry
@@ -55,21 +56,7 @@ class GarbageCSVLogger:
         try:
             with open(self.file_path, mode= "a", newline= "") as f:
                 writer = csv.writer(f)
-                writer.writerow([
-                    datetime.now(timezone.utc).isoformat(),
-                    new_entry.track_id,
-                    new_entry.class_name,
-                    new_entry.final_state,
-                    new_entry.lifecycle_state,
-                    new_entry.priority_score,
-                    new_entry.first_seen_frame,
-                    new_entry.selected_at,
-                    new_entry.completed_at,
-                    new_entry.age,
-                    new_entry.avg_confidence,
-                    new_entry.failure_reason,
-                    new_entry.ignore_rason
-                ])
+                writer.writerow(self._to_row(new_entry))
 
             logger.info(f"GarbageCSVLogger -> log(), Recorded successfully: {new_entry.track_id}")   
 
@@ -77,3 +64,45 @@ class GarbageCSVLogger:
         except Exception as e:
             logger.info(f"GarbageCSVLogger -> log(), Error occurred for new entry: {new_entry}, received error: {e}")
             raise e
+
+
+    def log_many(self, new_entries: List[GarbageLogEntry]):
+        """
+        Logs several items into the csv file, with 1 file open.
+        
+        :param self: Belong to the GarbageCSVLogger class.
+        :param new_entries: Entries to log.
+        :type new_entries: List[GarbageLogEntry]
+        """
+        if not new_entries:
+            return
+
+        try:
+            with open(self.file_path, mode= "a", newline= "") as f:
+                writer = csv.writer(f)
+                writer.writerows(self._to_row(new_entry) for new_entry in new_entries)
+
+            logger.info(f"GarbageCSVLogger -> log_many(), Recorded successfully: {len(new_entries)} entries")
+
+
+        except Exception as e:
+            logger.info(f"GarbageCSVLogger -> log_many(), Error occurred for {len(new_entries)} entries, received error: {e}")
+            raise e
+
+
+    def _to_row(self, new_entry: GarbageLogEntry) -> list:
+        return [
+            datetime.now(timezone.utc).isoformat(),
+            new_entry.track_id,
+            new_entry.class_name,
+            new_entry.final_state,
+            new_entry.lifecycle_state,
+            new_entry.priority_score,
+            new_entry.first_seen_frame,
+            new_entry.selected_at,
+            new_entry.completed_at,
+            new_entry.age,
+            new_entry.avg_confidence,
+            new_entry.failure_reason,
+            new_entry.ignore_rason
+        ]
@@ -0,0 +1,65 @@
+# Aim: Measure per-stage latency, relative to the time the frame entered the run (capture -> vision -> decision -> action).
+
+import time
+from typing import Dict
+
+from src.common.logging import logger
+
+
+
+class LatencyMonitor:
+    """
+    Keeps running latency statistics per stage, in milliseconds.
+    """
+    def __init__(self, smoothing: float = 0.1):
+        self.smoothing = smoothing                                  # EMA factor of the smoothed latency
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+
+    def mark(self, stage: str, capture_time: float) -> float:
+        """
+        Records the latency of a stage, measured from the time the frame entered the run until now.
+
+        :param self: Belongs to the LatencyMonitor class.
+        :param stage: Name of the stage which just finished.
+        :type stage: str
+        :param capture_time: `FramePacket.received_time`, `time.monotonic()` seconds: the capture time of a live frame, the read time of
+                             a replayed one (its timestamp follows the recorded clock, not this run's, and would give negative latencies).
+        :type capture_time: float
+        :return: Latency in milliseconds.
+        :rtype: float
+        """
+        latency_ms = (time.monotonic() - capture_time) * 1000.0
+
+        stage_stats = self.stats.get(stage)
+        if stage_stats is None:
+            self.stats[stage] = {"count": 1, "last_ms": latency_ms, "ema_ms": latency_ms, "max_ms": latency_ms, "total_ms": latency_ms}
+            return latency_ms
+
+        stage_stats["count"] += 1
+        stage_stats["last_ms"] = latency_ms
+        stage_stats["ema_ms"] += self.smoothing * (latency_ms - stage_stats["ema_ms"])
+        stage_stats["max_ms"] = max(stage_stats["max_ms"], latency_ms)
+        stage_stats["total_ms"] += latency_ms
+        return latency_ms
+
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Provides mean / smoothed / max latency of every stage.
+        """
+        summary = {
+            stage: {
+                "mean_ms": round(s["total_ms"] / s["count"], 3),
+                "ema_ms": round(s["ema_ms"], 3),
+                "max_ms": round(s["max_ms"], 3),
+                "count": int(s["count"])
+            }
+            for stage, s in self.stats.items()
+        }
+        return summary
+
+
+    def log_summary(self):
+        for stage, s in self.summary().items():
+            logger.info(f"LatencyMonitor -> [{stage}] capture->stage latency: mean = {s['mean_ms']} ms, ema = {s['ema_ms']} ms, max = {s['max_ms']} ms, frames = {s['count']}")
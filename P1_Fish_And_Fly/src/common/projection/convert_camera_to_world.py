@@ -1,6 +1,7 @@
 # Aim: Geometric conversion of image dimension (bbox coordinates) into world coordiantes (relative postiion w.r.t Fish machine)
 # This is PURELY CALCULATION and frame conversion.
 
+import numpy as np
 from typing import Tuple
 from src.common.logging import logger
 from src.common.projection.entity import WorldObject
@@ -80,5 +81,23 @@ class CameraToWorldProjector:
         except Exception as e:
             logger.info(f"Error occurred in CameraToWorldProjector -> project_image_to_world_frame(), error: {e}")
             raise e
+
+
+
+    def project_boxes(self, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Projects many bounding boxes at once (same operations as `project_image_to_world_frame()`, so the same values).
+
+        :param self: Belongs to the CameraToWorldProjector
+        :param boxes: Bounding boxes (N, 4) as (x1, y1, x2, y2) in ORIGINAL image space.
+        :type boxes: np.ndarray
+        :return: Lateral position 'x' (left < 0 < right) and distance proxy 'y' of every box, in the robot-centric world frame.
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        cx = (boxes[:, 0] + boxes[:, 2]) / 2.0
+        nx = (cx - self.img_w / 2) / (self.img_w / 2)
+        bbox_height = np.maximum(boxes[:, 3] - boxes[:, 1], 1)
+        return nx * self.lateral_scale, self.forward_scale / bbox_height
         
 
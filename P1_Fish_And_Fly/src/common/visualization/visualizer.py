@@ -33,9 +33,11 @@ class Visualizer:
         """
         logger.info("Visualizer -> visualize_objects(): STARTS")
 
-        # 1. Resize original frame to desired dimension
-        frame = cv2.resize(frame, (self.FRAME_WIDTH, self.FRAME_HEIGHT))
-        display_frame = frame.copy()
+        # 1. Resize original frame to desired dimension (skipped when the frame was already pre-scaled at capture time)
+        if frame.shape[1] == self.FRAME_WIDTH and frame.shape[0] == self.FRAME_HEIGHT:
+            display_frame = frame
+        else:
+            display_frame = cv2.resize(frame, (self.FRAME_WIDTH, self.FRAME_HEIGHT))
 
         # Return the normal resized frame if there is no active/selected object
         if len(active_objects)==0 or selected_world_obj is None:
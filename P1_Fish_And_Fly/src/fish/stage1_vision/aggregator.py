@@ -1,26 +1,72 @@
-from typing import List, Dict, Tuple, Set
+import time
+import heapq
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional, Union
 
 from src.common.logging import logger
-from src.fish.stage1_vision.entity import Detection, TrackedGarbage, TrackedState
+from src.common.logging.entity import GarbageLogEntry
+from src.common.logging.garbage_csv_logger import GarbageCSVLogger
+from src.fish.stage1_vision.entity import Detection, DetectionBatch, TrackedGarbage, TrackedState, NO_TRACK
+from src.fish.stage1_vision.track_ids import TrackIdBitmap
+from src.fish.stage1_vision.track_table import TrackTable, STATE_CODES, CODE_STATES
 from src.fish.stage2_decision.command import LifeCycleCommand, LifeCycleAction
 
 
+# States of the records which can be evicted from the memory (never seen again by Decision).
+EVICTABLE_STATES = (TrackedState.DONE, TrackedState.LOST)
+
+# States of the records returned to Decision, and watched for LOST promotion.
+ACTIVE_STATES = (TrackedState.NEW, TrackedState.STABLE, TrackedState.SELECTED, TrackedState.UNATTEMPTED)
+
+EVICTABLE_CODES = [STATE_CODES[state] for state in EVICTABLE_STATES]
+ACTIVE_CODES = [STATE_CODES[state] for state in ACTIVE_STATES]
+STATE_VALUES = [state.value for state in CODE_STATES]                        # state code -> log text
+
+
 class GarbageAggregator:
     """
     Aggregates detections over time using track_id
+
+    The memory is bounded (`aggregation.eviction`): DONE / LOST records are evicted after `ttl_seconds` without being seen,
+    and least recently seen first above `max_records`. `done_ids` outlives the memory, so an attempted id is never re-created.
+
+    Per-frame cost does not depend on the number of historical records:
+        - `state_index`: records per active state, so the active objects (or the SELECTED one) are read without scanning the memory.
+        - `idle_heap`: (sighting, track id), 1 entry per active record, oldest first. Sightings do not touch the heap:
+          an expired entry is popped, and re-pushed with the record's latest sighting if it was seen since (lazy invalidation).
+          Only expired entries are popped, so LOST promotion touches only the tracks which went idle (or 1 per `max_idle` period).
+
+    Records live in a columnar `TrackTable`, the memory maps every track id to its row. Callers get thin `TrackView`s
+    (TrackedGarbage API) of the rows, and the per-frame update (sightings, age, confidence, NEW -> STABLE) runs on whole columns.
     """
-    def __init__(self, aggregator_cfg):
-        self.max_history: int = aggregator_cfg.max_history
+    def __init__(self, aggregator_cfg, spill_logger: Optional[GarbageCSVLogger] = None):
+        self.max_history: int = aggregator_cfg.max_history                       # detections kept per track (ring buffers)
         self.stable_age: int = aggregator_cfg.stable_age
+        self.stable_seconds: Optional[float] = aggregator_cfg.get("stable_seconds")         # if set, STABLE promotion is time-based
         self.max_idle_frames: int = aggregator_cfg.max_idle_frames
+        self.max_idle_seconds: Optional[float] = aggregator_cfg.get("max_idle_seconds")     # if set, LOST promotion is time-based
+        self.confidence_half_life: float = aggregator_cfg.get("confidence_half_life_seconds") or 0.5   # EMA confidence, capture time
 
         self.frame_count: int = 0
-        self.memory: Dict[int, TrackedGarbage] = {}                             # lifecycle memory
-        self.done_ids: Set[int] = set()                                         # list of ids of DONE/FAILED/LOST objects      
+        self.current_time: float = 0.0                                          # capture time of the latest frame
+        self.table: TrackTable = TrackTable(history_size = self.max_history)    # columns of the records
+        self.memory: Dict[int, int] = OrderedDict()                             # lifecycle memory: track_id -> row of the table, least recently seen first
+        self.done_ids: TrackIdBitmap = TrackIdBitmap()                          # ids of DONE/FAILED objects (attempted), kept after eviction
+        self.state_index: Dict[TrackedState, Dict[int, TrackedGarbage]] = {state: {} for state in ACTIVE_STATES}
+        self.idle_heap: List[Tuple[float, int]] = []                            # (last_seen_frame or last_seen_time, track_id)
+
+        # Eviction of DONE / LOST records
+        eviction_cfg = aggregator_cfg.get("eviction")
+        self.eviction_enabled: bool = bool(eviction_cfg and eviction_cfg.enabled)
+        self.ttl_seconds: Optional[float] = eviction_cfg.get("ttl_seconds") if self.eviction_enabled else None
+        self.max_records: Optional[int] = eviction_cfg.get("max_records") if self.eviction_enabled else None
+        self.spill_logger: Optional[GarbageCSVLogger] = spill_logger             # evicted records are appended to the outcome log
+        self.evicted_count: int = 0
 
 
     
-    def create_garbage_aggregations(self, detections: List[Detection]) -> List[TrackedGarbage]:
+    def create_garbage_aggregations(self, detections: Union[List[Detection], DetectionBatch], timestamp: Optional[float] = None) -> List[TrackedGarbage]:
         """
         Create garbage aggregations from raw object detections, received from YOLO.
 
@@ -29,91 +75,215 @@ class GarbageAggregator:
         Handles lifecycle transitions except states: SELECTED and DONE.
         
         :param self: Belongs to GarbageAggregator class
-        :param detections: List of tracked garbage detections, received from YOLO.
-        :type detections: List[Detection]
+        :param detections: Tracked garbage detections, received from YOLO: list of Detection, or columnar DetectionBatch.
+        :type detections: Union[List[Detection], DetectionBatch]
+        :param timestamp: Capture time of the frame (monotonic seconds), current time if not given.
+        :type timestamp: Optional[float]
         :return: List of Tracked Garbage aggregations, created from detections(I/P)
         :rtype: List[TrackedGarbage]
         """
-        logger.info(f"GarbageAggregator -> create_garbage_aggregations(): STARTS, initial detections: {detections}")
+        logger.info(f"GarbageAggregator -> create_garbage_aggregations(): STARTS, initial detections: {len(detections)}")
 
         self.frame_count += 1
-
-        active_track_ids: Set[int] = set()
+        self.current_time = timestamp if timestamp is not None else time.monotonic()
+        self.table.now = self.current_time
 
         # ----------------------------------Create / Update tracked objects-----------------------------
-        for det in detections:
-            if det.track_id is None:
-                continue
-
-            track_id: int = det.track_id
-            det_bbox: Tuple[int, int, int, int] = tuple(det.bbox)
-            active_track_ids.add(track_id)                                          # to keep track of active objects
-
-            # Creating a new object
-            if track_id not in self.memory:
-                tracked_object = TrackedGarbage(
-                    track_id = track_id,
-                    class_id = det.class_id,
-                    class_name = det.class_name,
-                    avg_confidence = det.confidence,
-                    bbox = det_bbox,
-                    age = 1,
-                    last_seen_frame = self.frame_count,
-                    state = TrackedState.NEW
-                )
-
-                self.memory[track_id] = tracked_object
-                continue
-
-            # Updating stats for old object
-            tracked_object = self.memory[track_id]
-            tracked_object.age += 1
-            tracked_object.last_seen_frame = self.frame_count
-            tracked_object.bbox = det_bbox
-            tracked_object.avg_confidence = ( (tracked_object.avg_confidence*(tracked_object.age - 1)) + det.confidence ) / tracked_object.age
-
-            # State transforamtion: [NEW -> STABLE] Promotion
-            if tracked_object.state == TrackedState.NEW and tracked_object.age >= self.stable_age:
-                tracked_object.state = TrackedState.STABLE
+        # Track ids are unique within a frame (1 box per track).
+        track_ids, class_ids, class_names, confidences, boxes, camera_ids, predicted = self._detection_columns(detections)
+        memory = self.memory
+        rows = np.fromiter((memory.get(track_id, -1) for track_id in track_ids.tolist()), dtype = np.int64, count = len(track_ids))
+        seen = np.nonzero(rows >= 0)[0]
+
+        # Creating new objects. Attempted objects whose record was evicted are still excluded.
+        unknown = np.nonzero(rows < 0)[0]
+        new = np.asarray([idx for idx, track_id in zip(unknown.tolist(), track_ids[unknown].tolist()) if track_id not in self.done_ids], dtype = np.int64)
+        if len(new):
+            rows[new] = self.table.add(track_ids[new], class_ids[new], class_names[new], confidences[new], boxes[new], camera_ids[new], self.frame_count, self.current_time)
+
+        # Updating stats for old objects
+        seen_rows = rows[seen]
+        self.table.last_seen_frame[seen_rows] = self.frame_count
+        self.table.last_seen_time[seen_rows] = self.current_time
+        self.table.bbox[seen_rows] = boxes[seen]
+
+        # Memory order (most recently seen at the end), in detection order. New records enter the idle heap.
+        idle_key = self.current_time if self.max_idle_seconds is not None else self.frame_count
+        for track_id, row in zip(track_ids.tolist(), rows.tolist()):
+            if track_id in memory:
+                memory.move_to_end(track_id)
+            elif row >= 0:
+                memory[track_id] = row
+                self.state_index[TrackedState.NEW][track_id] = self.table.view(row)
+                heapq.heappush(self.idle_heap, (idle_key, track_id))
+
+        self.table.mark_changed(rows[rows >= 0])
+
+        # Predicted boxes (keyframing) only move the object, age and confidence count real detections.
+        detected = seen[~predicted[seen]]
+        detected_rows = rows[detected]
+        self.table.age[detected_rows] += 1
+        self.table.avg_confidence[detected_rows] += (confidences[detected] - self.table.avg_confidence[detected_rows]) / self.table.age[detected_rows]
+
+        # Time-aware EMA: the weight of the past halves every `confidence_half_life` seconds, whatever the frame rate.
+        elapsed = self.current_time - self.table.last_detection_time(detected_rows)
+        alpha = 1.0 - np.power(0.5, elapsed / self.confidence_half_life)
+        self.table.ema_confidence[detected_rows] += alpha * (confidences[detected] - self.table.ema_confidence[detected_rows])
+        self.table.push_history(detected_rows, boxes[detected], confidences[detected], self.current_time)
+
+        # State transforamtion: [NEW -> STABLE] Promotion
+        # Tracked for `stable_seconds` of capture time when set (same gate at any frame rate), else seen `stable_age` times.
+        if self.stable_seconds is not None:
+            old_enough = self.table.age_seconds(detected_rows) >= self.stable_seconds
+        else:
+            old_enough = self.table.age[detected_rows] >= self.stable_age
+        promoted = detected_rows[(self.table.state[detected_rows] == STATE_CODES[TrackedState.NEW]) & old_enough]
+        for track_id in self.table.track_id[promoted].tolist():
+            self._set_state(track_id, TrackedState.STABLE)
 
         logger.info(f"create_garbage_aggregations(): , tracked_objects= {len(self.memory)}")
 
         # --------------------------------------Handle missing objects--------------------------------
-        for track_id, tracked_object in list(self.memory.items()):
-            if track_id in active_track_ids:
-               continue
+        # Only the expired heap entries are visited (oldest sightings first).
+        while self.idle_heap and self._is_expired(self.idle_heap[0][0]):
+            _, track_id = heapq.heappop(self.idle_heap)
+            row = self.memory.get(track_id)
+
+            # Stale entry: evicted record, or record already DONE / LOST.
+            if row is None or self.table.state[row] not in ACTIVE_CODES:
+                continue
+
+            # Seen again after this entry was pushed: watched from its latest sighting.
+            idle_key = self._idle_key(row)
+            if not self._is_expired(idle_key):
+                heapq.heappush(self.idle_heap, (idle_key, track_id))
+                continue
 
-            # finding for how long the object is missing, using formula (current frame - last seen frame)
-            idle_frame = self.frame_count - tracked_object.last_seen_frame
-            
             # State transformation: [any state -> LOST]
-            if idle_frame > self.max_idle_frames:
-                # Vision can mark the state to LOST
-                if tracked_object.state != TrackedState.DONE:                       # the object is not collected yet.
-                    tracked_object.state = TrackedState.LOST
-                    logger.info(f"marked lost: track_id: {track_id}")
+            # Vision can mark the state to LOST, the object is not collected yet.
+            self._set_state(track_id, TrackedState.LOST)
+            logger.info(f"marked lost: track_id: {track_id}")
                 
         
         # ----------------Cleanup of DONE and LOST objects-------
-        #self._cleanup_memory()                 # Not required
+        if self.eviction_enabled:
+            self._cleanup_memory()
 
         # Taking only active objects from the memory.
-        active_objects = [obj for obj in self.memory.values() if obj.state not in (TrackedState.DONE, TrackedState.LOST)]
+        active_objects = [obj for state in ACTIVE_STATES for obj in self.state_index[state].values()]
 
-        logger.info(f"GarbageAggregator -> create_garbage_aggregations() -> active objects: {len(active_objects)}, total objects in agg: {len(self.memory)}")
+        logger.info(f"GarbageAggregator -> create_garbage_aggregations() -> active objects: {len(active_objects)}, total objects in agg: {len(self.memory)}, evicted: {self.evicted_count}")
 
-        for obj in self.memory.values():
+        # Per-track log, read from the columns.
+        active_rows = [self.memory[track_id] for state in ACTIVE_STATES for track_id in self.state_index[state]]
+        for track_id, state_code, age, last_seen in zip(self.table.track_id[active_rows].tolist(), self.table.state[active_rows].tolist(),
+                                                        self.table.age[active_rows].tolist(), self.table.last_seen_frame[active_rows].tolist()):
             logger.info(
-                f"[TRACK {obj.track_id}], "
-                f"state={obj.state.value}, "
-                f"age={obj.age},"
-                f"last_seen={obj.last_seen_frame}"
+                f"[TRACK {track_id}], "
+                f"state={STATE_VALUES[state_code]}, "
+                f"age={age},"
+                f"last_seen={last_seen}"
             )
 
         logger.info("GarbageAggregator -> create_garbage_aggregations(): ENDS")
         return active_objects
 
 
+    def _detection_columns(self, detections: Union[List[Detection], DetectionBatch]) -> Tuple[np.ndarray, ...]:
+        """
+        Provides the tracked detections as columns: track_ids, class_ids, class_names, confidences, boxes, camera_ids, predicted.
+        A DetectionBatch is used as is (untracked boxes dropped by a mask), without creating Detection objects.
+        """
+        if isinstance(detections, DetectionBatch):
+            tracked = detections.track_ids != NO_TRACK
+            class_ids = detections.class_ids[tracked]
+            count = len(class_ids)
+            class_names = np.empty(count, dtype = object)
+            class_names[:] = [detections.class_names[class_id] for class_id in class_ids.tolist()]
+            camera_ids = np.empty(count, dtype = object)
+            camera_ids[:] = detections.camera_id
+
+            return (
+                detections.track_ids[tracked], class_ids, class_names, detections.confidences[tracked].astype(np.float64),
+                detections.boxes[tracked].reshape(-1, 4), camera_ids, np.full(count, detections.predicted, dtype = bool)
+            )
+
+        detections = [det for det in detections if det.track_id is not None]
+        count = len(detections)
+        class_names = np.empty(count, dtype = object)
+        class_names[:] = [det.class_name for det in detections]
+        camera_ids = np.empty(count, dtype = object)
+        camera_ids[:] = [det.camera_id for det in detections]
+
+        return (
+            np.fromiter((det.track_id for det in detections), dtype = np.int64, count = count),
+            np.fromiter((det.class_id for det in detections), dtype = np.int64, count = count),
+            class_names,
+            np.fromiter((det.confidence for det in detections), dtype = np.float64, count = count),
+            np.asarray([det.bbox for det in detections], dtype = np.int32).reshape(-1, 4),
+            camera_ids,
+            np.fromiter((det.predicted for det in detections), dtype = bool, count = count)
+        )
+
+
+    def _idle_key(self, row: int) -> float:
+        """
+        Latest sighting of the record: capture time when `max_idle_seconds` is set, else frame number.
+        """
+        return float(self.table.last_seen_time[row]) if self.max_idle_seconds is not None else int(self.table.last_seen_frame[row])
+
+
+    def _is_expired(self, idle_key: float) -> bool:
+        """
+        Checks if an object last seen at `idle_key` is missing for too long: in seconds when `max_idle_seconds` is set, else in frames.
+        """
+        if self.max_idle_seconds is not None:
+            idle_time = self.current_time - idle_key
+            return idle_time > self.max_idle_seconds
+
+        # finding for how long the object is missing, using formula (current frame - last seen frame)
+        idle_frame = self.frame_count - idle_key
+        return idle_frame > self.max_idle_frames
+
+
+    def _set_state(self, track_id: int, state: TrackedState):
+        """
+        Changes the lifecycle state of the record, and keeps the state index (and the idle heap) in sync.
+        """
+        row = self.memory[track_id]
+        previous_state = CODE_STATES[self.table.state[row]]
+        if previous_state == state:
+            return
+
+        tracked_object = self.state_index[previous_state].pop(track_id) if previous_state in self.state_index else None
+        self.table.state[row] = STATE_CODES[state]
+        self.table.mark_changed([row])
+        if state in self.state_index:
+            self.state_index[state][track_id] = tracked_object or self.table.view(row)
+
+        # Back to an active state (e.g. LOST object selected): watched again for LOST promotion.
+        if state in ACTIVE_STATES and previous_state not in ACTIVE_STATES:
+            heapq.heappush(self.idle_heap, (self._idle_key(row), track_id))
+
+
+    def get_objects_by_state(self, state: TrackedState) -> Dict[int, TrackedGarbage]:
+        """
+        Provides the records of 1 lifecycle state (track_id -> object).
+        Active states are read from the state index, DONE / LOST records from a mask over the state column.
+
+        :param self: Belongs to GarbageAggregator class
+        :param state: Lifecycle state.
+        :type state: TrackedState
+        :return: Records in that state (read-only, do not modify).
+        :rtype: Dict[int, TrackedGarbage]
+        """
+        if state in self.state_index:
+            return self.state_index[state]
+
+        rows = np.nonzero(self.table.state[:self.table.next_row] == STATE_CODES[state])[0]
+        return {track_id: self.table.view(row) for track_id, row in zip(self.table.track_id[rows].tolist(), rows.tolist())}
+
+
     def apply_lifecycle_changes(self, command: LifeCycleCommand) -> bool:
         """
         Applies lifecycle changes to the tracked garbage aggregations, according to the command from Decision module.
@@ -139,79 +309,167 @@ class GarbageAggregator:
         
 
         # Retrieving the selected object from the aggregation memory.
-        selected_object = self.memory[target_track_id]
+        selected_object = self.table.view(self.memory[target_track_id])
 
         # NOTE: We maintain a list of ATTEMPTED objects(status= DONE/LOST) in order to avoid taking action on object more than once. List name is `done_ids`
 
         # Updating Aggregation memory with the selected object's Lifecycle status.
         if command.action == LifeCycleAction.SELECT:
-            selected_object.state = TrackedState.SELECTED                           # automatically updated in aggregation memory(pass by reference)
+            self._set_state(target_track_id, TrackedState.SELECTED)                 # automatically updated in aggregation memory(pass by reference)
 
         elif command.action == LifeCycleAction.MARK_DONE:
-            selected_object.state = TrackedState.DONE
+            self._set_state(target_track_id, TrackedState.DONE)
 
             # Updating done_ids list.
             self.done_ids.add(target_track_id)
 
         elif command.action == LifeCycleAction.FAILED:
-            selected_object.state = TrackedState.LOST
+            self._set_state(target_track_id, TrackedState.LOST)
 
             # Updating `done_ids` list.
             self.done_ids.add(target_track_id)
 
         elif command.action == LifeCycleAction.UNATTEMPTED:
-            selected_object.state = TrackedState.UNATTEMPTED
+            self._set_state(target_track_id, TrackedState.UNATTEMPTED)
             
         
         logger.info(f"track_id: {target_track_id} set to: {selected_object.state}")
             
         # NOTE: No need to update the aggregation memory with selected object's state (NO NEED FOR `self.memory[track_id] = selected_object`) 
         # Because `Objects in Python are passed by reference, not by value`.
-        logger.info(f"GarbageAggregator -> apply_lifecycle_changes(): ENDS, checking memory updation: {self.memory[target_track_id].state}")
+        logger.info(f"GarbageAggregator -> apply_lifecycle_changes(): ENDS, checking memory updation: {selected_object.state}")
         return True
 
 
     # NOT USED YET.
-    def get_done_object_ids(self) -> Set[int]:
+    def get_done_object_ids(self) -> TrackIdBitmap:
         """
         Docstring for get_done_object_ids
         
         :param self: Belongs to GarbageAggregator class
-        :return: Provides list of ids of all the objects which are either DONE/LOST.
-        :rtype: Set[int]
+        :return: Provides ids of all the objects which are either DONE/LOST (attempted), evicted records included.
+        :rtype: TrackIdBitmap
         """
-        logger.info(f"GarbageAggregator -> get_done_object_ids(): done_ids: {self.done_ids}")
+        logger.info(f"GarbageAggregator -> get_done_object_ids(): done_ids: {len(self.done_ids)}")
         return self.done_ids
 
 
 
-    '''
-    def _cleanup_memory(self):
+    def snapshot_state(self) -> Dict[str, np.ndarray]:
         """
-        Remove collected(DONE) and long lost(LOST) objects from memory.
-        
-        :param self: Belongs to GarbageAggregator class.
+        Copies the aggregation state (records in memory order, done ids, counters) into plain NumPy arrays.
+        The arrays are copies: they can be written to disk on another thread while the aggregation goes on.
+
+        :param self: Belongs to GarbageAggregator class
+        :return: Array name -> array.
+        :rtype: Dict[str, np.ndarray]
         """
-        logger.info(f"cleanup_memory(): STARTS, before memory cleanup n(items): {len(self.memory.items())}")
+        rows = np.fromiter(self.memory.values(), dtype = np.int64, count = len(self.memory))
+        state = {f"record_{name}": column for name, column in self.table.export_rows(rows).items()}
+        state["active_track_ids"] = np.fromiter((track_id for index in self.state_index.values() for track_id in index), dtype = np.int64)   # index order
+        state["done_ids"] = np.frombuffer(self.done_ids.to_bytes(), dtype = np.uint8)
+        state["frame_count"] = np.asarray(self.frame_count, dtype = np.int64)
+        state["current_time"] = np.asarray(self.current_time, dtype = np.float64)
+        state["evicted_count"] = np.asarray(self.evicted_count, dtype = np.int64)
+        return state
 
-        ids_to_remove:List[int] = []
 
-        for track_id, tracked_object in self.memory.items():
-            if tracked_object.state == TrackedState.DONE:
-                ids_to_remove.append(track_id)
+    def restore_state(self, state: Dict[str, np.ndarray], now: Optional[float] = None):
+        """
+        Replaces the aggregation state with a `snapshot_state()` copy.
 
-            elif tracked_object.state == TrackedState.LOST:
-                idle_frame = self.frame_count - tracked_object.last_seen_frame
-                if idle_frame > self.max_idle_frames * 2:                       # Gives tracker time to re-identify
-                    ids_to_remove.append(track_id)
+        Capture times are shifted so the snapshot time becomes `now`: the downtime does not count as idle time,
+        and the records stay comparable with the capture times of the new frames (monotonic clock of this process).
 
-        # Removing the DONE / LOST objects from the garbage aggregation memory.
-        for track_id in ids_to_remove:
-            del self.memory[track_id]
+        :param self: Belongs to GarbageAggregator class
+        :param state: Array name -> array.
+        :type state: Dict[str, np.ndarray]
+        :param now: Current capture time (monotonic seconds), current time if not given.
+        :type now: Optional[float]
+        """
+        logger.info(f"GarbageAggregator -> restore_state(): STARTS, records: {len(state['record_track_id'])}")
 
-        logger.info(f"cleanup_memory(): IDS_TO_REMOVE: : {ids_to_remove}")
-        logger.info(f"cleanup_memory(): ENDS, after memory cleanup n(intems): {len(self.memory.items())}")
-        return
-    
-    '''
+        now = now if now is not None else time.monotonic()
+        shift = now - float(state["current_time"])
+        columns = {name[len("record_"):]: array for name, array in state.items() if name.startswith("record_")}
+        for name in ("first_seen_time", "last_seen_time", "history_time"):
+            columns[name] = columns[name] + shift
+
+        self.table = TrackTable(capacity = max(256, len(columns["track_id"])), history_size = self.max_history)
+        rows = self.table.import_rows(columns)
+        self.memory = OrderedDict(zip(columns["track_id"].tolist(), rows.tolist()))
+        self.done_ids = TrackIdBitmap.from_bytes(state["done_ids"].tobytes())
+        self.frame_count = int(state["frame_count"])
+        self.current_time = now
+        self.table.now = now
+        self.evicted_count = int(state["evicted_count"])
+
+        # Index (same order as before, so are the active objects) and idle heap of the active records.
+        self.state_index = {active_state: {} for active_state in ACTIVE_STATES}
+        self.idle_heap = []
+        for track_id in state["active_track_ids"].tolist():
+            row = self.memory[track_id]
+            self.state_index[CODE_STATES[self.table.state[row]]][track_id] = self.table.view(row)
+            self.idle_heap.append((self._idle_key(row), track_id))
+        heapq.heapify(self.idle_heap)
+
+        logger.info(f"GarbageAggregator -> restore_state(): ENDS, memory: {len(self.memory)}, done ids: {len(self.done_ids)}")
+
+
+
+    def _cleanup_memory(self):
+        """
+        Evicts DONE and LOST records from memory: not seen for `ttl_seconds`, then least recently seen ones above `max_records`.
+        The memory is ordered by last sighting, so only its old end is scanned.
+        
+        :param self: Belongs to GarbageAggregator class.
+        """
+        ids_to_remove: List[int] = []
+        table = self.table
+
+        # TTL: stops at the first record seen within the TTL, every record after it is more recent.
+        if self.ttl_seconds is not None:
+            for track_id, row in self.memory.items():
+                if self.current_time - table.last_seen_time[row] <= self.ttl_seconds:
+                    break
+                if table.state[row] in EVICTABLE_CODES:
+                    ids_to_remove.append(track_id)
+
+        # Capacity: least recently seen evictable records first, active records are never evicted.
+        excess = len(self.memory) - len(ids_to_remove) - self.max_records if self.max_records is not None else 0
+        if excess > 0:
+            expired = set(ids_to_remove)
+            for track_id, row in self.memory.items():
+                if excess == 0:
+                    break
+                if table.state[row] in EVICTABLE_CODES and track_id not in expired:
+                    ids_to_remove.append(track_id)
+                    excess -= 1
+
+            if excess > 0:
+                logger.info(f"cleanup_memory(): {excess} records above max_records: {self.max_records}, the remaining records are active")
+
+        if not ids_to_remove:
+            return
+
+        evicted_rows = [self.memory.pop(track_id) for track_id in ids_to_remove]
+        self.evicted_count += len(evicted_rows)
+        logger.info(f"cleanup_memory(): evicted {len(evicted_rows)} records, IDS_TO_REMOVE: {ids_to_remove}, memory size: {len(self.memory)}")
+
+        if self.spill_logger is not None:
+            self.spill_logger.log_many([
+                GarbageLogEntry(
+                    track_id = obj.track_id,
+                    class_name = obj.class_name,
+                    first_seen_frame = obj.first_seen_frame,
+                    last_seen_frame = obj.last_seen_frame,
+                    final_state = "evicted",
+                    lifecycle_state = obj.state.value,
+                    age = obj.age,
+                    avg_confidence = obj.avg_confidence
+                )
+                for obj in map(table.view, evicted_rows)
+            ])
 
+        # Rows of the evicted records are reused (after the spill, which reads them).
+        table.release(evicted_rows)
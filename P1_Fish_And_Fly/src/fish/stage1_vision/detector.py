@@ -1,14 +1,135 @@
 # YOLO + classifier detection for underwater garbage
+import os
+import numpy as np
+from pathlib import Path
+from typing import Optional
+
+import torch
 from ultralytics import YOLO
 from box import ConfigBox
 from src.common.logging import logger
+from src.fish.stage1_vision.model_registry import model_registry
+
+
+# Inference backends: PyTorch weights, or the weights exported once for CPU inference.
+SUPPORTED_BACKENDS = ("torch", "onnx", "openvino")
 
 
 class GarbageDetector:
     """
     YOLO based Garbage Detector
     Detector just owns YOLO model, whereas Tracker decided Inference mode.
+    The model comes from the process-wide registry: loaded once, warmed up at startup, shared by every detector.
+
+    With `backend: onnx | openvino`, the `.pt` weights are exported once, the exported model is cached next to the weights,
+    and loaded through the same `YOLO` wrapper, so the results (and Detection objects) are produced exactly as with PyTorch.
     """
     def __init__(self, cfg: ConfigBox):
         self.detection_cfg = cfg
-        self.detection_model = YOLO(self.detection_cfg.weights)
\ No newline at end of file
+        self.backend: str = cfg.get("backend") or "torch"
+        self.num_threads: Optional[int] = cfg.get("num_threads")
+
+        if self.backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"Unknown inference backend: {self.backend}, supported: {SUPPORTED_BACKENDS}")
+
+        self._apply_thread_settings()
+
+        if self.backend == "torch":
+            self.model_path = str(self.detection_cfg.weights)
+            self.detection_model = model_registry.get_model(self.model_path)
+        else:
+            self.model_path = self._get_exported_model()
+            self.detection_model = model_registry.get_model(self.model_path, task = "detect")
+            self._configure_runtime_threads()
+
+        # First real frame runs at steady-state latency.
+        self.warm_up(self.detection_cfg.imgsz)
+
+        logger.info(f"GarbageDetector -> init(): backend = {self.backend}, num_threads = {self.num_threads}")
+
+
+
+    def warm_up(self, imgsz: int):
+        """
+        Warms up the shared model for an inference size (`inference.warmup_runs` blank inferences, once per size).
+        """
+        model_registry.warm_up(self.detection_model, imgsz = imgsz, runs = self.detection_cfg.get("warmup_runs") or 0)
+
+
+
+    def _get_exported_model(self) -> str:
+        """
+        Provides the path of the exported model, exports the `.pt` weights only if the cached export is missing or older than the weights.
+
+        :param self: Belongs to the GarbageDetector class.
+        :return: Path of the exported model (file for onnx, directory for openvino).
+        :rtype: str
+        """
+        try:
+            weights = Path(self.detection_cfg.weights)
+            if self.backend == "onnx":
+                exported_path = weights.with_suffix(".onnx")
+            else:
+                exported_path = weights.with_name(f"{weights.stem}_openvino_model")           # ultralytics export layout
+
+            if exported_path.exists() and exported_path.stat().st_mtime >= weights.stat().st_mtime:
+                logger.info(f"GarbageDetector -> get_exported_model(): using cached export: {exported_path}")
+                return str(exported_path)
+
+            logger.info(f"GarbageDetector -> get_exported_model(): exporting {weights} to {self.backend}")
+            exported = YOLO(str(weights)).export(
+                format = self.backend,
+                imgsz = self.detection_cfg.imgsz,
+                dynamic = True,                             # batched inference + any input size
+                half = False
+            )
+            logger.info(f"GarbageDetector -> get_exported_model(): exported model: {exported}")
+            return str(exported)
+
+
+        except Exception as e:
+            logger.info(f"Error occurred in GarbageDetector -> get_exported_model(): {e}")
+            raise e
+
+
+
+    def _apply_thread_settings(self):
+        """
+        Limits the CPU threads of the inference (PyTorch + OpenMP based runtimes).
+        """
+        if not self.num_threads:
+            return
+
+        os.environ["OMP_NUM_THREADS"] = str(self.num_threads)
+        torch.set_num_threads(int(self.num_threads))
+
+
+
+    def _configure_runtime_threads(self):
+        """
+        Applies the thread count to the ONNX Runtime session / OpenVINO compiled model of the exported backend.
+        The runtime is created lazily by ultralytics, so 1 warm-up inference is run first.
+        """
+        if not self.num_threads:
+            return
+
+        imgsz = int(self.detection_cfg.imgsz)
+        self.detection_model.predict(np.zeros((imgsz, imgsz, 3), dtype = np.uint8), imgsz = imgsz, verbose = False)
+        backend_model = self.detection_model.predictor.model
+
+        if self.backend == "onnx" and getattr(backend_model, "session", None) is not None:
+            import onnxruntime
+
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = int(self.num_threads)
+            backend_model.session = onnxruntime.InferenceSession(self.model_path, sess_options = session_options, providers = ["CPUExecutionProvider"])
+
+        elif self.backend == "openvino" and getattr(backend_model, "ov_compiled_model", None) is not None:
+            import openvino as ov
+
+            core = ov.Core()
+            ov_model = core.read_model(str(Path(self.model_path) / f"{Path(self.detection_cfg.weights).stem}.xml"))
+            backend_model.ov_compiled_model = core.compile_model(ov_model, device_name = "CPU", config = {"INFERENCE_NUM_THREADS": int(self.num_threads)})
+
+        else:
+            logger.info(f"GarbageDetector -> configure_runtime_threads(): runtime of backend {self.backend} not found, thread count not applied")
@@ -1,5 +1,6 @@
+import numpy as np
 from enum import Enum
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -12,6 +13,59 @@ class Detection:
     confidence: float
     bbox: List[int]                     # [x1, y1, x2, y2]
     track_id: int | None = None
+    camera_id: str | None = None        # camera which saw the object (multi-camera input)
+    predicted: bool = False             # box propagated by the motion predictor (no YOLO on this frame)
+
+
+
+# Track id of the boxes without a track, in DetectionBatch.track_ids.
+NO_TRACK = -1
+
+# Columnar detections of 1 frame: 1 array per field instead of 1 Detection object per box (crowded scenes).
+@dataclass
+class DetectionBatch:
+    class_ids: np.ndarray               # (N,) int64
+    confidences: np.ndarray             # (N,) float32
+    boxes: np.ndarray                   # (N, 4) int32, [x1, y1, x2, y2]
+    track_ids: np.ndarray               # (N,) int64, NO_TRACK if the box is not tracked
+    class_names: List[str]              # class id -> class name
+    camera_id: str | None = None
+    predicted: bool = False
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    @classmethod
+    def empty(cls, class_names: List[str]) -> "DetectionBatch":
+        return cls(
+            class_ids = np.zeros(0, dtype = np.int64),
+            confidences = np.zeros(0, dtype = np.float32),
+            boxes = np.zeros((0, 4), dtype = np.int32),
+            track_ids = np.zeros(0, dtype = np.int64),
+            class_names = class_names
+        )
+
+    def rows(self) -> Iterator[Tuple[Optional[int], int, str, float, List[int]]]:
+        """
+        Yields (track_id, class_id, class_name, confidence, bbox) per box, with plain python values (1 conversion per array).
+        """
+        class_names = self.class_names
+        for track_id, class_id, confidence, bbox in zip(self.track_ids.tolist(), self.class_ids.tolist(), self.confidences.tolist(), self.boxes.tolist()):
+            yield (track_id if track_id != NO_TRACK else None), class_id, class_names[class_id], confidence, bbox
+
+    def to_detections(self) -> List[Detection]:
+        return [
+            Detection(
+                class_id = class_id,
+                class_name = class_name,
+                confidence = confidence,
+                bbox = bbox,
+                track_id = track_id,
+                camera_id = self.camera_id,
+                predicted = self.predicted
+            )
+            for track_id, class_id, class_name, confidence, bbox in self.rows()
+        ]
 
 
 
@@ -34,4 +88,35 @@ class TrackedGarbage:
     last_seen_frame: int
     state: TrackedState
     fade_frames_remaining: int = 0      # UI related
+    first_seen_time: float = 0.0        # capture time of first detection (monotonic seconds)
+    last_seen_time: float = 0.0         # capture time of latest detection (monotonic seconds)
+    camera_id: str | None = None        # camera which saw the object (multi-camera input)
+    first_seen_frame: int = 0           # aggregator frame of first detection
+
+    # Windowed statistics of the latest detections. A plain record keeps no history: they fall back to the latest values,
+    # TrackView (aggregation memory) computes them from its ring buffers.
+    @property
+    def velocity(self) -> Tuple[float, float]:
+        return (0.0, 0.0)                # box center, pixels / second
+
+    @property
+    def smoothed_bbox(self) -> Tuple[float, float, float, float]:
+        return tuple(float(value) for value in self.bbox)
+
+    @property
+    def windowed_confidence(self) -> float:
+        return self.avg_confidence
+
+    @property
+    def ema_confidence(self) -> float:
+        return self.avg_confidence
+
+    # Frame-rate independent age / idle time (capture time, seconds).
+    @property
+    def age_seconds(self) -> float:
+        return self.last_seen_time - self.first_seen_time
+
+    @property
+    def idle_seconds(self) -> float:
+        return 0.0                       # no clock: a plain record is as of its latest sighting
 
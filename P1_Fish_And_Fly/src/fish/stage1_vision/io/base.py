@@ -1,11 +1,21 @@
 # AIM: Abstract interface (CORE ABSTRACTION)
 
+import time
+import numpy as np
 from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from src.fish.stage1_vision.entity import Detection
+from src.fish.stage1_vision.io.entity import FramePacket
+
 
 class VisionInput(ABC):
     """
     Abstract base class for all vision input sources
     """
+    source_id: str = "vision"
+    policy: Optional[str] = None            # buffer policy of the feed ("latest" / "lossless"), set by build_vision_input()
+    _sequence: int = 0
 
     @abstractmethod
     def start(self):
@@ -15,11 +25,40 @@ class VisionInput(ABC):
     def read(self):
         """
         Returns:
-            frame (np.ndarray) or None if stream ended    
+            frame packet (FramePacket) or None if stream ended    
 
         """
         pass
 
     @abstractmethod
     def stop(self):
-        pass
\ No newline at end of file
+        pass
+
+    def _make_packet(self, frame: np.ndarray, detections: Optional[List[Detection]] = None, timestamp: Optional[float] = None) -> FramePacket:
+        """
+        Wraps a captured frame into a FramePacket, stamped with the capture time (now, or the given one) and the next sequence number.
+        """
+        self._sequence += 1
+        received_time = time.monotonic()
+        packet = FramePacket(
+            frame = frame,
+            sequence = self._sequence,
+            timestamp = received_time if timestamp is None else timestamp,
+            source_id = self.source_id,
+            detections = detections,
+            received_time = received_time
+        )
+        return packet
+
+    def read_many(self, count: int) -> List[FramePacket]:
+        """
+        Reads up to `count` consecutive frame packets (fewer when the stream ends), oldest first.
+        """
+        packets: List[FramePacket] = []
+        while len(packets) < count:
+            packet = self.read()
+            if packet is None:
+                break
+            packets.append(packet)
+        return packets
+
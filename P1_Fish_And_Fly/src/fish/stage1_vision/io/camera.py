@@ -6,6 +6,7 @@ from src.fish.stage1_vision.io.base import VisionInput
 class CameraInput(VisionInput):
     def __init__(self, device_id: int = 0):
         self.device_id = device_id
+        self.source_id = f"camera:{device_id}"
         self.cap = None
 
     def start(self):
@@ -27,7 +28,7 @@ class CameraInput(VisionInput):
             return None
         
         logger.info(f"CameraInput-> read() Camera read sucessfully")
-        return frame
+        return self._make_packet(frame)
     
 
     def stop(self):
@@ -0,0 +1,55 @@
+import numpy as np
+from typing import Dict, List, Tuple, Optional
+from dataclasses import dataclass
+
+from src.fish.stage1_vision.entity import Detection
+
+
+
+# Frame prepared once at capture time: downstream stages use the pre-scaled views instead of resizing the full frame again.
+@dataclass
+class ScaledFrame:
+    inference_image: np.ndarray                         # pre-scaled frame for YOLO inference
+    inference_scale: Tuple[float, float]                # (sx, sy) = inference size / source size
+    display_image: Optional[np.ndarray] = None          # pre-scaled frame for visualization
+    display_scale: Tuple[float, float] = (1.0, 1.0)     # (sx, sy) = display size / source size
+
+
+# Envelope returned by every vision source. The capture timestamp travels with the frame, so latency can be measured from capture to action.
+@dataclass
+class FramePacket:
+    frame: np.ndarray                                   # original frame, full source resolution
+    sequence: int                                       # frame number in its source (starts at 1), gaps mean skipped frames
+    timestamp: float                                    # capture time, `time.monotonic()` seconds
+    source_id: str                                      # which source captured the frame
+    scaled: Optional[ScaledFrame] = None                # pre-scaled views (capture-time preprocessing)
+    detections: Optional[List[Detection]] = None        # already known detections (replay / simulation), YOLO is bypassed
+    received_time: float = 0.0                          # `time.monotonic()` when the packet entered this run (= timestamp for live
+                                                        # sources; read time of a replay, whose timestamp is the recorded clock)
+
+
+# Synchronized frames of several cameras, captured at (about) the same time. Delivered by the multi-camera input.
+@dataclass
+class FrameBatch:
+    packets: Dict[str, FramePacket]                     # camera id -> frame packet
+    sequence: int                                       # batch number (starts at 1)
+    timestamp: float                                    # capture time of the OLDEST frame in the batch, latency is measured from it
+    source_id: str                                      # id of the multi-camera input
+    primary_id: str                                     # camera shown in the Visualizer
+    skew: float = 0.0                                   # capture time spread inside the batch, seconds
+
+    @property
+    def primary(self) -> FramePacket:
+        return self.packets.get(self.primary_id) or next(iter(self.packets.values()))
+
+    @property
+    def frame(self) -> np.ndarray:
+        return self.primary.frame
+
+    @property
+    def received_time(self) -> float:
+        return min(packet.received_time for packet in self.packets.values())
+
+    @property
+    def scaled(self) -> Optional[ScaledFrame]:
+        return self.primary.scaled
@@ -1,25 +1,170 @@
 # Aim: This file build Vision Input, avoiding if-else chaos in main.py.
-from typing import Any
+from typing import Any, Dict, List, Optional, Tuple
+from box import ConfigBox
 
+from src.fish.stage1_vision.io.base import VisionInput
 from src.fish.stage1_vision.io.video import VideoInput
 from src.fish.stage1_vision.io.camera import CameraInput
+from src.fish.stage1_vision.io.simulator import SimulatorInput
+from src.fish.stage1_vision.io.image_dir import ImageDirectoryInput
+from src.fish.stage1_vision.io.replay import DetectionReplayInput
+from src.fish.stage1_vision.io.preprocess import FramePreprocessor, PreprocessedInput
+from src.fish.stage1_vision.io.prefetcher import PrefetchedInput, LATEST_FRAME_WINS, LOSSLESS
+from src.fish.stage1_vision.io.multiplexer import MultiCameraInput
 from src.common.logging import logger
 
 
-# Returns the Vision Input object, after detecting the source of visual feed (CAMERA/ VIDEO/ SIMULATION).
-def build_vision_input(io_cfg: Any):
+# Returns the Vision Input object, after detecting the source of visual feed (CAMERA/ VIDEO/ SIMULATION/ MULTI-CAMERA).
+def build_vision_input(io_cfg: Any, class_names: Optional[List[str]] = None, inference_size: Optional[int] = None, backlog_size: int = 1):
     try:
         logger.info(f"build_vision_input(): STARTS, vision source: {io_cfg.source}")
-        if io_cfg.source == "camera":
-            return CameraInput(device_id= io_cfg.camera.device_id)
-        
-        elif io_cfg.source == "video":
-            return VideoInput(video_path= io_cfg.video.path)
-        
-        else:
-            raise ValueError(f"Unknown video source: {io_cfg.source}")
+
+        # Several cameras read in parallel, delivered as synchronized frame batches.
+        if io_cfg.source == "multi":
+            vision_input = _build_multi_camera_input(io_cfg, class_names, inference_size, backlog_size)
+            logger.info(f"build_vision_input(): ENDS, vision input: {type(vision_input).__name__}")
+            return vision_input
+
+        vision_input, default_policy = _build_source(io_cfg, class_names)
+
+        prefetch_cfg = io_cfg.get("prefetch")
+        prefetch_enabled = bool(prefetch_cfg and prefetch_cfg.enabled)
+        prefetch_policy = (prefetch_cfg.get("policy") or default_policy) if prefetch_enabled else None
+
+        # Downscaling the frames once at capture time.
+        preprocessor = _build_preprocessor(
+            io_cfg,
+            inference_size,
+            pool_size = (prefetch_cfg.buffer_size + 2 + backlog_size) if prefetch_policy == LOSSLESS else 1 + backlog_size      # frames in the prefetch queue + held by the consumer
+        )
+
+        # LOSSLESS: the decode thread blocks on a full buffer, so frames in flight are bounded and preprocessing can run on it.
+        if preprocessor and prefetch_policy == LOSSLESS:
+            vision_input = PreprocessedInput(source = vision_input, preprocessor = preprocessor)
+            preprocessor = None
+
+        # Decoding the frames on a background thread, overlapping with inference.
+        if prefetch_enabled:
+            vision_input = PrefetchedInput(
+                source = vision_input,
+                buffer_size = prefetch_cfg.buffer_size,
+                policy = prefetch_policy
+            )
+
+        # LATEST_FRAME_WINS / no prefetch: only the consumed frames are preprocessed, on the reading thread.
+        if preprocessor:
+            vision_input = PreprocessedInput(source = vision_input, preprocessor = preprocessor)
+
+        # Policy of the outermost input: frame backlogs (batched inference) only on lossless feeds.
+        vision_input.policy = prefetch_policy or default_policy
+
+        logger.info(f"build_vision_input(): ENDS, vision input: {type(vision_input).__name__}, policy: {vision_input.policy}")
+        return vision_input
     
 
     except Exception as e:
         logger.info(f"Error occurred in build_vision_input(): {e}")
-        raise e
\ No newline at end of file
+        raise e
+
+
+
+# Returns the bare source of the visual feed and its default prefetch policy.
+def _build_source(io_cfg: Any, class_names: Optional[List[str]] = None) -> Tuple[VisionInput, str]:
+    if io_cfg.source == "camera":
+        vision_input = CameraInput(device_id= io_cfg.camera.device_id)
+        default_policy = LATEST_FRAME_WINS                  # live feed: stale frames are useless
+    
+    elif io_cfg.source == "video":
+        vision_input = VideoInput(video_path= io_cfg.video.path)
+        default_policy = LOSSLESS                           # recorded feed: every frame must be processed
+
+    elif io_cfg.source == "sim":
+        sim_cfg = io_cfg.sim
+        vision_input = SimulatorInput(
+            width = sim_cfg.width,
+            height = sim_cfg.height,
+            fps = sim_cfg.fps,
+            num_objects = sim_cfg.num_objects,
+            min_size = sim_cfg.min_size,
+            max_size = sim_cfg.max_size,
+            max_speed = sim_cfg.max_speed,
+            max_frames = sim_cfg.max_frames,
+            realtime = sim_cfg.realtime,
+            emit_detections = sim_cfg.emit_detections,
+            seed = sim_cfg.seed,
+            class_names = class_names
+        )
+        default_policy = LOSSLESS
+
+    elif io_cfg.source == "images":
+        vision_input = ImageDirectoryInput(image_dir= io_cfg.images.dir, loop= io_cfg.images.loop)
+        default_policy = LOSSLESS
+
+    elif io_cfg.source == "replay":
+        vision_input = DetectionReplayInput(
+            detections_path= io_cfg.replay.path,
+            frame_width= io_cfg.replay.frame_width,
+            frame_height= io_cfg.replay.frame_height
+        )
+        default_policy = LOSSLESS
+    
+    else:
+        raise ValueError(f"Unknown video source: {io_cfg.source}")
+
+    return vision_input, default_policy
+
+
+
+# Returns the capture-time preprocessor, or None when preprocessing is disabled.
+def _build_preprocessor(io_cfg: Any, inference_size: Optional[int], pool_size: int) -> Optional[FramePreprocessor]:
+    preprocess_cfg = io_cfg.get("preprocess")
+    if not (preprocess_cfg and preprocess_cfg.enabled):
+        return None
+
+    display_size = (preprocess_cfg.display_width, preprocess_cfg.display_height) if preprocess_cfg.display_width else None
+    preprocessor = FramePreprocessor(
+        inference_size = preprocess_cfg.get("inference_size") or inference_size,
+        display_size = display_size,
+        color_conversion = preprocess_cfg.color_conversion,
+        pool_size = pool_size
+    )
+    return preprocessor
+
+
+
+# Returns the multi-camera input: one bare source per entry of `io.multi.cameras`, each entry overrides the section of its source.
+def _build_multi_camera_input(io_cfg: Any, class_names: Optional[List[str]] = None, inference_size: Optional[int] = None, backlog_size: int = 1) -> MultiCameraInput:
+    multi_cfg = io_cfg.multi
+
+    sources: Dict[str, VisionInput] = {}
+    preprocessors: Dict[str, FramePreprocessor] = {}
+    default_policies: List[str] = []
+
+    for camera_cfg in multi_cfg.cameras:
+        # e.g. {id: down, source: camera, device_id: 1} -> io.camera.device_id = 1
+        child_cfg = ConfigBox(io_cfg.to_dict())
+        child_cfg.source = camera_cfg.source
+        overrides = {key: value for key, value in camera_cfg.items() if key not in ("id", "source")}
+        child_cfg[camera_cfg.source] = {**child_cfg.get(camera_cfg.source, {}), **overrides}
+
+        source, default_policy = _build_source(child_cfg, class_names)
+        source.source_id = camera_cfg.id
+        sources[camera_cfg.id] = source
+        default_policies.append(default_policy)
+
+        # Consumer-side preprocessing: the delivered frames + the one being prepared.
+        preprocessor = _build_preprocessor(io_cfg, inference_size, pool_size = 1 + backlog_size)
+        if preprocessor:
+            preprocessors[camera_cfg.id] = preprocessor
+
+    # Live cameras in the set: stale frames are useless, else every frame must be processed.
+    policy = multi_cfg.get("policy") or (LATEST_FRAME_WINS if LATEST_FRAME_WINS in default_policies else LOSSLESS)
+
+    multi_input = MultiCameraInput(
+        sources = sources,
+        primary_id = multi_cfg.get("primary"),
+        policy = policy,
+        sync_timeout = multi_cfg.sync_timeout,
+        preprocessors = preprocessors
+    )
+    return multi_input
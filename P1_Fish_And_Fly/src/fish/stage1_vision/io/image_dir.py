@@ -0,0 +1,60 @@
+import os
+import cv2
+from typing import List
+
+from src.common.logging import logger
+from src.fish.stage1_vision.io.base import VisionInput
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class ImageDirectoryInput(VisionInput):
+    """
+    Streams the images of a directory as frames, in sorted file name order.
+    """
+    def __init__(self, image_dir: str, loop: bool = False):
+        self.image_dir = image_dir
+        self.loop = loop
+        self.source_id = f"images:{image_dir}"
+        self.image_paths: List[str] = []
+        self.index: int = 0
+
+
+    def start(self):
+        logger.info(f"ImageDirectoryInput -> start(): dir = {self.image_dir}")
+
+        if not os.path.isdir(self.image_dir):
+            logger.info("ImageDirectoryInput -> start(): Unable to open image directory")
+            raise RuntimeError("Unable to open image directory")
+
+        self.image_paths = sorted(
+            os.path.join(self.image_dir, name) for name in os.listdir(self.image_dir) if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.index = 0
+        logger.info(f"ImageDirectoryInput -> start(): images found = {len(self.image_paths)}")
+
+
+    def read(self):
+        while self.image_paths:
+            if self.index >= len(self.image_paths):
+                if not self.loop:
+                    return None
+                self.index = 0
+
+            image_path = self.image_paths[self.index]
+            self.index += 1
+
+            frame = cv2.imread(image_path)
+            if frame is None:
+                logger.info(f"ImageDirectoryInput -> read(): Unable to read image, skipped: {image_path}")
+                continue
+
+            return self._make_packet(frame)
+
+        return None
+
+
+    def stop(self):
+        logger.info(f"ImageDirectoryInput -> stop(): images read = {self.index}")
+        self.image_paths = []
@@ -0,0 +1,184 @@
+# Aim: Read several vision sources (forward camera, down-looking camera, ...) in parallel and deliver synchronized frame batches.
+
+import threading
+from typing import Dict, List, Optional
+
+from src.common.logging import logger
+from src.fish.stage1_vision.io.base import VisionInput
+from src.fish.stage1_vision.io.entity import FramePacket, FrameBatch
+from src.fish.stage1_vision.io.preprocess import FramePreprocessor
+from src.fish.stage1_vision.io.prefetcher import LATEST_FRAME_WINS, LOSSLESS
+
+
+class MultiCameraInput(VisionInput):
+    """
+    Multiplexes N vision sources into one stream of FrameBatch.
+
+    Every source is read by its own thread into a 1-slot mailbox, so the cameras are decoded concurrently.
+    `read()` waits until every camera has a fresh frame and returns them together, tagged by camera id.
+    The stream ends as soon as one of the sources ends (frames already waiting in every mailbox are still delivered).
+    """
+    def __init__(
+        self,
+        sources: Dict[str, VisionInput],
+        primary_id: Optional[str] = None,
+        policy: str = LATEST_FRAME_WINS,
+        sync_timeout: float = 1.0,
+        preprocessors: Optional[Dict[str, FramePreprocessor]] = None
+    ):
+        if not sources:
+            raise ValueError("MultiCameraInput needs at least one source")
+        if policy not in (LATEST_FRAME_WINS, LOSSLESS):
+            raise ValueError(f"Unknown multi-camera policy: {policy}")
+
+        self.sources = sources
+        self.camera_ids: List[str] = list(sources.keys())
+        self.primary_id: str = primary_id if primary_id in sources else self.camera_ids[0]
+        self.policy: str = policy
+        self.sync_timeout: float = sync_timeout
+        self.preprocessors: Dict[str, FramePreprocessor] = preprocessors or {}        # applied on the consumer side, only to delivered frames
+        self.source_id = "multi:" + ",".join(self.camera_ids)
+
+        self._slots: Dict[str, Optional[FramePacket]] = {camera_id: None for camera_id in self.camera_ids}
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running: bool = False
+        self._ended: Optional[str] = None                   # id of the first camera whose stream ended
+        self._error: Optional[BaseException] = None
+
+        # Counters
+        self.dropped_frames: Dict[str, int] = {camera_id: 0 for camera_id in self.camera_ids}
+        self.partial_batches: int = 0                       # batches delivered without every camera (sync timeout)
+        self.max_skew: float = 0.0
+
+
+    def start(self):
+        logger.info(f"MultiCameraInput -> start(): cameras = {self.camera_ids}, primary = {self.primary_id}, policy = {self.policy}")
+
+        self._running = True
+        self._ended = None
+        for camera_id, source in self.sources.items():
+            source.start()
+            thread = threading.Thread(target = self._read_loop, args = (camera_id, source), name = f"vision-camera-{camera_id}", daemon = True)
+            self._threads.append(thread)
+
+        for thread in self._threads:
+            thread.start()
+
+
+    def _read_loop(self, camera_id: str, source: VisionInput):
+        """
+        Camera thread: keeps the mailbox of the camera filled with its latest frame.
+        """
+        try:
+            while self._running:
+                packet = source.read()
+
+                with self._cond:
+                    if packet is None:
+                        self._ended = self._ended or camera_id
+                        self._cond.notify_all()
+                        return
+
+                    if self.policy == LOSSLESS:
+                        while self._running and self._slots[camera_id] is not None:
+                            self._cond.wait()
+                        if not self._running:
+                            return
+
+                    elif self._slots[camera_id] is not None:
+                        self.dropped_frames[camera_id] += 1
+
+                    self._slots[camera_id] = packet
+                    self._cond.notify_all()
+
+
+        except Exception as e:
+            logger.info(f"Error occurred in MultiCameraInput -> read_loop(): camera = {camera_id}, error: {e}")
+            with self._cond:
+                self._error = e
+                self._ended = self._ended or camera_id
+                self._cond.notify_all()
+
+
+    def read(self) -> Optional[FrameBatch]:
+        """
+        Returns:
+            synchronized frame batch (FrameBatch) or None if one of the streams ended (or the input is stopped).
+            After `sync_timeout` seconds, the batch is delivered with the cameras which are ready; with no camera ready, it keeps waiting.
+        """
+        with self._cond:
+            all_ready = lambda: self._ended is not None or all(slot is not None for slot in self._slots.values())
+            any_ready = lambda: self._ended is not None or not self._running or any(slot is not None for slot in self._slots.values())
+            self._cond.wait_for(all_ready, timeout = self.sync_timeout)
+
+            # No camera delivered within `sync_timeout` (slow start, brief stall): keep waiting, only the end of a stream returns None.
+            while not any_ready():
+                self._cond.wait_for(any_ready, timeout = self.sync_timeout)
+
+            if self._error is not None:
+                raise RuntimeError(f"MultiCameraInput: camera thread failed: {self._error}")
+
+            # Frames already in every mailbox are still delivered, before reporting the end of the stream.
+            if self._ended is not None and self._slots[self._ended] is None:
+                logger.info(f"MultiCameraInput -> read(): stream of camera '{self._ended}' ended")
+                return None
+
+            packets = {camera_id: slot for camera_id, slot in self._slots.items() if slot is not None}
+            if not packets:
+                return None                                 # stopped
+
+            for camera_id in packets:
+                self._slots[camera_id] = None
+            self._cond.notify_all()                         # wakes up the camera threads waiting in LOSSLESS mode
+
+        if len(packets) < len(self.camera_ids):
+            self.partial_batches += 1
+
+        # Preprocessing only the delivered frames.
+        for camera_id, packet in packets.items():
+            preprocessor = self.preprocessors.get(camera_id)
+            if preprocessor is not None:
+                packet.scaled = preprocessor.prepare(packet.frame)
+
+        timestamps = [packet.timestamp for packet in packets.values()]
+        skew = max(timestamps) - min(timestamps)
+        self.max_skew = max(self.max_skew, skew)
+
+        self._sequence += 1
+        batch = FrameBatch(
+            packets = packets,
+            sequence = self._sequence,
+            timestamp = min(timestamps),
+            source_id = self.source_id,
+            primary_id = self.primary_id,
+            skew = skew
+        )
+        return batch
+
+
+    def get_stats(self) -> dict:
+        """
+        Provides the multiplexer counters.
+        """
+        return {
+            "batches": self._sequence,
+            "partial_batches": self.partial_batches,
+            "dropped_frames": dict(self.dropped_frames),
+            "max_skew_ms": round(self.max_skew * 1000.0, 3)
+        }
+
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout = self.sync_timeout)
+        self._threads = []
+
+        for source in self.sources.values():
+            source.stop()
+
+        logger.info(f"MultiCameraInput -> stop(): stopped, stats: {self.get_stats()}")
@@ -0,0 +1,159 @@
+# Aim: Overlap frame decoding with inference, by reading the wrapped vision source on a background thread.
+
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+from src.common.logging import logger
+from src.fish.stage1_vision.io.base import VisionInput
+from src.fish.stage1_vision.io.entity import FramePacket
+
+
+# Buffer policies supported by the prefetcher.
+LATEST_FRAME_WINS = "latest"                # live cameras: keep only the freshest frames, drop the oldest ones.
+LOSSLESS = "lossless"                       # video files: never drop a frame, block the decode thread when buffer is full.
+
+
+class PrefetchedInput(VisionInput):
+    """
+    Prefetching wrapper around any VisionInput.
+
+    A background thread keeps calling `source.read()` and pushes decoded frames into a bounded ring buffer,
+    so decoding of the next frame overlaps with the inference of the current frame in the main loop.
+    """
+    def __init__(self, source: VisionInput, buffer_size: int = 4, policy: str = LATEST_FRAME_WINS, read_timeout: float = 5.0):
+        if policy not in (LATEST_FRAME_WINS, LOSSLESS):
+            raise ValueError(f"Unknown prefetch policy: {policy}")
+
+        self.source = source
+        self.source_id = source.source_id
+        self.buffer_size: int = max(1, int(buffer_size))
+        self.policy: str = policy
+        self.read_timeout: float = read_timeout
+
+        self._buffer: Deque[FramePacket] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running: bool = False
+        self._stream_ended: bool = False
+        self._error: Optional[BaseException] = None
+
+        # Counters
+        self.decoded_frames: int = 0                # frames decoded by the background thread
+        self.delivered_frames: int = 0              # frames handed over to the consumer
+        self.dropped_frames: int = 0                # frames discarded because the buffer was full (LATEST_FRAME_WINS only)
+        self.late_frames: int = 0                   # read() calls which found the buffer empty and had to wait for decoding
+        self.stalls: int = 0                        # `read_timeout` periods without any frame (camera stall)
+
+
+    def start(self):
+        logger.info(f"PrefetchedInput -> start(): policy = {self.policy}, buffer_size = {self.buffer_size}")
+        self.source.start()
+
+        self._running = True
+        self._stream_ended = False
+        self._thread = threading.Thread(target = self._decode_loop, name = "vision-prefetch", daemon = True)
+        self._thread.start()
+
+
+    def _decode_loop(self):
+        """
+        Background thread: decodes frames from the wrapped source into the ring buffer.
+        """
+        try:
+            while self._running:
+                packet = self.source.read()
+
+                with self._cond:
+                    if packet is None:
+                        self._stream_ended = True
+                        self._cond.notify_all()
+                        return
+
+                    self.decoded_frames += 1
+
+                    if self.policy == LOSSLESS:
+                        # Wait for the consumer to make room in the buffer.
+                        while self._running and len(self._buffer) >= self.buffer_size:
+                            self._cond.wait()
+                        if not self._running:
+                            return
+
+                    elif len(self._buffer) >= self.buffer_size:
+                        # Drop the oldest frame, the freshest frame wins.
+                        self._buffer.popleft()
+                        self.dropped_frames += 1
+
+                    self._buffer.append(packet)
+                    self._cond.notify_all()
+
+
+        except Exception as e:
+            logger.info(f"Error occurred in PrefetchedInput -> decode_loop(): {e}")
+            with self._cond:
+                self._error = e
+                self._stream_ended = True
+                self._cond.notify_all()
+
+
+    def read(self) -> Optional[FramePacket]:
+        """
+        Returns:
+            next frame packet from the buffer, or None if the stream ended (or the input is stopped). A stall keeps waiting.
+            With LATEST_FRAME_WINS, frames older than the freshest one are dropped (visible as gaps in `sequence`).
+        """
+        with self._cond:
+            if not self._buffer and not self._stream_ended:
+                self.late_frames += 1
+
+            # A camera stall is not the end of the stream: keep waiting, logging every `read_timeout` seconds without a frame.
+            while not self._buffer and not self._stream_ended and self._running:
+                if not self._cond.wait_for(lambda: self._buffer or self._stream_ended or not self._running, timeout = self.read_timeout):
+                    self.stalls += 1
+                    logger.info(f"PrefetchedInput -> read(): no frame for {self.read_timeout} s, source: {self.source_id}, stalls: {self.stalls}")
+
+            if not self._buffer:
+                if self._error is not None:
+                    raise RuntimeError(f"PrefetchedInput: decode thread failed: {self._error}")
+                return None                         # stream ended, or stopped
+
+            if self.policy == LATEST_FRAME_WINS:
+                # Consumer is slower than the camera, only the latest frame is relevant.
+                while len(self._buffer) > 1:
+                    self._buffer.popleft()
+                    self.dropped_frames += 1
+
+            packet = self._buffer.popleft()
+            self.delivered_frames += 1
+            self._cond.notify_all()                 # wakes up the decode thread waiting in LOSSLESS mode
+
+        return packet
+
+
+    def get_stats(self) -> dict:
+        """
+        Provides the prefetcher counters.
+        """
+        with self._cond:
+            return {
+                "decoded_frames": self.decoded_frames,
+                "delivered_frames": self.delivered_frames,
+                "dropped_frames": self.dropped_frames,
+                "late_frames": self.late_frames,
+                "stalls": self.stalls,
+                "buffered_frames": len(self._buffer)
+            }
+
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout = self.read_timeout)
+            self._thread = None
+
+        self.source.stop()
+        self._buffer.clear()
+        logger.info(f"PrefetchedInput -> stop(): stopped, stats: {self.get_stats()}")
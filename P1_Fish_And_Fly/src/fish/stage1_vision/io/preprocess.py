@@ -0,0 +1,161 @@
+# Aim: Downscale (and colour convert) every captured frame only once, in the input layer.
+# Without it, Ultralytics resizes the full-resolution frame to `inference.imgsz` and the Visualizer resizes it again to 640x480.
+
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+
+from src.common.logging import logger
+from src.fish.stage1_vision.io.base import VisionInput
+from src.fish.stage1_vision.io.entity import ScaledFrame, FramePacket
+
+
+# Colour conversions applied at capture time, resulting frames are BGR (expected by YOLO and OpenCV).
+# With "none", frames keep the channel layout of the source (e.g. a grayscale source stays 1-channel).
+COLOR_CONVERSIONS = {
+    "none": None,
+    "rgb2bgr": cv2.COLOR_RGB2BGR,
+    "gray2bgr": cv2.COLOR_GRAY2BGR
+}
+
+
+class FramePreprocessor:
+    """
+    Produces the inference frame and the display frame of a captured frame, in reused preallocated buffers.
+
+    Buffers are allocated once per source resolution and channel layout, as a pool of `pool_size` sets used round-robin,
+    so frames which are still held by a prefetch buffer are not overwritten.
+    """
+    def __init__(self, inference_size: Optional[int], display_size: Optional[Tuple[int, int]], color_conversion: str = "none", pool_size: int = 2):
+        if color_conversion not in COLOR_CONVERSIONS:
+            raise ValueError(f"Unknown colour conversion: {color_conversion}")
+
+        self.inference_size = inference_size                            # longest side of the inference frame
+        self.display_size = display_size                                # (width, height) of the display frame
+        self.color_code = COLOR_CONVERSIONS[color_conversion]
+        self.pool_size: int = max(1, int(pool_size))
+
+        self._source_shape: Optional[Tuple[int, ...]] = None           # (height, width) + (channels,) of the source frame, () if 2-D
+        self._inference_buffers: List[np.ndarray] = []
+        self._display_buffers: List[np.ndarray] = []
+        self._resize_buffers: List[np.ndarray] = []                     # intermediate buffers, used before colour conversion
+        self._next: int = 0
+
+
+    def _allocate(self, src_h: int, src_w: int, channels: int):
+        """
+        Allocates the buffer pool for the given source resolution.
+        Output buffers are BGR after a colour conversion, otherwise they keep the source layout (`np.copyto` needs the same shape).
+        """
+        if self.inference_size:
+            ratio = self.inference_size / max(src_h, src_w)
+            self.infer_w = max(1, round(src_w * ratio))
+            self.infer_h = max(1, round(src_h * ratio))
+        else:
+            self.infer_w, self.infer_h = src_w, src_h
+
+        extra_dims = () if channels == 1 else (channels,)
+        output_dims = (3,) if self.color_code is not None else extra_dims
+        self._inference_buffers = [np.empty((self.infer_h, self.infer_w) + output_dims, dtype = np.uint8) for _ in range(self.pool_size)]
+
+        if self.display_size:
+            disp_w, disp_h = self.display_size
+            self._display_buffers = [np.empty((disp_h, disp_w) + output_dims, dtype = np.uint8) for _ in range(self.pool_size)]
+
+        self._resize_buffers = []
+        if self.color_code is not None:
+            self._resize_buffers = [np.empty((self.infer_h, self.infer_w) + extra_dims, dtype = np.uint8)]
+            if self.display_size:
+                self._resize_buffers.append(np.empty((self.display_size[1], self.display_size[0]) + extra_dims, dtype = np.uint8))
+
+        self._source_shape = (src_h, src_w) + extra_dims
+        logger.info(f"FramePreprocessor -> allocate(): source = {src_w}x{src_h}x{channels}, inference = {self.infer_w}x{self.infer_h}, display = {self.display_size}")
+
+
+    def _resize_into(self, frame: np.ndarray, dst: np.ndarray, scratch: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Resizes (and colour converts) the frame into the preallocated destination buffer.
+        """
+        dst_h, dst_w = dst.shape[:2]
+        same_size = frame.shape[0] == dst_h and frame.shape[1] == dst_w
+
+        if self.color_code is None:
+            if same_size:
+                np.copyto(dst, frame)
+            else:
+                cv2.resize(frame, (dst_w, dst_h), dst = dst, interpolation = cv2.INTER_AREA)
+            return dst
+
+        if same_size:
+            cv2.cvtColor(frame, self.color_code, dst = dst)
+        else:
+            cv2.resize(frame, (dst_w, dst_h), dst = scratch, interpolation = cv2.INTER_AREA)
+            cv2.cvtColor(scratch, self.color_code, dst = dst)
+        return dst
+
+
+    def prepare(self, frame: np.ndarray) -> ScaledFrame:
+        """
+        Prepares the inference and display frames of the captured frame.
+
+        :param self: Belongs to the FramePreprocessor class.
+        :param frame: Captured frame, full source resolution.
+        :type frame: np.ndarray
+        :return: Original frame with its pre-scaled views and scale factors.
+        :rtype: ScaledFrame
+        """
+        if frame.ndim == 3 and frame.shape[2] == 1:                     # (h, w, 1) grayscale, as OpenCV returns it: 2-D like cv2.resize
+            frame = frame[:, :, 0]
+
+        src_h, src_w = frame.shape[:2]
+        if self._source_shape != frame.shape:
+            self._allocate(src_h, src_w, 1 if frame.ndim == 2 else frame.shape[2])
+
+        slot = self._next
+        self._next = (self._next + 1) % self.pool_size
+
+        inference_image = self._resize_into(frame, self._inference_buffers[slot], self._resize_buffers[0] if self._resize_buffers else None)
+        inference_scale = (self.infer_w / src_w, self.infer_h / src_h)
+
+        display_image = None
+        display_scale = (1.0, 1.0)
+        if self.display_size:
+            display_image = self._resize_into(frame, self._display_buffers[slot], self._resize_buffers[-1] if self._resize_buffers else None)
+            display_scale = (self.display_size[0] / src_w, self.display_size[1] / src_h)
+
+        scaled_frame = ScaledFrame(
+            inference_image = inference_image,
+            inference_scale = inference_scale,
+            display_image = display_image,
+            display_scale = display_scale
+        )
+        return scaled_frame
+
+
+
+class PreprocessedInput(VisionInput):
+    """
+    Wraps any VisionInput, attaches the pre-scaled views (ScaledFrame) to every frame packet.
+    """
+    def __init__(self, source: VisionInput, preprocessor: FramePreprocessor):
+        self.source = source
+        self.source_id = source.source_id
+        self.preprocessor = preprocessor
+
+
+    def start(self):
+        logger.info(f"PreprocessedInput -> start(): source = {type(self.source).__name__}")
+        self.source.start()
+
+
+    def read(self) -> Optional[FramePacket]:
+        packet = self.source.read()
+        if packet is None:
+            return None
+
+        packet.scaled = self.preprocessor.prepare(packet.frame)
+        return packet
+
+
+    def stop(self):
+        self.source.stop()
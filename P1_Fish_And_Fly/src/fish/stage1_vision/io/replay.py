@@ -0,0 +1,144 @@
+# Aim: Record per-frame detections once, and replay them later without running YOLO.
+# Replay lets us benchmark the Aggregator, Decision and Mission planner on their own, and compare runs.
+
+# File format: JSON lines, one line per frame.
+# {"frame": 1, "timestamp": 12.345678, "detections": [{"class_id": 1, "class_name": "plastic", "confidence": 0.8, "bbox": [x1, y1, x2, y2], "track_id": 3}]}
+# "timestamp": capture time of the frame (monotonic seconds), absent in older recordings.
+
+import os
+import json
+import time
+import numpy as np
+from typing import List, Optional, TextIO, Union
+
+from src.common.logging import logger
+from src.fish.stage1_vision.io.base import VisionInput
+from src.fish.stage1_vision.entity import Detection, DetectionBatch
+
+
+class DetectionReplayInput(VisionInput):
+    """
+    Replays a recorded per-frame detections file.
+
+    `read()` returns a packet with a blank placeholder frame (no decoding) and the recorded detections of that frame.
+    Packets keep the recorded capture clock (shifted to start at the replay start), so idle time, track age and EMA confidence
+    do not depend on the replay speed. Recordings without timestamps are stamped at replay time.
+    """
+    def __init__(self, detections_path: str, frame_width: int = 1920, frame_height: int = 1080):
+        self.detections_path = detections_path
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.source_id = f"replay:{detections_path}"
+
+        self._file: Optional[TextIO] = None
+        self._blank_frame: Optional[np.ndarray] = None
+        self.frame_count: int = 0
+        self._clock_offset: Optional[float] = None                  # replay start - first recorded capture time
+
+
+    def start(self):
+        logger.info(f"DetectionReplayInput -> start(): path = {self.detections_path}")
+
+        if not os.path.isfile(self.detections_path):
+            logger.info("DetectionReplayInput -> start(): Unable to open detections file")
+            raise RuntimeError("Unable to open detections file")
+
+        self._file = open(self.detections_path, "r")
+        self._blank_frame = np.zeros((self.frame_height, self.frame_width, 3), dtype = np.uint8)
+        self.frame_count = 0
+        self._clock_offset = None
+
+
+    def read(self):
+        if self._file is None:
+            return None
+
+        line = self._file.readline()
+        while line and not line.strip():                            # skipping blank lines
+            line = self._file.readline()
+
+        if not line:
+            return None
+
+        record = json.loads(line)
+        detections = [
+            Detection(
+                class_id = int(det["class_id"]),
+                class_name = det["class_name"],
+                confidence = float(det["confidence"]),
+                bbox = [int(v) for v in det["bbox"]],
+                track_id = det.get("track_id"),
+                camera_id = det.get("camera_id")
+            )
+            for det in record.get("detections", [])
+        ]
+
+        # Recorded capture time, on the monotonic clock of this run.
+        timestamp = record.get("timestamp")
+        if timestamp is not None:
+            if self._clock_offset is None:
+                self._clock_offset = time.monotonic() - float(timestamp)
+            timestamp = float(timestamp) + self._clock_offset
+
+        self.frame_count += 1
+        return self._make_packet(self._blank_frame, detections = detections, timestamp = timestamp)
+
+
+    def stop(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            logger.info(f"DetectionReplayInput -> stop(): replayed frames = {self.frame_count}")
+
+
+
+class DetectionRecorder:
+    """
+    Records per-frame detections into a JSON lines file, readable by DetectionReplayInput.
+    """
+    def __init__(self, output_path: str):
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok = True)
+
+        self.output_path = output_path
+        self._file: TextIO = open(output_path, "w")
+        self.frame_count: int = 0
+
+
+    def record(self, detections: Union[List[Detection], DetectionBatch], timestamp: Optional[float] = None):
+        """
+        Appends the detections of 1 frame to the recording.
+
+        :param self: Belongs to the DetectionRecorder class.
+        :param detections: Detections of the current frame.
+        :type detections: Union[List[Detection], DetectionBatch]
+        :param timestamp: Capture time of the frame (`FramePacket.timestamp`), replayed by DetectionReplayInput.
+        :type timestamp: Optional[float]
+        """
+        if isinstance(detections, DetectionBatch):
+            detections = detections.to_detections()
+
+        self.frame_count += 1
+        record = {
+            "frame": self.frame_count,
+            "timestamp": round(timestamp, 6) if timestamp is not None else None,
+            "detections": [
+                {
+                    "class_id": det.class_id,
+                    "class_name": det.class_name,
+                    "confidence": round(det.confidence, 4),
+                    "bbox": list(det.bbox),
+                    "track_id": det.track_id,
+                    "camera_id": det.camera_id
+                }
+                for det in detections
+            ]
+        }
+        self._file.write(json.dumps(record) + "\n")
+
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            logger.info(f"DetectionRecorder -> close(): recorded frames = {self.frame_count}, path = {self.output_path}")
@@ -0,0 +1,180 @@
+# Aim: Synthetic vision source, renders moving debris blobs procedurally (no video files needed).
+# Used for load-testing and benchmarking the full Vision -> Decision -> Action loop at high frame rates.
+
+import time
+import cv2
+import numpy as np
+from typing import List, Optional
+
+from src.common.logging import logger
+from src.fish.stage1_vision.io.base import VisionInput
+from src.fish.stage1_vision.entity import Detection
+
+
+class SimulatorInput(VisionInput):
+    """
+    Procedurally rendered frames of floating debris.
+
+    Every debris blob has a ground-truth box and a track id, which are exposed through `get_ground_truth()`,
+    and attached to the frame packet as detections when `emit_detections` is enabled.
+    Blobs drift with a constant velocity, a blob leaving the frame is respawned with a new track id.
+    """
+    def __init__(
+        self,
+        width: int = 1920,
+        height: int = 1080,
+        fps: float = 30.0,
+        num_objects: int = 8,
+        min_size: int = 20,
+        max_size: int = 120,
+        max_speed: float = 6.0,
+        max_frames: Optional[int] = None,
+        realtime: bool = False,
+        emit_detections: bool = False,
+        seed: Optional[int] = None,
+        class_names: Optional[List[str]] = None
+    ):
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = float(fps)
+        self.num_objects = int(num_objects)
+        self.min_size = int(min_size)
+        self.max_size = int(max_size)
+        self.max_speed = float(max_speed)
+        self.max_frames = max_frames
+        self.realtime = realtime
+        self.emit_detections = emit_detections                  # ground truth replaces YOLO detections
+        self.source_id = "sim"
+        self.seed = seed
+        self.class_names: List[str] = list(class_names) if class_names else ["debris"]
+
+        self.rng = np.random.default_rng(seed)
+        self.frame_index: int = 0
+        self.next_track_id: int = 1
+        self._next_frame_time: float = 0.0
+
+        # Blob state, one row per blob (struct of arrays).
+        self.centers = np.zeros((self.num_objects, 2), dtype = np.float32)
+        self.velocities = np.zeros((self.num_objects, 2), dtype = np.float32)
+        self.sizes = np.zeros((self.num_objects, 2), dtype = np.float32)
+        self.class_ids = np.zeros(self.num_objects, dtype = np.int32)
+        self.track_ids = np.zeros(self.num_objects, dtype = np.int64)
+        self.colors = np.zeros((self.num_objects, 3), dtype = np.uint8)
+
+        self._background: Optional[np.ndarray] = None
+        self._ground_truth: List[Detection] = []
+        self._started: bool = False
+
+
+    def start(self):
+        logger.info(f"SimulatorInput -> start(): resolution = {self.width}x{self.height}, fps = {self.fps}, objects = {self.num_objects}")
+
+        self.rng = np.random.default_rng(self.seed)
+        self.frame_index = 0
+        self.next_track_id = 1
+
+        # Water-like vertical gradient, rendered once and reused as background of every frame.
+        gradient = np.linspace(0.0, 1.0, self.height, dtype = np.float32)[:, None]
+        background = np.empty((self.height, self.width, 3), dtype = np.uint8)
+        background[..., 0] = (120 + 80 * gradient).astype(np.uint8)            # B
+        background[..., 1] = (90 + 50 * gradient).astype(np.uint8)             # G
+        background[..., 2] = (30 + 20 * gradient).astype(np.uint8)             # R
+        self._background = background
+
+        for idx in range(self.num_objects):
+            self._spawn(idx)
+
+        self._next_frame_time = time.perf_counter()
+        self._started = True
+
+
+    def _spawn(self, idx: int):
+        """
+        (Re)spawns the blob at index `idx` at a random position, with a new track id.
+        """
+        self.sizes[idx] = self.rng.uniform(self.min_size, self.max_size, size = 2)
+        self.centers[idx] = (self.rng.uniform(0, self.width), self.rng.uniform(0, self.height))
+        self.velocities[idx] = self.rng.uniform(-self.max_speed, self.max_speed, size = 2)
+        self.class_ids[idx] = self.rng.integers(0, len(self.class_names))
+        self.colors[idx] = self.rng.integers(0, 256, size = 3)
+        self.track_ids[idx] = self.next_track_id
+        self.next_track_id += 1
+
+
+    def read(self):
+        """
+        Returns:
+            frame packet (FramePacket) or None if `max_frames` is reached
+        """
+        if not self._started:
+            return None
+
+        if self.max_frames is not None and self.frame_index >= self.max_frames:
+            return None
+
+        # Keeping the configured frame rate, when running in real time.
+        if self.realtime and self.fps > 0:
+            delay = self._next_frame_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_frame_time = max(self._next_frame_time, time.perf_counter()) + 1.0 / self.fps
+
+        # 1. Moving all blobs at once, respawning those which left the frame.
+        self.centers += self.velocities
+        half = self.sizes / 2.0
+        outside = (
+            (self.centers[:, 0] + half[:, 0] < 0) | (self.centers[:, 0] - half[:, 0] > self.width) |
+            (self.centers[:, 1] + half[:, 1] < 0) | (self.centers[:, 1] - half[:, 1] > self.height)
+        )
+        for idx in np.flatnonzero(outside):
+            self._spawn(idx)
+
+        # 2. Rendering the frame and the ground truth boxes.
+        frame = self._background.copy()                     # new buffer, frames may still be held by a prefetch buffer
+
+        half = self.sizes / 2.0
+        boxes = np.concatenate([self.centers - half, self.centers + half], axis = 1)
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, self.width - 1)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, self.height - 1)
+        boxes = boxes.astype(np.int32)
+
+        ground_truth: List[Detection] = []
+        for idx in range(self.num_objects):
+            x1, y1, x2, y2 = boxes[idx].tolist()
+            if x2 <= x1 or y2 <= y1:
+                continue
+
+            center = (int(self.centers[idx, 0]), int(self.centers[idx, 1]))
+            axes = (max(int(half[idx, 0]), 1), max(int(half[idx, 1]), 1))
+            cv2.ellipse(frame, center, axes, 0, 0, 360, self.colors[idx].tolist(), -1)
+
+            class_id = int(self.class_ids[idx])
+            ground_truth.append(
+                Detection(
+                    class_id = class_id,
+                    class_name = self.class_names[class_id],
+                    confidence = 1.0,
+                    bbox = [x1, y1, x2, y2],
+                    track_id = int(self.track_ids[idx])
+                )
+            )
+
+        self._ground_truth = ground_truth
+        self.frame_index += 1
+        return self._make_packet(frame, detections = ground_truth if self.emit_detections else None)
+
+
+    def get_ground_truth(self) -> List[Detection]:
+        """
+        Provides the ground-truth boxes and track ids of the last rendered frame.
+
+        :param self: Belongs to the SimulatorInput class.
+        :return: List of ground-truth detections of the last frame.
+        :rtype: List[Detection]
+        """
+        return self._ground_truth
+
+
+    def stop(self):
+        self._started = False
+        logger.info(f"SimulatorInput -> stop(): rendered frames = {self.frame_index}")
@@ -6,6 +6,7 @@ from src.fish.stage1_vision.io.base import VisionInput
 class VideoInput(VisionInput):
     def __init__(self, video_path: str):
         self.video_path = video_path
+        self.source_id = f"video:{video_path}"
         self.cap = None
 
 
@@ -23,7 +24,7 @@ class VideoInput(VisionInput):
         if not ret:
             return None
         
-        return frame
+        return self._make_packet(frame)
     
 
     def stop(self):
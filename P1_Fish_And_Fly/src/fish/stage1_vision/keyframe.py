@@ -0,0 +1,215 @@
+# Aim: Run YOLO only on keyframes (every K frames, or on scene change), and propagate the tracked boxes in between.
+
+import math
+import cv2
+import numpy as np
+from typing import Dict, List, Optional
+from box import ConfigBox
+
+from src.common.logging import logger
+from src.fish.stage1_vision.entity import Detection
+from src.fish.stage1_vision.io.entity import FramePacket
+
+
+
+class MotionPredictor:
+    """
+    Constant-velocity predictor of the boxes seen on the latest keyframe.
+
+    Velocity of every track is estimated (in pixels per second, capture time) from its boxes on 2 consecutive keyframes.
+    """
+    def __init__(self, smoothing: float = 0.5):
+        self.smoothing = smoothing                                  # EMA factor of the velocity
+        self.detections: Dict[int, Detection] = {}                  # track id -> detection on the latest keyframe
+        self.velocities: Dict[int, np.ndarray] = {}                 # track id -> (vx1, vy1, vx2, vy2) pixels / second
+        self.keyframe_time: float = 0.0
+
+
+    def update(self, detections: List[Detection], timestamp: float):
+        """
+        Resets the predictor to the detections of a new keyframe, tracks missing from it are dropped.
+
+        :param self: Belongs to the MotionPredictor class.
+        :param detections: Detections of the keyframe.
+        :type detections: List[Detection]
+        :param timestamp: Capture time of the keyframe.
+        :type timestamp: float
+        """
+        elapsed = timestamp - self.keyframe_time
+        detections_by_id: Dict[int, Detection] = {}
+        velocities: Dict[int, np.ndarray] = {}
+
+        for det in detections:
+            if det.track_id is None:
+                continue
+
+            detections_by_id[det.track_id] = det
+            previous = self.detections.get(det.track_id)
+            if previous is None or elapsed <= 0:
+                velocities[det.track_id] = np.zeros(4, dtype = np.float32)
+                continue
+
+            velocity = (np.asarray(det.bbox, dtype = np.float32) - np.asarray(previous.bbox, dtype = np.float32)) / elapsed
+            old_velocity = self.velocities.get(det.track_id)
+            if old_velocity is not None:
+                velocity = self.smoothing * velocity + (1.0 - self.smoothing) * old_velocity
+            velocities[det.track_id] = velocity
+
+        self.detections = detections_by_id
+        self.velocities = velocities
+        self.keyframe_time = timestamp
+
+
+    def predict(self, timestamp: float) -> List[Detection]:
+        """
+        Provides the boxes of the keyframe tracks, moved to the capture time of the current frame.
+
+        :param self: Belongs to the MotionPredictor class.
+        :param timestamp: Capture time of the current frame.
+        :type timestamp: float
+        :return: Predicted detections (`predicted = True`).
+        :rtype: List[Detection]
+        """
+        elapsed = timestamp - self.keyframe_time
+        predictions: List[Detection] = []
+
+        for track_id, det in self.detections.items():
+            bbox = np.asarray(det.bbox, dtype = np.float32) + self.velocities[track_id] * elapsed
+            x1, y1, x2, y2 = np.maximum(bbox, 0).astype(int).tolist()
+            if x2 <= x1 or y2 <= y1:
+                continue
+
+            predictions.append(
+                Detection(
+                    class_id = det.class_id,
+                    class_name = det.class_name,
+                    confidence = det.confidence,
+                    bbox = [x1, y1, x2, y2],
+                    track_id = track_id,
+                    camera_id = det.camera_id,
+                    predicted = True
+                )
+            )
+
+        return predictions
+
+
+
+class KeyframeScheduler:
+    """
+    Decides which frames go through YOLO.
+
+    A frame is a keyframe when:
+        - K frames passed since the last keyframe, K adapts to the measured inference latency: K = ceil(latency / frame period),
+          i.e. YOLO on 1 frame out of K keeps up with the feed.
+        - the scene changed more than `scene_change_threshold` (mean absolute difference of small grayscale thumbnails).
+    """
+    def __init__(self, keyframe_cfg: ConfigBox):
+        self.interval: int = keyframe_cfg.interval                                  # current K
+        self.min_interval: int = keyframe_cfg.min_interval
+        self.max_interval: int = keyframe_cfg.max_interval
+        self.scene_change_threshold: float = keyframe_cfg.scene_change_threshold
+        self.thumbnail_size: int = keyframe_cfg.thumbnail_size
+        self.frame_budget_ms: Optional[float] = keyframe_cfg.get("frame_budget_ms")   # if set, replaces the measured frame period
+        self.smoothing: float = 0.2
+
+        self.frames_since_keyframe: int = 0
+        self.keyframe_thumbnail: Optional[np.ndarray] = None
+        self.last_timestamp: Optional[float] = None
+        self.frame_period_ms: Optional[float] = None                                # EMA of the capture interval
+        self.inference_ms: Optional[float] = None                                   # EMA of the keyframe inference latency
+
+        # Counters
+        self.keyframes: int = 0
+        self.scene_changes: int = 0
+        self.predicted_frames: int = 0
+
+
+    def should_detect(self, packet: FramePacket) -> bool:
+        """
+        Checks if YOLO must run on the frame.
+
+        :param self: Belongs to the KeyframeScheduler class.
+        :param packet: Current frame packet.
+        :type packet: FramePacket
+        :return: True for a keyframe.
+        :rtype: bool
+        """
+        self._update_frame_period(packet.timestamp)
+        self.frames_since_keyframe += 1
+        thumbnail = self._thumbnail(packet)
+
+        is_keyframe = self.keyframe_thumbnail is None or self.frames_since_keyframe >= self.interval
+        if not is_keyframe:
+            scene_change = float(np.mean(cv2.absdiff(thumbnail, self.keyframe_thumbnail)))
+            if scene_change > self.scene_change_threshold:
+                is_keyframe = True
+                self.scene_changes += 1
+                logger.info(f"KeyframeScheduler -> should_detect(): scene change: {scene_change:.2f}, keyframe forced")
+
+        if is_keyframe:
+            self.frames_since_keyframe = 0
+            self.keyframe_thumbnail = thumbnail
+            self.keyframes += 1
+        else:
+            self.predicted_frames += 1
+
+        return is_keyframe
+
+
+    def record_latency(self, inference_ms: float):
+        """
+        Updates the inference latency, and adapts K to it.
+
+        :param self: Belongs to the KeyframeScheduler class.
+        :param inference_ms: Inference latency of the last keyframe, in milliseconds.
+        :type inference_ms: float
+        """
+        if self.inference_ms is None:
+            self.inference_ms = inference_ms
+        else:
+            self.inference_ms += self.smoothing * (inference_ms - self.inference_ms)
+
+        frame_period_ms = self.frame_budget_ms or self.frame_period_ms
+        if not frame_period_ms:
+            return
+
+        interval = math.ceil(self.inference_ms / frame_period_ms)
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        if interval != self.interval:
+            logger.info(f"KeyframeScheduler -> record_latency(): K: {self.interval} -> {interval}, inference = {self.inference_ms:.1f} ms, frame period = {frame_period_ms:.1f} ms")
+            self.interval = interval
+
+
+    def get_stats(self) -> dict:
+        """
+        Provides the keyframing counters.
+        """
+        return {
+            "interval": self.interval,
+            "keyframes": self.keyframes,
+            "scene_changes": self.scene_changes,
+            "predicted_frames": self.predicted_frames,
+            "inference_ms": round(self.inference_ms, 3) if self.inference_ms is not None else None
+        }
+
+
+    def _update_frame_period(self, timestamp: float):
+        if self.last_timestamp is not None and timestamp > self.last_timestamp:
+            period_ms = (timestamp - self.last_timestamp) * 1000.0
+            if self.frame_period_ms is None:
+                self.frame_period_ms = period_ms
+            else:
+                self.frame_period_ms += self.smoothing * (period_ms - self.frame_period_ms)
+        self.last_timestamp = timestamp
+
+
+    def _thumbnail(self, packet: FramePacket) -> np.ndarray:
+        """
+        Small grayscale view of the frame, used to measure the scene change.
+        """
+        image = packet.scaled.inference_image if packet.scaled is not None else packet.frame
+        thumbnail = cv2.resize(image, (self.thumbnail_size, self.thumbnail_size), interpolation = cv2.INTER_AREA)
+        if thumbnail.ndim == 3:
+            thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+        return thumbnail
@@ -0,0 +1,83 @@
+# Aim: Process-wide registry of YOLO models: every weight file is loaded once, warmed up once, and shared by all the pipelines.
+
+import time
+import threading
+import numpy as np
+from typing import Dict, Optional, Set, Tuple
+
+from ultralytics import YOLO
+from src.common.logging import logger
+
+
+
+class ModelRegistry:
+    """
+    Loads each model (weights path + task) once, and hands out the same shared handle.
+
+    NOTE: A shared model must not keep per-caller state: tracking is done by the explicit trackers of `GarbageTracker`,
+    not by `model.track()` (which keeps 1 tracker inside the model predictor).
+    """
+    def __init__(self):
+        self._models: Dict[Tuple[str, Optional[str]], YOLO] = {}
+        self._warmed_up: Set[Tuple[int, int]] = set()                     # (model id, imgsz)
+        self._lock = threading.Lock()
+
+
+    def get_model(self, model_path: str, task: Optional[str] = None) -> YOLO:
+        """
+        Provides the shared model of the weights, loads it on the first request.
+
+        :param self: Belongs to the ModelRegistry class.
+        :param model_path: Path of the weights (.pt) or of the exported model.
+        :type model_path: str
+        :param task: YOLO task, required for exported models (e.g. "detect").
+        :type task: Optional[str]
+        :return: Shared YOLO model.
+        :rtype: YOLO
+        """
+        key = (str(model_path), task)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                start = time.perf_counter()
+                model = YOLO(str(model_path), task = task) if task else YOLO(str(model_path))
+                self._models[key] = model
+                logger.info(f"ModelRegistry -> get_model(): loaded {model_path} in {(time.perf_counter() - start) * 1000.0:.1f} ms")
+            else:
+                logger.info(f"ModelRegistry -> get_model(): shared model: {model_path}")
+
+        return model
+
+
+    def warm_up(self, model: YOLO, imgsz: int, runs: int = 1):
+        """
+        Runs inference on blank frames, so the lazy initialisation (predictor setup, runtime allocation, kernels selection)
+        happens at startup instead of on the first real frame. Done once per model and inference size.
+
+        :param self: Belongs to the ModelRegistry class.
+        :param model: Model to warm up.
+        :type model: YOLO
+        :param imgsz: Inference size.
+        :type imgsz: int
+        :param runs: Number of warm-up inferences.
+        :type runs: int
+        """
+        key = (id(model), int(imgsz))
+        with self._lock:
+            if runs <= 0 or key in self._warmed_up:
+                return
+
+            blank_frame = np.zeros((int(imgsz), int(imgsz), 3), dtype = np.uint8)
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                model.predict(blank_frame, imgsz = int(imgsz), verbose = False)
+                timings.append(round((time.perf_counter() - start) * 1000.0, 1))
+
+            self._warmed_up.add(key)
+            logger.info(f"ModelRegistry -> warm_up(): imgsz = {imgsz}, warm-up latencies (ms): {timings}")
+
+
+
+# Process-wide registry.
+model_registry = ModelRegistry()
@@ -0,0 +1,369 @@
+# Aim: In-project ByteTrack-style tracker on NumPy arrays: vectorized IoU, batched Kalman filter, Hungarian / greedy assignment.
+
+import numpy as np
+from typing import Tuple
+from box import ConfigBox
+
+from src.common.logging import logger
+
+try:
+    from scipy.optimize import linear_sum_assignment                # optimal assignment, if SciPy is installed
+except ImportError:
+    linear_sum_assignment = None
+
+
+# Track states
+TRACKED = 0
+LOST = 1
+
+# Kalman filter on (center x, center y, aspect ratio w/h, height) + velocities, same noise model as ByteTrack.
+STD_WEIGHT_POSITION = 1.0 / 20
+STD_WEIGHT_VELOCITY = 1.0 / 160
+MOTION_MATRIX = np.eye(8, dtype = np.float64)
+MOTION_MATRIX[:4, 4:] = np.eye(4)
+
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    IoU matrix of 2 sets of boxes (x1, y1, x2, y2).
+
+    :param boxes_a: Boxes, shape (N, 4).
+    :type boxes_a: np.ndarray
+    :param boxes_b: Boxes, shape (M, 4).
+    :type boxes_b: np.ndarray
+    :return: IoU, shape (N, M).
+    :rtype: np.ndarray
+    """
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype = np.float64)
+
+    # 2-D (N, M) arrays per coordinate, computed in place.
+    width = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    width -= np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    np.maximum(width, 0.0, out = width)
+    height = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    height -= np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    np.maximum(height, 0.0, out = height)
+    intersection = width
+    intersection *= height
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :]
+    union -= intersection
+    np.maximum(union, 1e-9, out = union)
+    return intersection / union
+
+
+
+def assign(cost: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Matches rows to columns of a cost matrix, pairs costing more than `threshold` are never matched.
+    Hungarian algorithm (SciPy) if available, else greedy: cheapest pairs first.
+
+    :param cost: Cost matrix, shape (N, M).
+    :type cost: np.ndarray
+    :param threshold: Maximum cost of a match.
+    :type threshold: float
+    :return: Matched row indices, matched column indices.
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    empty = np.empty(0, dtype = int)
+    if cost.size == 0:
+        return empty, empty
+
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(np.where(cost > threshold, threshold + 1e5, cost))
+        keep = cost[rows, cols] <= threshold
+        return rows[keep], cols[keep]
+
+    # Greedy: only the candidate pairs (sparse for IoU costs) are sorted and scanned.
+    rows, cols = np.nonzero(cost <= threshold)
+    order = np.argsort(cost[rows, cols], kind = "stable")
+    row_used = np.zeros(cost.shape[0], dtype = bool)
+    col_used = np.zeros(cost.shape[1], dtype = bool)
+    matched_rows, matched_cols = [], []
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row_used[row] or col_used[col]:
+            continue
+        row_used[row] = col_used[col] = True
+        matched_rows.append(row)
+        matched_cols.append(col)
+
+    return np.asarray(matched_rows, dtype = int), np.asarray(matched_cols, dtype = int)
+
+
+
+class NativeTracker:
+    """
+    ByteTrack-style multi-object tracker, without appearance features.
+
+    Tracks are kept as arrays (struct of arrays), 1 row per track: Kalman mean / covariance, id, state, score, class, frames.
+    Every step of a frame (predict, IoU cost, Kalman update) is vectorized over all the tracks.
+
+    Association, per frame:
+        1. high-score detections ↔ confirmed tracks (tracked + lost), cost = 1 - IoU (× score if `fuse_score`).
+        2. low-score detections ↔ confirmed tracks still unmatched and tracked (recovers occluded / blurred objects).
+        3. remaining high-score detections ↔ unconfirmed tracks (seen on 1 frame only), unmatched ones are dropped.
+        4. remaining detections above `new_track_thresh` → new (unconfirmed) tracks, confirmed at once on the 1st frame (returned too).
+        5. lost tracks older than `track_buffer` frames (at 30 fps) are removed.
+        6. duplicates: a tracked and a lost track overlapping with IoU > 0.85, the one with the shorter history is removed.
+
+    `update()` takes and returns the same arrays as the ultralytics trackers, so `GarbageTracker` uses both the same way.
+    """
+    def __init__(self, native_cfg: ConfigBox, frame_rate: int = 30, first_id: int = 1):
+        self.track_high_thresh: float = native_cfg.track_high_thresh
+        self.track_low_thresh: float = native_cfg.track_low_thresh
+        self.new_track_thresh: float = native_cfg.new_track_thresh
+        self.match_thresh: float = native_cfg.match_thresh
+        self.fuse_score: bool = native_cfg.fuse_score
+        self.max_time_lost: int = int(frame_rate / 30.0 * native_cfg.track_buffer)
+
+        self.frame_id: int = 0
+        self.first_id: int = first_id                                       # > 1 after a resume: ids of the previous run are not reused
+        self.next_id: int = first_id
+
+        # Tracks (1 row per track)
+        self.mean = np.zeros((0, 8), dtype = np.float64)                   # Kalman state (cx, cy, a, h, vx, vy, va, vh)
+        self.covariance = np.zeros((0, 8, 8), dtype = np.float64)
+        self.track_ids = np.zeros(0, dtype = np.int64)
+        self.states = np.zeros(0, dtype = np.int8)                          # TRACKED / LOST
+        self.activated = np.zeros(0, dtype = bool)                          # confirmed (matched on 2 frames, or born on the 1st frame)
+        self.scores = np.zeros(0, dtype = np.float64)
+        self.classes = np.zeros(0, dtype = np.float64)
+        self.last_frame = np.zeros(0, dtype = np.int64)                     # last frame the track was matched
+        self.start_frame = np.zeros(0, dtype = np.int64)                    # frame the track was born
+        self.matched_det = np.zeros(0, dtype = np.int64)                    # detection index matched on the current frame, -1: none
+
+
+    def update(self, detections: np.ndarray, img = None) -> np.ndarray:
+        """
+        Tracks the detections of 1 frame.
+
+        :param self: Belongs to the NativeTracker class.
+        :param detections: Detections, shape (N, 6): x1, y1, x2, y2, confidence, class id.
+        :type detections: np.ndarray
+        :param img: Unused (no appearance features), kept for the ultralytics tracker signature.
+        :return: Confirmed tracks matched (or born, 1st frame) on this frame, shape (M, 8): x1, y1, x2, y2, track id, score, class id, detection index.
+        :rtype: np.ndarray
+        """
+        self.frame_id += 1
+        detections = np.asarray(detections, dtype = np.float64).reshape(-1, 6)
+        boxes, scores = detections[:, :4], detections[:, 4]
+
+        self._predict()
+
+        # Detection indices, split by score
+        high = np.nonzero(scores >= self.track_high_thresh)[0]
+        low = np.nonzero((scores > self.track_low_thresh) & (scores < self.track_high_thresh))[0]
+
+        track_boxes = self._track_boxes()
+        track_count = len(self.track_ids)
+        matched_det = np.full(track_count, -1, dtype = np.int64)           # track row -> matched detection index
+
+        # 1. High-score detections <-> confirmed tracks
+        confirmed = np.nonzero(self.activated)[0]
+        rows, cols = self._associate(track_boxes[confirmed], boxes[high], scores[high], self.match_thresh, self.fuse_score)
+        matched_det[confirmed[rows]] = high[cols]
+        high_left = np.delete(high, cols)
+
+        # 2. Low-score detections <-> confirmed tracks still unmatched and tracked
+        remaining = confirmed[(matched_det[confirmed] < 0) & (self.states[confirmed] == TRACKED)]
+        rows, cols = self._associate(track_boxes[remaining], boxes[low], scores[low], 0.5, False)
+        matched_det[remaining[rows]] = low[cols]
+
+        # 3. Remaining high-score detections <-> unconfirmed tracks
+        unconfirmed = np.nonzero(~self.activated)[0]
+        rows, cols = self._associate(track_boxes[unconfirmed], boxes[high_left], scores[high_left], 0.7, self.fuse_score)
+        matched_det[unconfirmed[rows]] = high_left[cols]
+        high_left = np.delete(high_left, cols)
+
+        # Matched tracks: Kalman update, re-activated if lost
+        matched = np.nonzero(matched_det >= 0)[0]
+        if len(matched):
+            self._kalman_update(matched, self._to_xyah(boxes[matched_det[matched]]))
+            self.states[matched] = TRACKED
+            self.activated[matched] = True
+            self.scores[matched] = scores[matched_det[matched]]
+            self.classes[matched] = detections[matched_det[matched], 5]
+            self.last_frame[matched] = self.frame_id
+
+        # Unmatched tracks: confirmed ones get lost, unconfirmed ones are dropped; lost for too long are removed
+        unmatched = matched_det < 0
+        self.states[unmatched & self.activated] = LOST
+        keep = ~(unmatched & ~self.activated) & (self.frame_id - self.last_frame <= self.max_time_lost)
+
+        self.matched_det = matched_det
+        self._compact(keep)
+
+        # 4. New tracks
+        new = high_left[scores[high_left] >= self.new_track_thresh]
+        if len(new):
+            self._add_tracks(detections[new], new)
+
+        # 6. Duplicates between tracked and lost tracks
+        self._remove_duplicates()
+
+        return self._output()
+
+
+    def reset(self):
+        """
+        Drops all the tracks, ids restart from `first_id` (the thresholds are kept).
+        """
+        self.frame_id = 0
+        self.next_id = self.first_id
+        self._compact(np.zeros(len(self.track_ids), dtype = bool))
+        logger.info("NativeTracker -> reset(): tracks cleared")
+
+
+    def _associate(self, track_boxes: np.ndarray, det_boxes: np.ndarray, det_scores: np.ndarray, threshold: float, fuse_score: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Matches tracks to detections on the IoU cost. Returns matched track rows, matched detection rows (local indices).
+        """
+        similarity = box_iou(track_boxes, det_boxes)
+        if fuse_score and similarity.size:
+            similarity = similarity * det_scores[None, :]
+        return assign(1.0 - similarity, threshold)
+
+
+    def _remove_duplicates(self):
+        """
+        Tracked / lost pairs of tracks with IoU > 0.85 (1 - IoU < 0.15): the track with the shorter history is removed (ultralytics
+        `remove_duplicate_stracks`), so a re-detected object does not keep 2 ids.
+        """
+        tracked = np.nonzero(self.states == TRACKED)[0]
+        lost = np.nonzero(self.states == LOST)[0]
+        if len(tracked) == 0 or len(lost) == 0:
+            return
+
+        boxes = self._track_boxes()
+        pairs_tracked, pairs_lost = np.nonzero(1.0 - box_iou(boxes[tracked], boxes[lost]) < 0.15)
+        if len(pairs_tracked) == 0:
+            return
+
+        history = self.last_frame - self.start_frame
+        tracked_rows, lost_rows = tracked[pairs_tracked], lost[pairs_lost]
+        tracked_longer = history[tracked_rows] > history[lost_rows]
+        keep = np.ones(len(self.track_ids), dtype = bool)
+        keep[lost_rows[tracked_longer]] = False
+        keep[tracked_rows[~tracked_longer]] = False
+        self._compact(keep)
+
+
+    def _output(self) -> np.ndarray:
+        """
+        Rows of the confirmed tracks matched (or born confirmed) on this frame, in the ultralytics layout.
+        """
+        rows = np.nonzero((self.matched_det >= 0) & self.activated)[0]
+        output = np.zeros((len(rows), 8), dtype = np.float64)
+        if len(rows) == 0:
+            return output
+
+        output[:, :4] = self._to_xyxy(self.mean[rows, :4])
+        output[:, 4] = self.track_ids[rows]
+        output[:, 5] = self.scores[rows]
+        output[:, 6] = self.classes[rows]
+        output[:, 7] = self.matched_det[rows]
+        return output
+
+
+    def _add_tracks(self, detections: np.ndarray, det_indices: np.ndarray):
+        """
+        Starts 1 track per detection (`det_indices`: their indices in the frame). Tracks born on the 1st frame are confirmed at once.
+        """
+        count = len(detections)
+        measurement = self._to_xyah(detections[:, :4])
+        height = measurement[:, 3]
+
+        mean = np.zeros((count, 8), dtype = np.float64)
+        mean[:, :4] = measurement
+        std = np.stack([
+            2 * STD_WEIGHT_POSITION * height, 2 * STD_WEIGHT_POSITION * height, np.full(count, 1e-2), 2 * STD_WEIGHT_POSITION * height,
+            10 * STD_WEIGHT_VELOCITY * height, 10 * STD_WEIGHT_VELOCITY * height, np.full(count, 1e-5), 10 * STD_WEIGHT_VELOCITY * height
+        ], axis = 1)
+        covariance = np.zeros((count, 8, 8), dtype = np.float64)
+        covariance[:, np.arange(8), np.arange(8)] = std ** 2
+
+        self.mean = np.concatenate([self.mean, mean])
+        self.covariance = np.concatenate([self.covariance, covariance])
+        self.track_ids = np.concatenate([self.track_ids, np.arange(self.next_id, self.next_id + count, dtype = np.int64)])
+        self.states = np.concatenate([self.states, np.full(count, TRACKED, dtype = np.int8)])
+        self.activated = np.concatenate([self.activated, np.full(count, self.frame_id == 1)])
+        self.scores = np.concatenate([self.scores, detections[:, 4]])
+        self.classes = np.concatenate([self.classes, detections[:, 5]])
+        self.last_frame = np.concatenate([self.last_frame, np.full(count, self.frame_id, dtype = np.int64)])
+        self.start_frame = np.concatenate([self.start_frame, np.full(count, self.frame_id, dtype = np.int64)])
+        self.matched_det = np.concatenate([self.matched_det, np.asarray(det_indices, dtype = np.int64)])
+        self.next_id += count
+
+
+    def _compact(self, keep: np.ndarray):
+        self.mean = self.mean[keep]
+        self.covariance = self.covariance[keep]
+        self.track_ids = self.track_ids[keep]
+        self.states = self.states[keep]
+        self.activated = self.activated[keep]
+        self.scores = self.scores[keep]
+        self.classes = self.classes[keep]
+        self.last_frame = self.last_frame[keep]
+        self.start_frame = self.start_frame[keep]
+        self.matched_det = self.matched_det[keep]
+
+
+    def _predict(self):
+        """
+        Kalman prediction of all the tracks (lost tracks stop growing / shrinking).
+        """
+        if len(self.track_ids) == 0:
+            return
+
+        self.mean[self.states != TRACKED, 7] = 0.0
+        height = self.mean[:, 3]
+        count = len(height)
+        std = np.stack([
+            STD_WEIGHT_POSITION * height, STD_WEIGHT_POSITION * height, np.full(count, 1e-2), STD_WEIGHT_POSITION * height,
+            STD_WEIGHT_VELOCITY * height, STD_WEIGHT_VELOCITY * height, np.full(count, 1e-5), STD_WEIGHT_VELOCITY * height
+        ], axis = 1)
+
+        self.mean = self.mean @ MOTION_MATRIX.T
+        self.covariance = MOTION_MATRIX @ self.covariance @ MOTION_MATRIX.T
+        self.covariance[:, np.arange(8), np.arange(8)] += std ** 2
+
+
+    def _kalman_update(self, rows: np.ndarray, measurement: np.ndarray):
+        """
+        Kalman correction of the given tracks with their matched measurements (cx, cy, a, h).
+        """
+        mean = self.mean[rows]
+        covariance = self.covariance[rows]
+        height = mean[:, 3]
+        std = np.stack([STD_WEIGHT_POSITION * height, STD_WEIGHT_POSITION * height, np.full(len(rows), 1e-1), STD_WEIGHT_POSITION * height], axis = 1)
+
+        projected_cov = covariance[:, :4, :4].copy()
+        projected_cov[:, np.arange(4), np.arange(4)] += std ** 2
+        cross_cov = covariance[:, :, :4]                                                        # P Hᵀ
+        gain = np.linalg.solve(projected_cov, cross_cov.transpose(0, 2, 1)).transpose(0, 2, 1)  # P Hᵀ S⁻¹ (S symmetric)
+
+        innovation = measurement - mean[:, :4]
+        self.mean[rows] = mean + np.einsum("tij,tj->ti", gain, innovation)
+        self.covariance[rows] = covariance - gain @ projected_cov @ gain.transpose(0, 2, 1)
+
+
+    def _track_boxes(self) -> np.ndarray:
+        return self._to_xyxy(self.mean[:, :4])
+
+
+    @staticmethod
+    def _to_xyah(boxes: np.ndarray) -> np.ndarray:
+        width = boxes[:, 2] - boxes[:, 0]
+        height = np.maximum(boxes[:, 3] - boxes[:, 1], 1e-6)
+        return np.stack([(boxes[:, 0] + boxes[:, 2]) / 2.0, (boxes[:, 1] + boxes[:, 3]) / 2.0, width / height, height], axis = 1)
+
+
+    @staticmethod
+    def _to_xyxy(xyah: np.ndarray) -> np.ndarray:
+        width = xyah[:, 2] * xyah[:, 3]
+        half = np.stack([width / 2.0, xyah[:, 3] / 2.0], axis = 1)
+        return np.concatenate([xyah[:, :2] - half, xyah[:, :2] + half], axis = 1)
@@ -1,4 +1,6 @@
-from typing import List
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Union
 from box import ConfigBox
 
 from src.common.logging import logger
@@ -6,7 +8,17 @@ from src.common.logging import logger
 from src.fish.stage1_vision.tracker import GarbageTracker
 from src.fish.stage1_vision.detector import GarbageDetector
 from src.fish.stage1_vision.aggregator import GarbageAggregator
-from src.fish.stage1_vision.entity import Detection, TrackedGarbage
+from src.common.logging.garbage_csv_logger import GarbageCSVLogger
+from src.fish.stage1_vision.keyframe import KeyframeScheduler, MotionPredictor
+from src.fish.stage1_vision.roi import RoiController
+from src.fish.stage1_vision.resolution import ResolutionController
+from src.fish.stage1_vision.entity import Detection, DetectionBatch, TrackedGarbage, TrackedState, NO_TRACK
+from src.fish.stage1_vision.io.replay import DetectionRecorder
+from src.fish.stage1_vision.io.entity import FramePacket, FrameBatch
+
+
+# Multi-camera: track ids of the k-th camera are moved to [k * TRACK_ID_STRIDE, (k+1) * TRACK_ID_STRIDE), so the cameras never share an id.
+TRACK_ID_STRIDE = 1_000_000
 
 
 
@@ -22,48 +34,370 @@ class VisionPipeline:
 
         self.detector = GarbageDetector(self.infer_config)
         self.tracker = GarbageTracker(self.tracker_config)
-        self.aggregator = GarbageAggregator(self.aggregator_config)
+
+        # Evicted aggregation records are spilled to the outcome log.
+        eviction_cfg = self.aggregator_config.get("eviction")
+        spill_logger = GarbageCSVLogger() if eviction_cfg and eviction_cfg.enabled and eviction_cfg.spill else None
+        self.aggregator = GarbageAggregator(self.aggregator_config, spill_logger = spill_logger)
+
+        # Recording per-frame detections, to replay them later without inference.
+        record_path = vision_cfg.io.get("record_detections")
+        self.recorder: Optional[DetectionRecorder] = DetectionRecorder(record_path) if record_path else None
+
+        # Frame sequence bookkeeping, gaps in the sequence are frames dropped before reaching the pipeline.
+        self.last_sequence: Optional[int] = None
+        self.skipped_frames: int = 0
+
+        # Tiled inference on the original frame (small debris at high resolution).
+        tiling_cfg = self.infer_config.get("tiling")
+        self.tiling_enabled: bool = bool(tiling_cfg and tiling_cfg.enabled)
+
+        # ROI mode: while a target is locked, inference runs on a crop around it.
+        roi_cfg = vision_cfg.get("roi")
+        self.roi: Optional[RoiController] = RoiController(roi_cfg) if roi_cfg and roi_cfg.enabled else None
+
+        # Adaptive resolution: imgsz of every frame picked from a ladder (latency budget + scene state).
+        resolution_cfg = vision_cfg.get("resolution")
+        self.resolution: Optional[ResolutionController] = ResolutionController(resolution_cfg, self.infer_config.imgsz) if resolution_cfg and resolution_cfg.enabled else None
+        self.last_active_count: int = 0
+        if self.resolution:
+            for imgsz in self.resolution.ladder:                                   # every rung is warm before its first frame
+                self.detector.warm_up(imgsz)
+
+        # Keyframing: YOLO runs only on keyframes, boxes are motion-predicted in between.
+        keyframe_cfg = vision_cfg.get("keyframing")
+        self.keyframer: Optional[KeyframeScheduler] = KeyframeScheduler(keyframe_cfg) if keyframe_cfg and keyframe_cfg.enabled else None
+        self.motion_predictor = MotionPredictor()
+
+        # Multi-camera: index of every camera, in order of appearance (used to namespace the track ids).
+        self.camera_index: Dict[str, int] = {}
         logger.info(f"vision init(): vision cfg: {vision_cfg}")
 
 
 
-    def run(self, frame) -> List[TrackedGarbage]:
+    def run(self, packet: Union[FramePacket, FrameBatch]) -> List[TrackedGarbage]:
+        """
+        Runs inference on the frame packet and aggregates the detections.
+
+        :param self: Belongs to the VisionPipeline class.
+        :param packet: Frame packet received from the vision input. When the packet already carries detections (replay/simulation), YOLO inference is skipped.
+                       A FrameBatch (multi-camera input) is inferred in 1 batch, all cameras feed the same aggregator.
+        :type packet: Union[FramePacket, FrameBatch]
+        :return: List of active tracked garbage aggregations.
+        :rtype: List[TrackedGarbage]
+        """
         try:
-            logger.info("VisionPipeline-> run(): STARTS")
+            logger.info(f"VisionPipeline-> run(): STARTS, source: {packet.source_id}, sequence: {packet.sequence}")
+
+            self._check_sequence(packet)
+
+            if isinstance(packet, FrameBatch):
+                detections = self._detect_batch(packet)
+            else:
+                detections = packet.detections
+                if detections is None:
+                    detections = self._detect_keyframed(packet) if self.keyframer else self._detect(packet)
+
+            if self.recorder:
+                self.recorder.record(detections, timestamp = packet.timestamp)
+
+            # Creating tracked garbage aggregations, from the list of detections, using the capture time of the frame.
+            active_aggregations = self.aggregator.create_garbage_aggregations(detections = detections, timestamp = packet.timestamp)
+            self.last_active_count = len(active_aggregations)
+
+            logger.info("VisionPipeline-> run(): ENDS")
+            return active_aggregations
+
+
+        except Exception as e:
+            logger.info(f"Error occurred in VisionPipeline-> run(): {e}")  
+            raise e
+
+
 
+    def _check_sequence(self, packet: Union[FramePacket, FrameBatch]):
+        """
+        Counts the frames which were dropped between the source and the pipeline (gaps in the packet sequence).
+        """
+        if self.last_sequence is not None and packet.sequence > self.last_sequence + 1:
+            skipped = packet.sequence - self.last_sequence - 1
+            self.skipped_frames += skipped
+            logger.info(f"VisionPipeline-> run(): {skipped} frame(s) skipped before sequence {packet.sequence}, total skipped: {self.skipped_frames}")
+
+        self.last_sequence = packet.sequence
+
+
+
+    def _detect(self, packet: FramePacket) -> DetectionBatch:
+        """
+        Runs YOLO inference (DETECTION + TRACKING) on the frame, and converts the result into a columnar detection batch.
+
+        Detection boxes are always returned in the ORIGINAL frame coordinates.
+        """
+        try:
             # Loading the trained YOLO model
             detection_model = self.detector.detection_model
 
             # Creating tracker object
             garbage_tracker_obj = self.tracker
 
+            # ROI mode: crop around the locked target, or None for a full-frame pass.
+            region = self.roi.plan(packet, self.aggregator.get_objects_by_state(TrackedState.SELECTED)) if self.roi else None
+
+            # Adaptive resolution: inference size of this frame (tiles keep `inference.imgsz`).
+            imgsz = None
+            if self.resolution and (region is not None or not self.tiling_enabled):
+                imgsz = self.resolution.select(self.last_active_count, self._locked_target())
+            start = time.perf_counter()
+
             # Running Inference on this model
-            results = garbage_tracker_obj.infer_yolo_model(model = detection_model, frame = frame, infer_cfg = self.infer_config)
-            
+            if region is not None:
+                # Crop of the ORIGINAL frame, boxes come back in original coordinates.
+                x1, y1, x2, y2 = region
+                scale = (1.0, 1.0)
+                results = garbage_tracker_obj.infer_yolo_model_region(
+                    model = detection_model, frame = packet.frame, infer_frame = packet.frame[y1:y2, x1:x2],
+                    offset = (x1, y1), scale = (1.0, 1.0), infer_cfg = self.infer_config, stream_id = packet.source_id, imgsz = imgsz
+                )
+            elif self.tiling_enabled:
+                # Tiles are cut from the ORIGINAL frame, boxes come back in original coordinates.
+                scale = (1.0, 1.0)
+                results = garbage_tracker_obj.infer_yolo_model_tiled(model = detection_model, frame = packet.frame, infer_cfg = self.infer_config, stream_id = packet.source_id)
+            elif self.roi or self.resolution:
+                # Full-frame pass, tracked in original coordinates: same tracker for ROI passes, and for every inference size.
+                infer_frame, infer_scale = self._inference_view(packet, imgsz)
+                scale = (1.0, 1.0)
+                results = garbage_tracker_obj.infer_yolo_model_region(
+                    model = detection_model, frame = packet.frame, infer_frame = infer_frame,
+                    offset = (0, 0), scale = infer_scale, infer_cfg = self.infer_config, stream_id = packet.source_id, imgsz = imgsz
+                )
+            else:
+                infer_frame, scale = self._inference_view(packet)
+                results = garbage_tracker_obj.infer_yolo_model(model = detection_model, frame = infer_frame, infer_cfg = self.infer_config, stream_id = packet.source_id)
+
+            if imgsz is not None:
+                self.resolution.record_latency(imgsz, (time.perf_counter() - start) * 1000.0)
+
+            # 1 frame -> 1 result.
+            return self._to_detection_batch(results[0], scale)
+
+
+        except Exception as e:
+            logger.info(f"Error occurred in VisionPipeline-> detect(): {e}")  
+            raise e
+
+
+
+    def _detect_keyframed(self, packet: FramePacket) -> List[Detection]:
+        """
+        Runs YOLO on keyframes only, in between the boxes of the last keyframe are moved by the motion predictor.
+        """
+        if self.keyframer.should_detect(packet):
+            start = time.perf_counter()
+            detections = self._detect(packet).to_detections()
+            self.keyframer.record_latency((time.perf_counter() - start) * 1000.0)
+
+            self.motion_predictor.update(detections, packet.timestamp)
+            return detections
+
+        return self.motion_predictor.predict(packet.timestamp)
+
+
+
+    def _detect_batch(self, batch: FrameBatch) -> List[Detection]:
+        """
+        Runs YOLO inference on the frames of all cameras in 1 batch, and merges the detections.
+
+        Every detection is tagged with its camera id, track ids are namespaced per camera.
+        """
+        try:
+            detections_per_camera: Dict[str, List[Detection]] = {}
+
+            # Cameras whose detections are already known (simulation / replay) skip the inference.
+            infer_ids: List[str] = []
+            infer_frames = []
+            infer_scales: List[Tuple[float, float]] = []
+            for camera_id, packet in batch.packets.items():
+                if packet.detections is not None:
+                    detections_per_camera[camera_id] = packet.detections
+                    continue
+
+                infer_frame, scale = self._inference_view(packet)
+                infer_ids.append(camera_id)
+                infer_frames.append(infer_frame)
+                infer_scales.append(scale)
+
+            if infer_frames:
+                results = self.tracker.infer_yolo_model_batch(
+                    model = self.detector.detection_model,
+                    frames = infer_frames,
+                    infer_cfg = self.infer_config,
+                    stream_ids = infer_ids
+                )
+                for camera_id, result, scale in zip(infer_ids, results, infer_scales):
+                    detections_per_camera[camera_id] = self._to_detections(result, scale)
+
+            # Tagging the detections with their camera, moving track ids into the id range of the camera.
             detection_list: List[Detection] = []
+            for camera_id, detections in detections_per_camera.items():
+                offset = self.camera_index.setdefault(camera_id, len(self.camera_index)) * TRACK_ID_STRIDE
+                for det in detections:
+                    det.camera_id = camera_id
+                    if det.track_id is not None:
+                        det.track_id += offset
+                    detection_list.append(det)
 
-            # Processing the results from YOLO inference(DETECTION + TRACKING), to create list of detections.
-            for r in results:
-                boxes = r.boxes
-                for box in boxes:
-                    cls_id = int(box.cls[0])
-                    detection = Detection(
-                        class_id = cls_id,
-                        class_name = self.class_names[cls_id],
-                        confidence = float(box.conf[0]),
-                        bbox = list(map(int, box.xyxy[0])),
-                        track_id = int(box.id[0]) if box.id is not None else None
-                    )
+            return detection_list
 
-                    detection_list.append(detection)
 
-            # Creating tracked garbage aggregations, from the list of detections. 
-            active_aggregations = self.aggregator.create_garbage_aggregations(detections = detection_list)
+        except Exception as e:
+            logger.info(f"Error occurred in VisionPipeline-> detect_batch(): {e}")  
+            raise e
 
-            logger.info("VisionPipeline-> run(): ENDS")
-            return active_aggregations
+
+
+    def detect_backlog(self, packets: List[FramePacket]):
+        """
+        Runs YOLO inference on a backlog of frame packets (e.g. recorded video) in batched forward passes.
+
+        The detections are attached to the packets, so `run()` only aggregates them afterwards, frame by frame.
+        Tracking stays correct: every source has its own tracker, updated in frame order.
+        With ROI / tiling / adaptive resolution / keyframing, nothing is batched: their plan for a frame depends on the previous
+        frame (locked target, active count, keyframe schedule), so `run()` infers every packet through `_detect()`.
+
+        :param self: Belongs to the VisionPipeline class.
+        :param packets: Consecutive frame packets, oldest first.
+        :type packets: List[FramePacket]
+        """
+        try:
+            logger.info(f"VisionPipeline-> detect_backlog(): STARTS, backlog: {len(packets)} frames")
+
+            if self.roi or self.tiling_enabled or self.resolution or self.keyframer:
+                logger.info("VisionPipeline-> detect_backlog(): ENDS, ROI / tiling / resolution / keyframing enabled, frames are inferred 1 by 1 in run()")
+                return
+
+            pending = [packet for packet in packets if isinstance(packet, FramePacket) and packet.detections is None]
+            if not pending:
+                return
+
+            views = [self._inference_view(packet) for packet in pending]
+            results = self.tracker.infer_yolo_model_batch(
+                model = self.detector.detection_model,
+                frames = [infer_frame for infer_frame, _ in views],
+                infer_cfg = self.infer_config,
+                stream_ids = [packet.source_id for packet in pending]
+            )
+
+            for packet, result, (_, scale) in zip(pending, results, views):
+                packet.detections = self._to_detections(result, scale)
+
+            logger.info("VisionPipeline-> detect_backlog(): ENDS")
 
 
         except Exception as e:
-            logger.info(f"Error occurred in VisionPipeline-> run(): {e}")  
-            raise e
\ No newline at end of file
+            logger.info(f"Error occurred in VisionPipeline-> detect_backlog(): {e}")  
+            raise e
+
+
+
+    def _inference_view(self, packet: FramePacket, imgsz: Optional[int] = None) -> Tuple[object, Tuple[float, float]]:
+        """
+        Provides the frame to run YOLO on, and its scale relative to the original frame.
+        When `imgsz` is larger than the pre-scaled frame, the original frame is used (no upscaling of a downscaled frame).
+        """
+        # Using the pre-scaled inference frame, if prepared at capture time.
+        if packet.scaled is not None and (imgsz is None or imgsz <= max(packet.scaled.inference_image.shape[:2])):
+            return packet.scaled.inference_image, packet.scaled.inference_scale
+
+        return packet.frame, (1.0, 1.0)
+
+
+
+    def _locked_target(self) -> Optional[TrackedGarbage]:
+        """
+        Provides the locked (SELECTED) object of the aggregation memory, if any.
+        """
+        selected_objects = self.aggregator.get_objects_by_state(TrackedState.SELECTED)
+        return next(iter(selected_objects.values()), None)
+
+
+
+    def _to_detections(self, result, scale: Tuple[float, float]) -> List[Detection]:
+        """
+        Converts 1 YOLO result (DETECTION + TRACKING) into detections, boxes are mapped back to ORIGINAL frame coordinates.
+        """
+        return self._to_detection_batch(result, scale).to_detections()
+
+
+
+    def _to_detection_batch(self, result, scale: Tuple[float, float]) -> DetectionBatch:
+        """
+        Converts 1 YOLO result into a columnar detection batch: the result tensor is moved to NumPy ONCE, then sliced by column.
+        """
+        data = result.boxes.data.cpu().numpy()                  # [x1, y1, x2, y2, (track_id), conf, cls] per box
+        if len(data) == 0:
+            return DetectionBatch.empty(self.class_names)
+
+        scale_x, scale_y = scale
+        boxes = (data[:, :4] / np.array([scale_x, scale_y, scale_x, scale_y], dtype = np.float32)).astype(np.int32)     # inference frame -> original frame
+
+        is_track = data.shape[1] == 7
+        track_ids = data[:, 4].astype(np.int64) if is_track else np.full(len(data), NO_TRACK, dtype = np.int64)
+
+        detection_batch = DetectionBatch(
+            class_ids = data[:, -1].astype(np.int64),
+            confidences = data[:, -2].astype(np.float32),
+            boxes = boxes,
+            track_ids = track_ids,
+            class_names = self.class_names
+        )
+        return detection_batch
+
+
+
+    def snapshot_state(self) -> Dict[str, np.ndarray]:
+        """
+        Copies the state needed to resume the mission: aggregation memory and camera index (track id namespaces).
+        """
+        state = self.aggregator.snapshot_state()
+        state["camera_ids"] = np.asarray(list(self.camera_index), dtype = str)              # in index order
+        return state
+
+
+
+    def restore_state(self, state: Dict[str, np.ndarray]):
+        """
+        Resumes from a `snapshot_state()` copy.
+
+        The trackers of this run start their ids above every restored id (memory and done ids, per camera namespace):
+        a new track never takes the id of an object collected before the restart.
+        """
+        self.aggregator.restore_state(state)
+        self.camera_index = {camera_id: index for index, camera_id in enumerate(state["camera_ids"].tolist())}
+
+        done_ids = np.nonzero(np.unpackbits(state["done_ids"], bitorder = "little"))[0]
+        restored_ids = np.concatenate([state["record_track_id"], done_ids]).astype(np.int64)
+        if len(restored_ids):
+            self.tracker.first_track_id = max(self.tracker.first_track_id, int((restored_ids % TRACK_ID_STRIDE).max()) + 1)
+        logger.info(f"VisionPipeline -> restore_state(): cameras: {list(self.camera_index)}, first track id: {self.tracker.first_track_id}")
+
+
+
+    def close(self):
+        """
+        Releases the resources held by the pipeline.
+        """
+        if self.recorder:
+            self.recorder.close()
+
+        if self.keyframer:
+            logger.info(f"VisionPipeline-> close(): keyframing stats: {self.keyframer.get_stats()}")
+
+        if self.resolution:
+            logger.info(f"VisionPipeline-> close(): adaptive resolution stats: {self.resolution.get_stats()}")
+
+        if self.roi:
+            logger.info(f"VisionPipeline-> close(): ROI stats: {self.roi.get_stats()}")
+
+        if self.tiling_enabled:
+            logger.info(f"VisionPipeline-> close(): tiled inference stats: {self.tracker.get_tile_stats()}")
\ No newline at end of file
@@ -0,0 +1,142 @@
+# Aim: Pick the inference size (imgsz) of every frame from a ladder, using a latency budget and the scene state.
+
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from box import ConfigBox
+
+from src.common.logging import logger
+from src.fish.stage1_vision.entity import TrackedGarbage
+
+
+
+class ResolutionController:
+    """
+    Adaptive inference resolution.
+
+    Scene state gives the wanted rung of the ladder:
+        - empty water (no active object)                        → lowest rung
+        - crowded scene, or small locked target                 → highest rung
+        - otherwise                                             → default rung (`inference.imgsz`)
+    The latency budget caps it: the highest rung whose measured latency (EMA) fits the budget.
+    A rung never measured is estimated from a measured one (latency ~ imgsz²).
+    A rung excluded by the budget is probed again every `reprobe_frames` frames (1 frame), and the fresh measurement replaces its EMA:
+    a transient spike (warm-up, GC, thermal) does not remove it for the whole mission.
+    """
+    def __init__(self, resolution_cfg: ConfigBox, default_imgsz: int):
+        self.ladder: List[int] = sorted(int(size) for size in resolution_cfg.ladder)
+        self.latency_budget_ms: float = resolution_cfg.latency_budget_ms
+        self.crowded_objects: int = resolution_cfg.crowded_objects
+        self.small_target_px: int = resolution_cfg.small_target_px
+        self.smoothing: float = 0.2
+        self.reprobe_frames: int = resolution_cfg.get("reprobe_frames") or 150       # frames between 2 probes of a rung over budget
+
+        # Default rung: the configured imgsz, or the closest rung to it.
+        self.default_imgsz: int = min(self.ladder, key = lambda size: abs(size - default_imgsz))
+
+        self.latency_ms: Dict[int, float] = {}                                          # imgsz -> EMA of the inference latency
+        self.frames_per_size: Dict[int, int] = {size: 0 for size in self.ladder}
+        self.history: Deque[dict] = deque(maxlen = resolution_cfg.history_size)         # latest decisions, for tuning
+        self.frame_count: int = 0
+        self.current: Optional[dict] = None                                             # decision of the current frame
+        self.last_used: Dict[int, int] = {}                                             # imgsz -> latest frame inferred at that size
+        self.probing: Optional[int] = None                                              # size probed in the current frame
+
+
+    def select(self, active_count: int, target: Optional[TrackedGarbage] = None) -> int:
+        """
+        Picks the inference size of the current frame.
+
+        :param self: Belongs to the ResolutionController class.
+        :param active_count: Number of active objects in the previous frame.
+        :type active_count: int
+        :param target: Locked (SELECTED) target, if any.
+        :type target: Optional[TrackedGarbage]
+        :return: Inference size (imgsz).
+        :rtype: int
+        """
+        self.frame_count += 1
+
+        # 1. Scene state -> wanted size.
+        target_size = max(target.bbox[2] - target.bbox[0], target.bbox[3] - target.bbox[1]) if target is not None else None
+        if target_size is not None and target_size < self.small_target_px:
+            wanted, reason = self.ladder[-1], "small_target"
+        elif active_count >= self.crowded_objects:
+            wanted, reason = self.ladder[-1], "crowded"
+        elif active_count == 0 and target is None:
+            wanted, reason = self.ladder[0], "empty"
+        else:
+            wanted, reason = self.default_imgsz, "normal"
+
+        # 2. Latency budget -> largest affordable size.
+        affordable = [size for size in self.ladder if size <= wanted and self._expected_latency(size) <= self.latency_budget_ms]
+        imgsz = affordable[-1] if affordable else self.ladder[0]
+        if imgsz < wanted:
+            reason += "+budget"
+
+            # Re-probe: the next size up gets 1 frame once its measurement is `reprobe_frames` old.
+            above = self.ladder[self.ladder.index(imgsz) + 1]
+            self.probing = None
+            if above <= wanted and self.frame_count - self.last_used.get(above, 0) >= self.reprobe_frames:
+                imgsz, reason = above, reason + "+probe"
+                self.probing = above
+        else:
+            self.probing = None
+
+        self.current = {"frame": self.frame_count, "imgsz": imgsz, "wanted": wanted, "reason": reason, "active": active_count, "target_px": target_size, "latency_ms": None}
+        self.history.append(self.current)
+        self.frames_per_size[imgsz] += 1
+        self.last_used[imgsz] = self.frame_count
+
+        if len(self.history) < 2 or self.history[-2]["imgsz"] != imgsz:
+            logger.info(f"ResolutionController -> select(): imgsz = {imgsz}, wanted = {wanted}, reason = {reason}, active = {active_count}")
+        return imgsz
+
+
+    def record_latency(self, imgsz: int, latency_ms: float):
+        """
+        Records the measured inference latency of the current frame.
+
+        :param self: Belongs to the ResolutionController class.
+        :param imgsz: Inference size used.
+        :type imgsz: int
+        :param latency_ms: Measured inference latency, in milliseconds.
+        :type latency_ms: float
+        """
+        previous = self.latency_ms.get(imgsz)
+        if previous is None or self.probing == imgsz:
+            self.latency_ms[imgsz] = latency_ms                             # first or probe measurement: replaces a stale EMA
+            self.probing = None
+        else:
+            self.latency_ms[imgsz] = previous + self.smoothing * (latency_ms - previous)
+
+        if self.current is not None and self.current["imgsz"] == imgsz:
+            self.current["latency_ms"] = round(latency_ms, 3)
+
+
+    def get_history(self) -> List[dict]:
+        """
+        Provides the latest decisions (frame, imgsz, wanted size, reason, scene state, measured latency).
+        """
+        return list(self.history)
+
+
+    def get_stats(self) -> dict:
+        """
+        Provides frames and EMA latency per inference size.
+        """
+        return {
+            size: {"frames": self.frames_per_size[size], "latency_ms": round(self.latency_ms[size], 3) if size in self.latency_ms else None}
+            for size in self.ladder
+        }
+
+
+    def _expected_latency(self, imgsz: int) -> float:
+        if imgsz in self.latency_ms:
+            return self.latency_ms[imgsz]
+
+        if not self.latency_ms:
+            return 0.0                                                      # nothing measured yet: every size is allowed once
+
+        # Estimating from the closest measured size, latency grows with the number of pixels.
+        measured = min(self.latency_ms, key = lambda size: abs(size - imgsz))
+        return self.latency_ms[measured] * (imgsz / measured) ** 2
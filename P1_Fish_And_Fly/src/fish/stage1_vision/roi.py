@@ -0,0 +1,122 @@
+# Aim: While a target is locked (SELECTED), run inference only on a crop around it, with a full-frame pass every N frames.
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+from box import ConfigBox
+
+from src.common.logging import logger
+from src.fish.stage1_vision.entity import TrackedGarbage, TrackedState
+from src.fish.stage1_vision.io.entity import FramePacket
+
+
+
+class RoiController:
+    """
+    Plans the inference region of every frame.
+
+    - No locked target, or every `full_frame_interval` frames → full frame (discovers new objects).
+    - Else → square crop of the ORIGINAL frame around the predicted box of the locked target.
+      The crop is resized to `imgsz` by YOLO, so the target is inferred at a higher effective resolution.
+    """
+    def __init__(self, roi_cfg: ConfigBox):
+        self.full_frame_interval: int = roi_cfg.full_frame_interval
+        self.context_scale: float = roi_cfg.context_scale                       # crop side = context_scale * longest side of the target box
+        self.min_crop_size: int = roi_cfg.min_crop_size
+        self.max_crop_ratio: float = roi_cfg.max_crop_ratio                     # crop covering more of the frame than this: full frame instead
+
+        self.frames_since_full: int = 0
+        self.target_id: Optional[int] = None
+        self.target_box: Optional[np.ndarray] = None                            # last observed box of the target
+        self.target_time: float = 0.0                                           # capture time of that observation
+        self.target_velocity: np.ndarray = np.zeros(4, dtype = np.float32)      # pixels / second
+
+        # Counters
+        self.roi_passes: int = 0
+        self.full_passes: int = 0
+
+
+    def plan(self, packet: FramePacket, memory: Dict[int, TrackedGarbage]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Provides the inference region of the frame.
+
+        :param self: Belongs to the RoiController class.
+        :param packet: Current frame packet.
+        :type packet: FramePacket
+        :param memory: Records of the aggregation memory (e.g. its SELECTED records), the locked target is the SELECTED object.
+        :type memory: Dict[int, TrackedGarbage]
+        :return: Crop (x1, y1, x2, y2) in original frame coordinates, or None for a full-frame pass.
+        :rtype: Optional[Tuple[int, int, int, int]]
+        """
+        self.frames_since_full += 1
+        target = self._locked_target(memory)
+
+        if target is None or self.frames_since_full >= self.full_frame_interval:
+            return self._full_frame()
+
+        self._observe(target)
+        predicted_box = self.target_box + self.target_velocity * (packet.timestamp - self.target_time)
+
+        height, width = packet.frame.shape[:2]
+        region = self._crop_around(predicted_box, width, height)
+        if region is None:
+            return self._full_frame()
+
+        self.roi_passes += 1
+        logger.info(f"RoiController -> plan(): ROI pass around track_id: {target.track_id}, region: {region}")
+        return region
+
+
+    def get_stats(self) -> dict:
+        """
+        Provides the ROI counters.
+        """
+        return {"roi_passes": self.roi_passes, "full_passes": self.full_passes}
+
+
+    def _full_frame(self) -> None:
+        self.frames_since_full = 0
+        self.full_passes += 1
+        return None
+
+
+    def _locked_target(self, memory: Dict[int, TrackedGarbage]) -> Optional[TrackedGarbage]:
+        for tracked_object in memory.values():
+            if tracked_object.state == TrackedState.SELECTED:
+                return tracked_object
+        return None
+
+
+    def _observe(self, target: TrackedGarbage):
+        """
+        Updates the velocity of the target, from its 2 latest observed boxes.
+        """
+        box = np.asarray(target.bbox, dtype = np.float32)
+
+        if target.track_id != self.target_id:
+            self.target_id = target.track_id
+            self.target_velocity = np.zeros(4, dtype = np.float32)
+
+        elif target.last_seen_time > self.target_time:
+            self.target_velocity = (box - self.target_box) / (target.last_seen_time - self.target_time)
+
+        self.target_box = box
+        self.target_time = target.last_seen_time
+
+
+    def _crop_around(self, box: np.ndarray, width: int, height: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Square crop centered on the box, clipped to the frame. None when the crop is almost the whole frame.
+        """
+        x1, y1, x2, y2 = box.tolist()
+        side = max(self.min_crop_size, self.context_scale * max(x2 - x1, y2 - y1))
+        side = int(min(side, width, height))
+
+        center_x = (x1 + x2) / 2.0
+        center_y = (y1 + y2) / 2.0
+        crop_x1 = int(min(max(center_x - side / 2.0, 0), width - side))
+        crop_y1 = int(min(max(center_y - side / 2.0, 0), height - side))
+
+        if side * side > self.max_crop_ratio * width * height:
+            return None
+
+        return crop_x1, crop_y1, crop_x1 + side, crop_y1 + side
@@ -0,0 +1,248 @@
+# Aim: Mission resume: periodic binary snapshots of the aggregation memory and the selection lock, written off the hot path, restored at startup.
+
+import os
+import time
+import threading
+import numpy as np
+from typing import Callable, Dict, Optional
+
+from src.common.logging import logger
+
+
+# Format version written in every snapshot. Bump it when the arrays change, and register the converter of the previous version.
+#   1: records, done ids, counters, camera index, locked target.
+#   2: + EMA confidence and running window sum of every record.
+#   3: locked target -> locked batch (`locked_track_ids`, pickup order).
+SNAPSHOT_VERSION = 3
+
+
+def _upgrade_v1(state: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Version 1 -> 2: the EMA starts from the mean confidence, the window sum is computed from the ring buffers.
+    """
+    state = dict(state)
+    state["record_ema_confidence"] = state["record_avg_confidence"].copy()
+
+    confidences, heads, counts = state["record_history_confidence"], state["record_history_head"], state["record_history_count"]
+    history_size = confidences.shape[1]
+    slot_age = (np.arange(history_size)[None, :] - heads[:, None]) % history_size
+    valid = slot_age >= history_size - counts[:, None]
+    state["record_window_confidence_sum"] = (confidences.astype(np.float64) * valid).sum(axis = 1)
+    return state
+
+
+def _upgrade_v2(state: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Version 2 -> 3: the locked target becomes a batch of 1 target (or no target).
+    """
+    state = dict(state)
+    locked_track_id = int(state.pop("locked_track_id"))
+    state["locked_track_ids"] = np.asarray([] if locked_track_id == NO_LOCK else [locked_track_id], dtype = np.int64)
+    return state
+
+
+# Converters of older snapshots: version -> function(state of that version) -> state of the next version.
+SNAPSHOT_UPGRADES: Dict[int, Callable[[Dict[str, np.ndarray]], Dict[str, np.ndarray]]] = {1: _upgrade_v1, 2: _upgrade_v2}
+
+NO_LOCK = -1                                # `locked_track_id` of version 1-2 snapshots when no target is locked
+
+
+class MissionSnapshotter:
+    """
+    Snapshots of the mission state: aggregation memory (records, done ids, counters), camera index and the locked targets.
+
+    `capture()` copies the state on the caller's thread (array copies, ~1 ms for thousands of records) and hands it to a
+    background writer; only the latest pending snapshot is written (an older one is replaced). Files are written as .npz
+    (plain NumPy arrays, no pickle) to a temporary file then renamed, so a crash never leaves a partial snapshot.
+    """
+    def __init__(self, snapshot_cfg):
+        self.path: str = snapshot_cfg.path
+        self.interval_seconds: float = snapshot_cfg.interval_seconds         # capture time between 2 periodic snapshots
+
+        self.last_capture_time: Optional[float] = None
+        self._pending: Optional[Dict[str, np.ndarray]] = None
+        self._writing: bool = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running: bool = False
+
+        # Counters
+        self.captured: int = 0                  # snapshots handed to the writer
+        self.written: int = 0                   # snapshots written to disk
+        self.replaced: int = 0                  # pending snapshots replaced by a newer one before being written
+        self.last_write_ms: float = 0.0
+
+
+    def start(self):
+        logger.info(f"MissionSnapshotter -> start(): path = {self.path}, interval = {self.interval_seconds} s")
+        self._running = True
+        self._thread = threading.Thread(target = self._write_loop, name = "vision-snapshot", daemon = True)
+        self._thread.start()
+
+
+    def capture(self, vision_pipeline, selection_lock, timestamp: Optional[float] = None, force: bool = False) -> bool:
+        """
+        Takes a snapshot when `interval_seconds` elapsed since the previous one (or when forced, e.g. after a target is DONE).
+
+        :param self: Belongs to the MissionSnapshotter class.
+        :param vision_pipeline: VisionPipeline (aggregation memory + camera index).
+        :param selection_lock: SelectionLock of the Decision pipeline.
+        :param timestamp: Capture time of the current frame (monotonic seconds), current time if not given.
+        :type timestamp: Optional[float]
+        :param force: Ignores the interval.
+        :type force: bool
+        :return: True if a snapshot was taken.
+        :rtype: bool
+        """
+        timestamp = timestamp if timestamp is not None else time.monotonic()
+        if not force and self.last_capture_time is not None and timestamp - self.last_capture_time < self.interval_seconds:
+            return False
+
+        state = vision_pipeline.snapshot_state()
+        state["locked_track_ids"] = np.asarray(selection_lock.get_locked_targets(), dtype = np.int64)
+        state["version"] = np.asarray(SNAPSHOT_VERSION, dtype = np.int64)
+        state["saved_at"] = np.asarray(time.time(), dtype = np.float64)      # wall clock, for the logs
+
+        with self._cond:
+            if self._pending is not None:
+                self.replaced += 1
+            self._pending = state
+            self._cond.notify_all()
+
+        self.last_capture_time = timestamp
+        self.captured += 1
+        return True
+
+
+    def _write_loop(self):
+        """
+        Background thread: writes the latest pending snapshot.
+        """
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or not self._running)
+                if self._pending is None:
+                    return
+                state, self._pending = self._pending, None
+                self._writing = True
+
+            try:
+                start = time.perf_counter()
+                self._write(state)
+                self.last_write_ms = (time.perf_counter() - start) * 1000.0
+                self.written += 1
+
+            except Exception as e:
+                logger.info(f"Error occurred in MissionSnapshotter -> write_loop(): {e}")
+
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+
+    def _write(self, state: Dict[str, np.ndarray]):
+        """
+        Writes the snapshot to a temporary file, then renames it over the previous snapshot (atomic).
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok = True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **state)
+        os.replace(temp_path, self.path)
+
+
+    def load(self) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Reads the snapshot, converted to the current version.
+
+        :param self: Belongs to the MissionSnapshotter class.
+        :return: Array name -> array, None if there is no snapshot or it is from a newer (unknown) version.
+        :rtype: Optional[Dict[str, np.ndarray]]
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        with np.load(self.path, allow_pickle = False) as data:
+            state = {name: data[name] for name in data.files}
+
+        version = int(state["version"])
+        if version > SNAPSHOT_VERSION:
+            logger.info(f"MissionSnapshotter -> load(): snapshot version {version} is newer than {SNAPSHOT_VERSION}, ignored")
+            return None
+
+        while version < SNAPSHOT_VERSION:
+            if version not in SNAPSHOT_UPGRADES:
+                logger.info(f"MissionSnapshotter -> load(): no converter from snapshot version {version}, ignored")
+                return None
+            state = SNAPSHOT_UPGRADES[version](state)
+            version += 1
+
+        return state
+
+
+    def restore(self, vision_pipeline, selection_lock) -> bool:
+        """
+        Restores the aggregation memory and the locked target from the snapshot, if any (call before the first frame).
+
+        :param self: Belongs to the MissionSnapshotter class.
+        :param vision_pipeline: VisionPipeline (aggregation memory + camera index).
+        :param selection_lock: SelectionLock of the Decision pipeline.
+        :return: True if a snapshot was restored.
+        :rtype: bool
+        """
+        logger.info(f"MissionSnapshotter -> restore(): STARTS, path: {self.path}")
+        try:
+            start = time.perf_counter()
+            state = self.load()
+            if state is None:
+                logger.info("MissionSnapshotter -> restore(): ENDS, no snapshot to restore")
+                return False
+
+            vision_pipeline.restore_state(state)
+            selection_lock.set_locked_targets(state["locked_track_ids"].tolist())
+
+            restore_ms = (time.perf_counter() - start) * 1000.0
+            logger.info(f"MissionSnapshotter -> restore(): ENDS, saved at: {float(state['saved_at'])}, "
+                        f"locked track ids: {selection_lock.get_locked_targets()}, restore time: {restore_ms:.1f} ms")
+            return True
+
+        except Exception as e:
+            logger.info(f"Error occurred in MissionSnapshotter -> restore(): {e}")
+            raise e
+
+
+    def clear(self):
+        """
+        Deletes the snapshot (mission completed: the next mission starts from an empty memory).
+        """
+        with self._cond:
+            self._pending = None
+            self._cond.wait_for(lambda: not self._writing)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        logger.info(f"MissionSnapshotter -> clear(): snapshot removed: {self.path}")
+
+
+    def close(self):
+        """
+        Writes the pending snapshot, then stops the writer.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        logger.info(f"MissionSnapshotter -> close(): stats: {self.get_stats()}")
+
+
+    def get_stats(self) -> dict:
+        """
+        Provides the snapshot counters.
+        """
+        return {
+            "captured": self.captured,
+            "written": self.written,
+            "replaced": self.replaced,
+            "last_write_ms": round(self.last_write_ms, 2)
+        }
@@ -0,0 +1,79 @@
+# Aim: Compact set of track ids (1 bit per id), for ids which must stay excluded for the whole mission.
+
+import numpy as np
+from typing import Iterator
+
+
+class TrackIdBitmap:
+    """
+    Set of non-negative track ids, stored as a bitmap.
+
+    Track ids are small, dense integers (per-stream counters, namespaced by camera), so 1 bit per id
+    costs far less than a Python set once thousands of ids are stored, and membership is 1 byte lookup.
+    """
+    def __init__(self):
+        self._bits = bytearray()
+        self._count: int = 0
+
+
+    def add(self, track_id: int):
+        """
+        Adds the track id to the set.
+
+        :param self: Belongs to the TrackIdBitmap class.
+        :param track_id: Track id (>= 0).
+        :type track_id: int
+        """
+        track_id = int(track_id)
+        if track_id < 0:
+            raise ValueError(f"Track id must be >= 0, received: {track_id}")
+
+        byte, bit = track_id >> 3, 1 << (track_id & 7)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(max(byte + 1, 2 * len(self._bits)) - len(self._bits)))         # amortized growth
+
+        if not self._bits[byte] & bit:
+            self._bits[byte] |= bit
+            self._count += 1
+
+
+    def __contains__(self, track_id) -> bool:
+        if track_id is None or track_id < 0:
+            return False
+        byte = track_id >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (track_id & 7)))
+
+
+    def __len__(self) -> int:
+        return self._count
+
+
+    def __iter__(self) -> Iterator[int]:
+        for byte, value in enumerate(self._bits):
+            if not value:
+                continue
+            for bit in range(8):
+                if value & (1 << bit):
+                    yield (byte << 3) | bit
+
+
+    def to_bytes(self) -> bytes:
+        """
+        Provides the bitmap as bytes (bit `id & 7` of byte `id >> 3`), for snapshots.
+        """
+        return bytes(self._bits)
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TrackIdBitmap":
+        """
+        Rebuilds a set from `to_bytes()` output.
+        """
+        bitmap = cls()
+        bitmap._bits = bytearray(data)
+        bitmap._count = int(np.unpackbits(np.frombuffer(bitmap._bits, dtype = np.uint8)).sum())
+        return bitmap
+
+
+    def __repr__(self) -> str:
+        return f"TrackIdBitmap(count={self._count}, bytes={len(self._bits)})"
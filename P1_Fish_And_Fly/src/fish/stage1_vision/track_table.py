@@ -0,0 +1,479 @@
+# Aim: Struct-of-arrays store of the aggregation records: 1 NumPy column per field, 1 row per track, with thin views keeping the TrackedGarbage API.
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.fish.stage1_vision.entity import TrackedGarbage, TrackedState
+
+
+# Lifecycle state <-> int8 code stored in the table.
+STATE_CODES: Dict[TrackedState, int] = {state: code for code, state in enumerate(TrackedState)}
+CODE_STATES: List[TrackedState] = list(TrackedState)
+FREE_ROW = -1                                                               # state code of the unused rows
+
+# Columns of a record (snapshots, growth). Object columns hold Python strings / None.
+COLUMNS: Tuple[str, ...] = ("track_id", "class_id", "class_name", "avg_confidence", "ema_confidence", "bbox", "age", "first_seen_frame",
+                            "last_seen_frame", "first_seen_time", "last_seen_time", "state", "fade_frames_remaining", "camera_id",
+                            "history_bbox", "history_confidence", "history_time", "history_head", "history_count", "window_confidence_sum")
+HISTORY_COLUMNS: Tuple[str, ...] = ("history_bbox", "history_confidence", "history_time")
+
+# Confidence statistics of a record (decision `confidence` keys) -> TrackedGarbage attribute.
+CONFIDENCE_STATISTICS: Dict[str, str] = {"mean": "avg_confidence", "ema": "ema_confidence", "window": "windowed_confidence"}
+
+# Below this number of objects, filters loop in Python instead of building column masks.
+VECTORIZE_MIN_OBJECTS = 32
+
+
+class TrackTable:
+    """
+    Columnar track records.
+
+    Rows are allocated on `add()` and recycled on `release()`, the columns grow by doubling.
+    The table does not index the track ids: the owner (aggregation memory) keeps track_id -> row.
+    Numeric updates of many tracks (sightings, age, confidence, state masks) are done on whole columns with row index arrays.
+
+    Each row also owns fixed-size ring buffers of its latest `history_size` detections (bbox, confidence, capture time),
+    preallocated as (capacity, history_size, ...) columns: a sighting overwrites the oldest slot, nothing is allocated per frame.
+    """
+    def __init__(self, capacity: int = 256, history_size: int = 15):
+        if history_size < 1:
+            raise ValueError(f"History size must be >= 1, received: {history_size}")
+
+        self.history_size: int = history_size
+        self.capacity: int = 0
+        self.size: int = 0                                                  # rows in use
+        self.next_row: int = 0                                              # rows above it were never used
+        self.free_rows: List[int] = []
+        self.now: float = 0.0                                               # capture time of the latest frame (set by the owner), for idle times
+
+        self.track_id = np.zeros(0, dtype = np.int64)
+        self.class_id = np.zeros(0, dtype = np.int32)
+        self.class_name = np.empty(0, dtype = object)
+        self.avg_confidence = np.zeros(0, dtype = np.float64)
+        self.ema_confidence = np.zeros(0, dtype = np.float64)                # time-aware EMA, updated by the owner
+        self.bbox = np.zeros((0, 4), dtype = np.int32)
+        self.age = np.zeros(0, dtype = np.int32)
+        self.first_seen_frame = np.zeros(0, dtype = np.int64)
+        self.last_seen_frame = np.zeros(0, dtype = np.int64)
+        self.first_seen_time = np.zeros(0, dtype = np.float64)
+        self.last_seen_time = np.zeros(0, dtype = np.float64)
+        self.state = np.zeros(0, dtype = np.int8)
+        self.fade_frames_remaining = np.zeros(0, dtype = np.int32)
+        self.camera_id = np.empty(0, dtype = object)
+
+        # Ring buffers: slot `history_head` is written next, the `history_count` latest slots are valid.
+        self.history_bbox = np.zeros((0, history_size, 4), dtype = np.int32)
+        self.history_confidence = np.zeros((0, history_size), dtype = np.float32)
+        self.history_time = np.zeros((0, history_size), dtype = np.float64)
+        self.history_head = np.zeros(0, dtype = np.int32)
+        self.history_count = np.zeros(0, dtype = np.int32)
+        self.window_confidence_sum = np.zeros(0, dtype = np.float64)         # running sum of the stored confidences (float64)
+
+        # Change feed (not snapshotted): rows written since the last `take_changes()`, each listed once (bounded by the capacity).
+        self.changed = np.zeros(0, dtype = bool)
+        self.changed_rows: List[np.ndarray] = []
+
+        self._grow(capacity)
+
+
+    def add(self, track_ids: np.ndarray, class_ids: np.ndarray, class_names: np.ndarray, confidences: np.ndarray, boxes: np.ndarray,
+            camera_ids: np.ndarray, frame: int, timestamp: float) -> np.ndarray:
+        """
+        Adds new NEW records (age 1, first / last seen now), 1 per track id.
+
+        :param self: Belongs to the TrackTable class.
+        :return: Rows of the new records.
+        :rtype: np.ndarray
+        """
+        count = len(track_ids)
+        rows = self._allocate(count)
+
+        self.track_id[rows] = track_ids
+        self.class_id[rows] = class_ids
+        self.class_name[rows] = class_names
+        self.avg_confidence[rows] = confidences
+        self.ema_confidence[rows] = confidences
+        self.bbox[rows] = boxes
+        self.age[rows] = 1
+        self.first_seen_frame[rows] = frame
+        self.last_seen_frame[rows] = frame
+        self.first_seen_time[rows] = timestamp
+        self.last_seen_time[rows] = timestamp
+        self.state[rows] = STATE_CODES[TrackedState.NEW]
+        self.fade_frames_remaining[rows] = 0
+        self.camera_id[rows] = camera_ids
+
+        self.history_head[rows] = 0
+        self.history_count[rows] = 0
+        self.window_confidence_sum[rows] = 0.0
+        self.push_history(rows, boxes, confidences, timestamp)
+        return rows
+
+
+    def push_history(self, rows: np.ndarray, boxes: np.ndarray, confidences: np.ndarray, timestamp: float):
+        """
+        Appends 1 detection to the ring buffers of each row, overwriting the oldest one once `history_size` are stored.
+
+        :param self: Belongs to the TrackTable class.
+        :param rows: Rows of the detected tracks (unique).
+        :type rows: np.ndarray
+        :param boxes: (N, 4) boxes (x1, y1, x2, y2).
+        :type boxes: np.ndarray
+        :param confidences: (N,) confidences.
+        :type confidences: np.ndarray
+        :param timestamp: Capture time of the detections (monotonic seconds).
+        :type timestamp: float
+        """
+        heads = self.history_head[rows]
+        overwritten = np.where(self.history_count[rows] == self.history_size, self.history_confidence[rows, heads].astype(np.float64), 0.0)
+        self.history_bbox[rows, heads] = boxes
+        self.history_confidence[rows, heads] = confidences
+        self.history_time[rows, heads] = timestamp
+        self.window_confidence_sum[rows] += self.history_confidence[rows, heads].astype(np.float64) - overwritten
+        self.history_head[rows] = (heads + 1) % self.history_size
+        self.history_count[rows] = np.minimum(self.history_count[rows] + 1, self.history_size)
+
+
+    def history(self, row: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Provides the stored detections of 1 row, oldest first.
+
+        :param self: Belongs to the TrackTable class.
+        :return: (K, 4) boxes, (K,) confidences, (K,) capture times, K <= history_size.
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        count = int(self.history_count[row])
+        slots = (int(self.history_head[row]) - count + np.arange(count)) % self.history_size
+        return self.history_bbox[row, slots], self.history_confidence[row, slots], self.history_time[row, slots]
+
+
+    def velocity(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Box center velocity between the oldest and the latest stored detection.
+
+        :param self: Belongs to the TrackTable class.
+        :return: (N, 2) velocity (pixels / second), 0 for rows with less than 2 detections or no elapsed time.
+        :rtype: np.ndarray
+        """
+        rows = np.asarray(rows, dtype = np.int64)
+        heads, counts = self.history_head[rows], self.history_count[rows]
+        newest = (heads - 1) % self.history_size
+        oldest = (heads - counts) % self.history_size
+
+        newest_box = self.history_bbox[rows, newest].astype(np.float64)
+        oldest_box = self.history_bbox[rows, oldest].astype(np.float64)
+        displacement = (newest_box[:, :2] + newest_box[:, 2:] - oldest_box[:, :2] - oldest_box[:, 2:]) / 2
+        elapsed = self.history_time[rows, newest] - self.history_time[rows, oldest]
+
+        velocity = np.zeros((len(rows), 2), dtype = np.float64)
+        moving = elapsed > 0
+        velocity[moving] = displacement[moving] / elapsed[moving, None]
+        return velocity
+
+
+    def smoothed_bbox(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Mean of the stored boxes: damps the detector jitter of the latest box.
+
+        :param self: Belongs to the TrackTable class.
+        :return: (N, 4) boxes (x1, y1, x2, y2), float.
+        :rtype: np.ndarray
+        """
+        rows = np.asarray(rows, dtype = np.int64)
+        valid, counts = self._history_mask(rows)
+        return (self.history_bbox[rows] * valid[:, :, None]).sum(axis = 1) / counts[:, None]
+
+
+    def windowed_confidence(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Mean confidence of the stored detections (the latest `history_size`), unlike `avg_confidence` (whole track).
+        Read from the running window sum: O(1) per row.
+
+        :param self: Belongs to the TrackTable class.
+        :return: (N,) confidences.
+        :rtype: np.ndarray
+        """
+        rows = np.asarray(rows, dtype = np.int64)
+        return self.window_confidence_sum[rows] / np.maximum(self.history_count[rows], 1)
+
+
+    def confidence_statistic(self, rows: np.ndarray, statistic: str) -> np.ndarray:
+        """
+        Provides 1 confidence statistic of the rows: "mean" (whole track), "ema" (time-aware EMA) or "window" (latest detections).
+        """
+        if statistic == "window":
+            return self.windowed_confidence(rows)
+        return getattr(self, CONFIDENCE_STATISTICS[statistic])[rows]
+
+
+    def last_detection_time(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Capture time of the latest stored detection of the rows (predicted boxes excluded).
+        """
+        return self.history_time[rows, (self.history_head[rows] - 1) % self.history_size]
+
+
+    def age_seconds(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Time the rows have been tracked (first -> latest sighting, capture time): the frame-rate independent age.
+        """
+        return self.last_seen_time[rows] - self.first_seen_time[rows]
+
+
+    def idle_seconds(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Time since the latest sighting of the rows, at the capture time of the latest frame.
+        """
+        return self.now - self.last_seen_time[rows]
+
+
+    def _history_mask(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Valid slots of the rows (N, history_size) and their count (>= 1 for rows in use).
+        The valid slots are the `history_count` slots written before the head.
+        """
+        counts = self.history_count[rows]
+        slot_age = (np.arange(self.history_size)[None, :] - self.history_head[rows][:, None]) % self.history_size     # 0: oldest slot
+        return slot_age >= self.history_size - counts[:, None], np.maximum(counts, 1)
+
+
+    def export_rows(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Copies the columns of the rows (snapshot). Object columns become string arrays ("" for None, with a `<name>_set` mask),
+        so the result holds plain NumPy arrays only.
+
+        :param self: Belongs to the TrackTable class.
+        :param rows: Rows to copy.
+        :type rows: np.ndarray
+        :return: Column name -> array, in the order of `rows`.
+        :rtype: Dict[str, np.ndarray]
+        """
+        columns: Dict[str, np.ndarray] = {}
+        for name in COLUMNS:
+            column = getattr(self, name)[rows]                                  # fancy indexing: a copy
+            if column.dtype == object:
+                is_set = np.fromiter((value is not None for value in column), dtype = bool, count = len(column))
+                columns[name] = np.asarray(["" if value is None else str(value) for value in column], dtype = str)
+                columns[f"{name}_set"] = is_set
+            else:
+                columns[name] = column
+        return columns
+
+
+    def import_rows(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Adds records from `export_rows()` output. Ring buffers of another size are converted: the latest detections are kept.
+
+        :param self: Belongs to the TrackTable class.
+        :param columns: Column name -> array.
+        :type columns: Dict[str, np.ndarray]
+        :return: Rows of the records, in the order of the arrays.
+        :rtype: np.ndarray
+        """
+        rows = self._allocate(len(columns["track_id"]))
+
+        for name in COLUMNS:
+            if name.startswith("history_"):
+                continue
+            if getattr(self, name).dtype == object:
+                values = columns[name].astype(object)
+                values[~columns[f"{name}_set"]] = None
+                getattr(self, name)[rows] = values
+            else:
+                getattr(self, name)[rows] = columns[name]
+
+        saved_size = columns["history_time"].shape[1]
+        if saved_size == self.history_size:
+            for name in HISTORY_COLUMNS + ("history_head", "history_count"):
+                getattr(self, name)[rows] = columns[name]
+            return rows
+
+        # Ring buffers of another size, re-laid oldest first and right-aligned before a head at slot 0.
+        counts = np.minimum(columns["history_count"], self.history_size)
+        order = (columns["history_head"][:, None] - saved_size + np.arange(saved_size)[None, :]) % saved_size
+        kept = min(saved_size, self.history_size)
+        for name in HISTORY_COLUMNS:
+            ordered = np.take_along_axis(columns[name], order.reshape(order.shape + (1,) * (columns[name].ndim - 2)), axis = 1)
+            getattr(self, name)[rows, self.history_size - kept:] = ordered[:, saved_size - kept:]
+        self.history_head[rows] = 0
+        self.history_count[rows] = counts
+        valid, _ = self._history_mask(rows)
+        self.window_confidence_sum[rows] = (self.history_confidence[rows].astype(np.float64) * valid).sum(axis = 1)
+        return rows
+
+
+    def _allocate(self, count: int) -> np.ndarray:
+        """
+        Takes `count` rows: freed rows first, then never used rows (the columns grow if needed).
+        """
+        reused = min(count, len(self.free_rows))
+        fresh = count - reused
+        if self.next_row + fresh > self.capacity:
+            self._grow(max(2 * self.capacity, self.next_row + fresh))
+
+        rows = np.empty(count, dtype = np.int64)
+        if reused:
+            rows[:reused] = self.free_rows[-reused:]
+            del self.free_rows[-reused:]
+        rows[reused:] = np.arange(self.next_row, self.next_row + fresh)
+        self.next_row += fresh
+        self.size += count
+        return rows
+
+
+    def mark_changed(self, rows: np.ndarray):
+        """
+        Records that the rows were written (sighting, state change, release), for the consumer of `take_changes()`.
+        """
+        rows = np.asarray(rows, dtype = np.int64)
+        fresh = rows[~self.changed[rows]]
+        if len(fresh):
+            self.changed[fresh] = True
+            self.changed_rows.append(fresh)
+
+
+    def take_changes(self) -> np.ndarray:
+        """
+        Provides the rows changed since the previous call (sorted, unique) and clears the feed. 1 consumer: the decision kernel.
+        """
+        if not self.changed_rows:
+            return np.zeros(0, dtype = np.int64)
+
+        rows = np.unique(np.concatenate(self.changed_rows))
+        self.changed[rows] = False
+        self.changed_rows = []
+        return rows
+
+
+    def release(self, rows: Sequence[int]):
+        """
+        Frees the rows (evicted records), they are reused by the next `add()`.
+        """
+        self.mark_changed(rows)
+        self.state[rows] = FREE_ROW
+        self.class_name[rows] = None
+        self.camera_id[rows] = None
+        self.free_rows.extend(int(row) for row in rows)
+        self.size -= len(rows)
+
+
+    def view(self, row: int) -> "TrackView":
+        return TrackView(self, row)
+
+
+    def _grow(self, capacity: int):
+        """
+        Enlarges every column to `capacity` rows. The rows above the old capacity are unused.
+        """
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+
+        for name in COLUMNS + ("changed",):
+            column = getattr(self, name)
+            if column.dtype == object:
+                padding = np.full(extra, None, dtype = object)
+            elif name == "state":
+                padding = np.full(extra, FREE_ROW, dtype = column.dtype)
+            else:
+                padding = np.zeros((extra,) + column.shape[1:], dtype = column.dtype)
+            setattr(self, name, np.concatenate([column, padding]))
+
+        self.capacity = capacity
+
+
+
+def _column_property(name: str, to_python):
+    def getter(self):
+        return to_python(getattr(self._table, name)[self._row])
+
+    def setter(self, value):
+        getattr(self._table, name)[self._row] = value
+
+    return property(getter, setter)
+
+
+
+class TrackView(TrackedGarbage):
+    """
+    1 record of a TrackTable, with the TrackedGarbage API (attributes read / write the table row, `state` is read-only).
+    A view is valid while its record is in the aggregation memory: the row of an evicted record is reused.
+    """
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: TrackTable, row: int):
+        self._table = table
+        self._row = row
+
+    track_id = _column_property("track_id", int)
+    class_id = _column_property("class_id", int)
+    class_name = _column_property("class_name", lambda value: value)
+    avg_confidence = _column_property("avg_confidence", float)
+    ema_confidence = _column_property("ema_confidence", float)
+    age = _column_property("age", int)
+    first_seen_frame = _column_property("first_seen_frame", int)
+    last_seen_frame = _column_property("last_seen_frame", int)
+    first_seen_time = _column_property("first_seen_time", float)
+    last_seen_time = _column_property("last_seen_time", float)
+    fade_frames_remaining = _column_property("fade_frames_remaining", int)
+    camera_id = _column_property("camera_id", lambda value: value)
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        return tuple(self._table.bbox[self._row].tolist())
+
+    @bbox.setter
+    def bbox(self, value):
+        self._table.bbox[self._row] = value
+
+    @property
+    def state(self) -> TrackedState:
+        # Read-only: a state change must go through `GarbageAggregator._set_state()` (state index + change mark).
+        return CODE_STATES[self._table.state[self._row]]
+
+    @property
+    def velocity(self) -> Tuple[float, float]:
+        return tuple(self._table.velocity([self._row])[0].tolist())
+
+    @property
+    def smoothed_bbox(self) -> Tuple[float, float, float, float]:
+        return tuple(self._table.smoothed_bbox([self._row])[0].tolist())
+
+    @property
+    def windowed_confidence(self) -> float:
+        return float(self._table.windowed_confidence([self._row])[0])
+
+    @property
+    def idle_seconds(self) -> float:
+        return float(self._table.now - self._table.last_seen_time[self._row])
+
+    def history(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self._table.history(self._row)
+
+
+
+def table_rows(objects: Sequence[TrackedGarbage], min_count: int = VECTORIZE_MIN_OBJECTS) -> Optional[Tuple[TrackTable, np.ndarray]]:
+    """
+    Provides (table, rows) when every object is a view of the same TrackTable, so filters can run as column masks. Else None.
+    Also None below `min_count` objects: for a few objects, a Python loop is faster than building the masks.
+
+    :param objects: Tracked objects.
+    :type objects: Sequence[TrackedGarbage]
+    :param min_count: Minimum number of objects.
+    :type min_count: int
+    :return: Table and rows of the objects, in the order of `objects`.
+    :rtype: Optional[Tuple[TrackTable, np.ndarray]]
+    """
+    if len(objects) < min_count or type(objects[0]) is not TrackView:
+        return None
+
+    # 1 pass: rows of the views of that table (an object without `_table` is not a view).
+    table = objects[0]._table
+    try:
+        rows = [obj._row for obj in objects if obj._table is table]
+    except AttributeError:
+        return None
+    if len(rows) != len(objects):
+        return None
+
+    return table, np.array(rows, dtype = np.int64)
@@ -1,23 +1,47 @@
 # Object tracking for underwater objects
 
+import time
+import torch
+from typing import Dict, List, Optional, Tuple
 from box import ConfigBox
+from torchvision.ops import batched_nms
+from ultralytics.engine.results import Results
+from ultralytics.trackers.basetrack import BaseTrack
+from ultralytics.trackers.bot_sort import BOTSORT
+from ultralytics.trackers.byte_tracker import BYTETracker
+from ultralytics.utils import IterableSimpleNamespace, yaml_load
+from ultralytics.utils.checks import check_yaml
+
 from src.common.logging import logger
+from src.fish.stage1_vision.native_tracker import NativeTracker
+
+
+# Tracker types supported in the ultralytics tracker yaml (`tracker_type`).
+TRACKER_MAP = {"bytetrack": BYTETracker, "botsort": BOTSORT}
 
 
 class GarbageTracker:
     """
-    Object tracking using "BORT-SORT" algorithmn inside Ultralytics YOLO.
+    Object tracking: in-project ByteTrack-style tracker (`tracker: native`), or "BORT-SORT" / ByteTrack of Ultralytics YOLO.
     NOTE: Tracking is a thin wrapper around Detection, not a post-process. Tracking is part of inference process.
     """
     def __init__(self, tracker_cfg: ConfigBox):
         self.tracking_enabled = tracker_cfg.enabled
         self.tracker_cfg = tracker_cfg
+        self.stream_trackers: Dict[str, object] = {}               # stream id -> explicit tracker of that stream
+        self.first_track_id: int = 1                                # first id of new trackers (raised on mission resume)
 
+        # Tiled inference counters
+        self.tile_stats: Dict[str, float] = {"batches": 0, "tiles": 0, "inference_ms": 0.0, "merge_ms": 0.0, "last_batch_ms": 0.0, "last_tiles": 0}
 
-    def infer_yolo_model(self, model, frame, infer_cfg):
+
+    def infer_yolo_model(self, model, frame, infer_cfg, stream_id: str = "default"):
         """
         YOLO Inference is done.
         If tracking_enabled = true, tracking happens, else tracking does not happen, just detection
+
+        Tracking uses the explicit tracker of `stream_id` (not `model.track()`, which keeps its tracker inside the model),
+        so the model can be shared by several pipelines (see ModelRegistry).
         """
         try: 
             logger.info("infer_yolo_model(): STARTS")
@@ -28,15 +52,18 @@ class GarbageTracker:
 
             # CASE1: When tracking is enabled : (DETECTION + TRACKING)
             if self.tracking_enabled:
-                results =  model.track(
-                    source = frame,
+                results = model.predict(
+                    frame,
                     conf = infer_cfg.conf,
                     imgsz = infer_cfg.imgsz,
-                    tracker = model_tracker_cfg.tracker,
-                    persist = model_tracker_cfg.persist,
                     verbose = model_tracker_cfg.verbose
                 )
 
+                # persist = false: every call starts a new tracker (same as `model.track(persist = False)`)
+                if not model_tracker_cfg.persist:
+                    self.stream_trackers.pop(stream_id, None)
+                results = [self._track_result(results[0], stream_id)]
+
                 logger.info("infer_yolo_model(): Detection is done with Tracking")
 
             # CASE2: When tracking is not enabled : (ONLY DETECTION)
@@ -58,7 +85,228 @@ class GarbageTracker:
         except Exception as e:
             logger.info(f"Error occured in infer_yolo_model(): {e}")
             raise e
-        
-    
 
-    
\ No newline at end of file
+
+
+    def infer_yolo_model_batch(self, model, frames: List, infer_cfg, stream_ids: List[str]) -> List:
+        """
+        YOLO Inference on a batch of frames: frames of different cameras, or a backlog of frames of 1 recorded stream.
+        Returns one result per frame, in the order of `frames`.
+
+        Detection runs as 1 batched forward pass.
+        If tracking_enabled = true, the results are then tracked IN ORDER, by an explicit tracker per stream:
+        `model.track()` shares 1 tracker across all the frames it is given, so it cannot be used for a batch.
+        """
+        try:
+            logger.info(f"infer_yolo_model_batch(): STARTS, batch size: {len(frames)}")
+
+            # Detection: ONE forward pass for the whole batch.
+            results = list(model.predict(
+                frames,
+                conf = infer_cfg.conf,
+                imgsz = infer_cfg.imgsz,
+                verbose = infer_cfg.verbose
+            ))
+
+            # Tracking: every stream updates its own tracker, in frame order.
+            if self.tracking_enabled:
+                for idx, (result, stream_id) in enumerate(zip(results, stream_ids)):
+                    results[idx] = self._track_result(result, stream_id)
+
+                logger.info("infer_yolo_model_batch(): Detection is done with Tracking, per stream")
+            else:
+                logger.info("infer_yolo_model_batch(): Detection is done without Tracking")
+
+            logger.info("infer_yolo_model_batch(): ENDS")
+            return results
+
+
+        except Exception as e:
+            logger.info(f"Error occured in infer_yolo_model_batch(): {e}")
+            raise e
+
+
+
+    def infer_yolo_model_tiled(self, model, frame, infer_cfg, stream_id: str):
+        """
+        YOLO Inference on overlapping tiles of the ORIGINAL frame, for small debris lost when the whole frame is downscaled to `imgsz`.
+
+        The tiles (+ optionally the full frame) go through ONE batched forward pass, their boxes are moved back to frame coordinates
+        and merged with NMS across the tile seams. If tracking_enabled = true, the merged result is tracked by the tracker of the stream.
+        Returns 1 result, boxes in ORIGINAL frame coordinates.
+        """
+        try:
+            logger.info("infer_yolo_model_tiled(): STARTS")
+
+            tiling_cfg = infer_cfg.tiling
+            height, width = frame.shape[:2]
+            tiles = self._tile_grid(width, height, tiling_cfg)
+
+            crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+            offsets = [(x1, y1) for x1, y1, _, _ in tiles]
+            if tiling_cfg.include_full_frame and len(tiles) > 1:
+                crops.append(frame)
+                offsets.append((0, 0))
+
+            # Detection: ONE forward pass for all the tiles.
+            start = time.perf_counter()
+            tile_results = model.predict(crops, conf = infer_cfg.conf, imgsz = infer_cfg.imgsz, verbose = infer_cfg.verbose)
+            inference_ms = (time.perf_counter() - start) * 1000.0
+
+            # Merging: tile -> frame coordinates, NMS per class across the seams.
+            start = time.perf_counter()
+            boxes = []
+            for tile_result, (offset_x, offset_y) in zip(tile_results, offsets):
+                data = tile_result.boxes.data[:, :6].clone()                   # x1, y1, x2, y2, conf, cls
+                data[:, [0, 2]] += offset_x
+                data[:, [1, 3]] += offset_y
+                boxes.append(data)
+
+            merged = torch.cat(boxes) if boxes else torch.zeros((0, 6))
+            keep = batched_nms(merged[:, :4], merged[:, 4], merged[:, 5].long(), tiling_cfg.nms_iou)
+            result = Results(orig_img = frame, path = "", names = model.names, boxes = merged[keep])
+            merge_ms = (time.perf_counter() - start) * 1000.0
+
+            self.tile_stats["batches"] += 1
+            self.tile_stats["tiles"] += len(crops)
+            self.tile_stats["inference_ms"] += inference_ms
+            self.tile_stats["merge_ms"] += merge_ms
+            self.tile_stats["last_batch_ms"] = inference_ms + merge_ms
+            self.tile_stats["last_tiles"] = len(crops)
+            logger.info(f"infer_yolo_model_tiled(): {len(crops)} tiles, inference = {inference_ms:.1f} ms, merge = {merge_ms:.1f} ms, boxes: {len(merged)} -> {len(keep)}")
+
+            # Tracking: the merged result, by the tracker of the stream.
+            if self.tracking_enabled:
+                result = self._track_result(result, stream_id)
+
+            logger.info("infer_yolo_model_tiled(): ENDS")
+            return [result]
+
+
+        except Exception as e:
+            logger.info(f"Error occured in infer_yolo_model_tiled(): {e}")
+            raise e
+
+
+
+    def infer_yolo_model_region(self, model, frame, infer_frame, offset: Tuple[int, int], scale: Tuple[float, float], infer_cfg, stream_id: str, imgsz: Optional[int] = None):
+        """
+        YOLO Inference on a region of the frame (ROI crop, or the pre-scaled full frame), tracked in ORIGINAL frame coordinates.
+
+        The boxes of `infer_frame` are mapped back to the frame (box / scale + offset) BEFORE tracking, so ROI passes and full-frame
+        passes update the same tracker of the stream in the same coordinates, and the track ids stay consistent between them.
+        `imgsz` overrides `infer_cfg.imgsz` (adaptive resolution).
+        Returns 1 result, boxes in ORIGINAL frame coordinates.
+        """
+        try:
+            logger.info(f"infer_yolo_model_region(): STARTS, offset: {offset}, scale: {scale}")
+
+            region_result = model.predict(infer_frame, conf = infer_cfg.conf, imgsz = imgsz or infer_cfg.imgsz, verbose = infer_cfg.verbose)[0]
+
+            scale_x, scale_y = scale
+            offset_x, offset_y = offset
+            data = region_result.boxes.data[:, :6].clone()                         # x1, y1, x2, y2, conf, cls
+            data[:, [0, 2]] = data[:, [0, 2]] / scale_x + offset_x
+            data[:, [1, 3]] = data[:, [1, 3]] / scale_y + offset_y
+            result = Results(orig_img = frame, path = "", names = model.names, boxes = data)
+
+            if self.tracking_enabled:
+                result = self._track_result(result, stream_id)
+
+            logger.info("infer_yolo_model_region(): ENDS")
+            return [result]
+
+
+        except Exception as e:
+            logger.info(f"Error occured in infer_yolo_model_region(): {e}")
+            raise e
+
+
+
+    def _tile_grid(self, width: int, height: int, tiling_cfg) -> List[Tuple[int, int, int, int]]:
+        """
+        Overlapping tiles (x1, y1, x2, y2) covering the frame.
+        Tiles grow until the tile budget (`max_tiles`, full frame view included) is met: fewer, larger tiles = lower latency, lower recall.
+        """
+        tile_size = int(tiling_cfg.tile_size)
+        extra = 1 if tiling_cfg.include_full_frame else 0
+
+        while True:
+            xs = self._tile_starts(width, tile_size, tiling_cfg.overlap)
+            ys = self._tile_starts(height, tile_size, tiling_cfg.overlap)
+            if len(xs) * len(ys) + extra <= tiling_cfg.max_tiles or tile_size >= max(width, height):
+                break
+            tile_size = int(tile_size * 1.1) + 1
+
+        tiles = [(x, y, min(x + tile_size, width), min(y + tile_size, height)) for y in ys for x in xs]
+        return tiles
+
+
+
+    def _tile_starts(self, length: int, tile_size: int, overlap: float) -> List[int]:
+        """
+        Start positions of the tiles along 1 axis, the last tile is aligned with the end of the frame.
+        """
+        if length <= tile_size:
+            return [0]
+
+        step = max(1, int(tile_size * (1.0 - overlap)))
+        starts = list(range(0, length - tile_size, step)) + [length - tile_size]
+        return starts
+
+
+
+    def get_tile_stats(self) -> Dict[str, float]:
+        """
+        Provides the tiled inference counters, with the mean time per tile batch.
+        """
+        stats = dict(self.tile_stats)
+        batches = max(stats["batches"], 1)
+        stats["mean_batch_ms"] = round((stats["inference_ms"] + stats["merge_ms"]) / batches, 3)
+        stats["mean_tiles"] = round(stats["tiles"] / batches, 2)
+        return stats
+
+
+
+    def _track_result(self, result, stream_id: str):
+        """
+        Updates the tracker of the stream with 1 detection result, and writes the track ids into the result boxes.
+        (Same post-processing as ultralytics does inside `model.track()`.)
+        """
+        tracker = self.stream_trackers.get(stream_id)
+        if tracker is None:
+            tracker = self._create_tracker()
+            self.stream_trackers[stream_id] = tracker
+            logger.info(f"GarbageTracker -> track_result(): new tracker for stream: {stream_id}")
+
+        if isinstance(tracker, NativeTracker):
+            tracks = tracker.update(result.boxes.data.cpu().numpy())            # plain (N, 6) detections
+        else:
+            tracks = tracker.update(result.boxes.cpu().numpy(), result.orig_img)
+        if len(tracks) == 0:
+            return result
+
+        # tracks: [x1, y1, x2, y2, track_id, score, cls, idx]
+        idx = tracks[:, -1].astype(int)
+        tracked_result = result[idx]
+        tracked_result.update(boxes = torch.as_tensor(tracks[:, :-1]))
+        return tracked_result
+
+
+
+    def _create_tracker(self):
+        """
+        Creates a tracker: the in-project NumPy tracker (`tracker: native`),
+        or an ultralytics tracker from the tracker yaml of the config (e.g. botsort.yaml, bytetrack.yaml).
+        """
+        if self.tracker_cfg.tracker == "native":
+            return NativeTracker(self.tracker_cfg.native, frame_rate = self.tracker_cfg.get("frame_rate") or 30, first_id = self.first_track_id)
+
+        tracker_args = IterableSimpleNamespace(**yaml_load(check_yaml(self.tracker_cfg.tracker)))
+        if tracker_args.tracker_type not in TRACKER_MAP:
+            raise ValueError(f"Unsupported tracker type: {tracker_args.tracker_type}, supported: {list(TRACKER_MAP)}")
+
+        tracker = TRACKER_MAP[tracker_args.tracker_type](args = tracker_args, frame_rate = self.tracker_cfg.get("frame_rate") or 30)
+        BaseTrack._count = max(BaseTrack._count, self.first_track_id - 1)        # ultralytics ids come from 1 global counter
+        return tracker
+
@@ -3,6 +3,7 @@ from typing import List, Set
 from src.common.logging import logger
 from src.fish.stage1_vision.entity import TrackedGarbage
 from src.fish.stage1_vision.aggregator import TrackedState
+from src.fish.stage1_vision.track_table import STATE_CODES, table_rows
 
 
 class StableObjectFilter:
@@ -12,7 +13,14 @@ class StableObjectFilter:
     def filter_detections(self, tracked_objects: List[TrackedGarbage]) -> List[TrackedGarbage]:
         logger.info(f"StableObjectFilter-> filter_detections() STARTS: before filtering n(objects): {len(tracked_objects)}")
 
-        stable_objects = [obj for obj in tracked_objects if obj.state == TrackedState.STABLE]
+        # Views of the aggregator's track table: 1 mask on the state column.
+        rows = table_rows(tracked_objects)
+        if rows is not None:
+            table, row_ids = rows
+            keep = (table.state[row_ids] == STATE_CODES[TrackedState.STABLE]).tolist()
+            stable_objects = [obj for obj, is_stable in zip(tracked_objects, keep) if is_stable]
+        else:
+            stable_objects = [obj for obj in tracked_objects if obj.state == TrackedState.STABLE]
 
         logger.info(f"StableObjectFilter-> filter_detections() ENDS: after filtering n(objects): {len(stable_objects)}")
         return stable_objects
@@ -0,0 +1,175 @@
+# Aim: Fused decision kernel: STABLE filter, hard rules and priority score of the aggregator's track table, as 1 pass of NumPy expressions.
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from src.common.logging import logger
+from src.fish.stage1_vision.entity import TrackedGarbage, TrackedState
+from src.fish.stage1_vision.track_table import TrackTable, TrackView, STATE_CODES, FREE_ROW, table_rows
+from src.fish.stage2_decision.ranking import RankedCandidates
+from src.fish.stage2_decision.rules import RuleFilter
+from src.fish.stage2_decision.reasoner import PriorityReasoner, DEFAULT_CLASS_WEIGHT
+
+
+class DecisionKernel:
+    """
+    Same ranking as StableObjectFilter -> RuleFilter -> PriorityReasoner -> sort, computed on the columns of the track table:
+        - state / age / confidence / class masks combined into 1 keep mask;
+        - priority score = class weight + age score + confidence score, as array expressions (same float operations, same scores);
+        - descending stable argsort: ties keep the order of the active objects, like the stable `list.sort()`.
+
+    Class weight and allowed class are read from lookup tables indexed by class_id. A class id is resolved from its class name
+    (reasoner weights, allowed classes) the first time it is met, so the tables follow the detector's classes without extra config.
+
+    `update()` is the incremental form: only the rows of the table's change feed (sighted, state changed or released since the previous
+    frame) are evaluated, and the eligible ones are kept in `candidates`, an indexed heap (best candidate and lookup by track id).
+    The travel cost depends on the navigator's heading too: every row is evaluated again when the heading offset changes (turns).
+    """
+    def __init__(self, rule_filter: RuleFilter, reasoner: PriorityReasoner):
+        self.rule_filter = rule_filter
+        self.reasoner = reasoner
+
+        # Lookup tables, indexed by class_id
+        self.class_weights = np.zeros(0, dtype = np.float64)
+        self.allowed_classes = np.zeros(0, dtype = bool)
+        self.known_classes = np.zeros(0, dtype = bool)
+
+        # Incremental ranking
+        self.table: Optional[TrackTable] = None                             # table whose change feed is consumed
+        self.candidates: RankedCandidates = RankedCandidates()
+        self.candidate_rows: Dict[int, int] = {}                            # row -> track id of the candidate stored in that row
+        self.scored_heading: float = 0.0                                    # heading offset of the stored travel costs
+
+
+    def rank(self, tracked_objects: List[TrackedGarbage]) -> Optional[List[Tuple[TrackedGarbage, float]]]:
+        """
+        Filters and ranks the active objects in 1 pass.
+
+        :param self: Belongs to the DecisionKernel class.
+        :param tracked_objects: Active tracked objects from the Vision module.
+        :type tracked_objects: List[TrackedGarbage]
+        :return: (object, priority score) of the eligible objects, highest score first.
+                 None if the objects are not views of 1 track table (or too few to vectorize): use the step-by-step filters.
+        :rtype: Optional[List[Tuple[TrackedGarbage, float]]]
+        """
+        rows = table_rows(tracked_objects)
+        if rows is None:
+            return None
+
+        table, row_ids = rows
+        keep, scores = self._evaluate(table, row_ids)
+        kept = np.nonzero(keep)[0]
+        scores = scores[kept]
+
+        order = np.argsort(-scores, kind = "stable")
+        return [(tracked_objects[idx], score) for idx, score in zip(kept[order].tolist(), scores[order].tolist())]
+
+
+    def update(self, tracked_objects: List[TrackedGarbage]) -> Optional[RankedCandidates]:
+        """
+        Updates the candidates with the tracks which changed since the previous frame.
+
+        :param self: Belongs to the DecisionKernel class.
+        :param tracked_objects: Active tracked objects from the Vision module (views of the aggregator's track table).
+        :type tracked_objects: List[TrackedGarbage]
+        :return: Eligible objects ranked by priority score. None if the objects are not views of a track table.
+        :rtype: Optional[RankedCandidates]
+        """
+        if not tracked_objects or type(tracked_objects[0]) is not TrackView:
+            return None
+
+        table = tracked_objects[0]._table
+        travel = self.reasoner.travel
+        if table is not self.table:
+            # First frame, or new table (restored snapshot): every row in use is evaluated.
+            self.table = table
+            self.candidates.clear()
+            self.candidate_rows.clear()
+            table.take_changes()
+            changed = np.nonzero(table.state[:table.next_row] != FREE_ROW)[0]
+        elif travel is not None and travel.heading_offset != self.scored_heading:
+            # New heading: the travel cost of every row changed (released rows still remove their candidate).
+            changed = np.union1d(table.take_changes(), np.nonzero(table.state[:table.next_row] != FREE_ROW)[0])
+        else:
+            changed = table.take_changes()
+        if travel is not None:
+            self.scored_heading = travel.heading_offset
+
+        if len(changed) == 0:
+            return self.candidates
+
+        keep, scores = self._evaluate(table, changed)
+        updates: List[Tuple[int, float, TrackedGarbage]] = []
+        removals: List[int] = []
+        for row, track_id, passed, score in zip(changed.tolist(), table.track_id[changed].tolist(), keep.tolist(), scores.tolist()):
+            # A reused row (evicted record) may still hold the candidate of its previous track.
+            previous_id = self.candidate_rows.get(row)
+            if previous_id is not None and (previous_id != track_id or not passed):
+                removals.append(previous_id)
+                del self.candidate_rows[row]
+            if passed:
+                updates.append((track_id, score, table.view(row)))
+                self.candidate_rows[row] = track_id
+
+        self.candidates.apply(updates, removals)
+        return self.candidates
+
+
+    def _evaluate(self, table: TrackTable, row_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Keep mask (STABLE + hard rules) and priority score of the rows.
+        """
+        class_ids = table.class_id[row_ids]
+        self._resolve_classes(table, row_ids, class_ids)
+        rules, reasoner = self.rule_filter, self.reasoner
+
+        # Filter (STABLE) + hard rules (age, confidence, class) as 1 mask.
+        rule_confidence = table.confidence_statistic(row_ids, rules.confidence)
+        if rules.min_age_seconds is not None:
+            old_enough = table.age_seconds(row_ids) >= rules.min_age_seconds
+        else:
+            old_enough = table.age[row_ids] >= rules.min_age
+        keep = (
+            (table.state[row_ids] == STATE_CODES[TrackedState.STABLE])
+            & old_enough
+            & (rule_confidence >= rules.min_conf)
+            & self.allowed_classes[class_ids]
+        )
+
+        # Priority score (same operations as the reasoner).
+        if reasoner.age_weight_per_second is not None:
+            age_score = table.age_seconds(row_ids) * reasoner.age_weight_per_second
+        else:
+            age_score = table.age[row_ids] * reasoner.age_weight
+        confidence = rule_confidence if reasoner.confidence == rules.confidence else table.confidence_statistic(row_ids, reasoner.confidence)
+        scores = self.class_weights[class_ids] + age_score + confidence * reasoner.conf_weight
+        if reasoner.travel is not None:
+            scores = scores - reasoner.travel.travel_costs(table.bbox[row_ids]) * reasoner.travel_weight
+        return keep, scores
+
+
+    def _resolve_classes(self, table: TrackTable, row_ids: np.ndarray, class_ids: np.ndarray):
+        """
+        Fills the lookup tables for the class ids met for the first time (grown to the highest class id).
+        """
+        if len(class_ids) == 0:
+            return
+
+        size = int(class_ids.max()) + 1
+        if size > len(self.known_classes):
+            extra = size - len(self.known_classes)
+            self.class_weights = np.concatenate([self.class_weights, np.zeros(extra, dtype = np.float64)])
+            self.allowed_classes = np.concatenate([self.allowed_classes, np.zeros(extra, dtype = bool)])
+            self.known_classes = np.concatenate([self.known_classes, np.zeros(extra, dtype = bool)])
+
+        unknown = np.nonzero(~self.known_classes[class_ids])[0]
+        if len(unknown) == 0:
+            return
+
+        new_ids, first = np.unique(class_ids[unknown], return_index = True)
+        for class_id, row in zip(new_ids.tolist(), row_ids[unknown[first]].tolist()):
+            class_name = table.class_name[row]
+            self.class_weights[class_id] = self.reasoner.class_weights.get(class_name, DEFAULT_CLASS_WEIGHT)
+            self.allowed_classes[class_id] = class_name in self.rule_filter.allowed_classes
+            self.known_classes[class_id] = True
+            logger.info(f"DecisionKernel -> resolve_classes(): class {class_id} ({class_name}), weight: {self.class_weights[class_id]}, allowed: {self.allowed_classes[class_id]}")
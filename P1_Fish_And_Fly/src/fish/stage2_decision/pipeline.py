@@ -1,69 +1,64 @@
 from box import ConfigBox
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 from src.common.logging import logger
+from src.common.projection.convert_camera_to_world import CameraToWorldProjector
 
-from src.fish.stage1_vision.entity import TrackedGarbage
+from src.fish.stage1_vision.entity import TrackedGarbage, TrackedState
 
 from src.fish.stage2_decision.filter import StableObjectFilter
 from src.fish.stage2_decision.rules import RuleFilter
 from src.fish.stage2_decision.reasoner import PriorityReasoner
 from src.fish.stage2_decision.planner import ActionPlanner
 from src.fish.stage2_decision.selector import SelectionLock
+from src.fish.stage2_decision.kernel import DecisionKernel
+from src.fish.stage2_decision.ranking import RankedCandidates
 from src.fish.stage2_decision.entity import ActionIntent
 from src.fish.stage2_decision.command import LifeCycleCommand
 
 
+RANKED_LOG_LIMIT = 10                       # ranked objects written in the log of every frame (the log line stays short at any object count)
+
+
 class DecisionPipeline:
     """
     Stage2: Decision Pipeline
     - Filter stable objects
-    - Applies Hard rules + Soft reasoning
+    - Applies Hard rules + Soft reasoning (incl. travel cost from the world projection and the navigator's heading)
     - Ranks by priority
-    - Selects and locks one object
+    - Selects and locks one object (sequencing mode: an ordered batch of up to `planner.max_targets` objects, see `run_sequence()`)
     - Emits lifecycle command
     """
 
-    def __init__(self, decision_cfg: ConfigBox):
+    def __init__(self, decision_cfg: ConfigBox, projector: Optional[CameraToWorldProjector] = None):
         self.filter = StableObjectFilter()
         self.rule_filter = RuleFilter(decision_cfg.rules)
-        self.reasoner = PriorityReasoner(decision_cfg.reasoner)
-        self.planner = ActionPlanner(decision_cfg.planner)
+        self.reasoner = PriorityReasoner(decision_cfg.reasoner, projector = projector)                  # travel cost needs the projector
+        self.planner = ActionPlanner(decision_cfg.planner, projector = projector)                       # pickup order needs the projector
         self.selector = SelectionLock()
+        self.kernel = DecisionKernel(self.rule_filter, self.reasoner)
+        self.batch_targets: Dict[int, Tuple[TrackedGarbage, float]] = {}        # track id -> (object, priority score at lock time) of the locked batch
+
 
 
+    def run(self, active_tracked_agg_objects: List[TrackedGarbage], heading_offset: Optional[float] = None) -> Tuple[Optional[ActionIntent], Optional[LifeCycleCommand]]:
+        logger.info(f"DecisionPipeline -> run(): STARTS, active_objects: {len(active_tracked_agg_objects)}, heading offset: {heading_offset}")
 
-    def run(self, active_tracked_agg_objects: List[TrackedGarbage]) -> Tuple[Optional[ActionIntent], Optional[LifeCycleCommand]]:
-        logger.info(f"DecisionPipeline -> run(): STARTS, active_objects: {len(active_tracked_agg_objects)}")
+        # Turn the navigator is about to make (radians, positive to the right), for the travel cost of the objects.
+        if heading_offset is not None and self.reasoner.travel is not None:
+            self.reasoner.travel.set_heading(heading_offset)
 
         # If there is no active objects present, then no object can be selected.
         if len(active_tracked_agg_objects) == 0:              
             logger.info(f"DecisionPipeline-> run(): No tracked active objects are received from the Vision module")
             return None, None
 
-        # Step1: Filtering out only STABLE objects.
-        stable_tracked_objects = self.filter.filter_detections(active_tracked_agg_objects)
-
-        # Step2: Applying Hard Gate / Rule-based Filtering
-        valid_objects = self.rule_filter.apply_hard_rules(stable_tracked_objects)
-        if not valid_objects:
-            logger.info(f"DecisionPipeline-> run(): No eligible objects")
-            return None, None
-
-        # Step3: Applying Soft Intelligence / Reasoning
-        # returns List[(TrackedGarbage, priority_score)]
-        ranked_objects = self.reasoner.calculate_priority_score(valid_objects)             
+        # Steps 1-4 fused and incremental: filter, hard rules and scoring of the tracks which changed since the previous frame,
+        # kept in an indexed heap (best candidate, lookup of the locked id).
+        ranked_objects = self._rank(active_tracked_agg_objects)
         if not ranked_objects:
-            logger.info(f"DecisionPipeline-> run(): No priority-scored objects")
+            logger.info(f"DecisionPipeline-> run(): No eligible objects")
             return None, None
-        
-        # Step4: Sorting the (tracked object, priority_score) dictionary w.r.t priority score in descending order
-        ranked_objects.sort(key = lambda x: x[1], reverse = True)                           
-        logger.info(
-            "DecisionPipeline -> Ranked objects: " + ", ".join(
-                f"(id={obj.track_id}, score={score:.2f})" for obj, score in ranked_objects if obj is not None
-            )
-        )
 
         # Step5: Selects and locks 1 target, generating a lifecycle command
         select_command = self.selector.select_target(ranked_objects)
@@ -74,3 +69,135 @@ class DecisionPipeline:
 
         logger.info(f"DecisionPipeline -> run(): ENDS, action intent: {action_intent}, select_command: {select_command}")
         return action_intent, select_command
+
+
+
+    def run_sequence(self, active_tracked_agg_objects: List[TrackedGarbage], heading_offset: Optional[float] = None) -> Tuple[List[ActionIntent], List[LifeCycleCommand]]:
+        """
+        Sequencing mode: locks an ordered batch of up to `planner.max_targets` targets and keeps it across frames.
+            - no locked batch: the best candidates are locked, in pickup order (shortest route over their world positions);
+            - a target of the batch is released (collected, failed, UNATTEMPTED when out of reach) or lost (LOST, evicted): it leaves
+              the batch and the free slots are refilled with the next best candidates, each inserted at its cheapest position
+              (incremental re-plan, the order of the others is kept).
+
+        :param self: Belongs to the DecisionPipeline class.
+        :param active_tracked_agg_objects: Active tracked objects from the Vision module.
+        :type active_tracked_agg_objects: List[TrackedGarbage]
+        :param heading_offset: Turn the navigator is about to make (radians, positive to the right).
+        :type heading_offset: Optional[float]
+        :return: Action intents of the locked batch in pickup order (the 1st one is the locked target), and the SELECT commands.
+        :rtype: Tuple[List[ActionIntent], List[LifeCycleCommand]]
+        """
+        logger.info(f"DecisionPipeline -> run_sequence(): STARTS, active_objects: {len(active_tracked_agg_objects)}, heading offset: {heading_offset}")
+
+        if heading_offset is not None and self.reasoner.travel is not None:
+            self.reasoner.travel.set_heading(heading_offset)
+
+        if len(active_tracked_agg_objects) == 0:
+            logger.info(f"DecisionPipeline-> run_sequence(): No tracked active objects are received from the Vision module")
+            return [], []
+
+        ranked_objects = self._rank(active_tracked_agg_objects)
+        lost_targets = self._sync_batch(active_tracked_agg_objects)
+        select_commands: List[LifeCycleCommand] = []
+
+        if not self.batch_targets:
+            # New batch: the best candidates, in pickup order.
+            batch = self.planner.plan_batch(self._best_candidates(ranked_objects, self.planner.max_targets))
+            select_commands = self.selector.select_batch([tracked_object.track_id for tracked_object, _ in batch])
+            self.batch_targets = {tracked_object.track_id: (tracked_object, pri_score) for tracked_object, pri_score in batch}
+
+        elif len(self.batch_targets) < self.planner.max_targets:
+            # Incremental re-plan: the next best candidates take the slots freed by released and lost targets.
+            free_slots = self.planner.max_targets - len(self.batch_targets)
+            refills = [
+                (tracked_object, pri_score) for tracked_object, pri_score in self._best_candidates(ranked_objects, self.planner.max_targets + free_slots)
+                if tracked_object.track_id not in self.batch_targets
+            ][:free_slots]
+            for tracked_object, pri_score in refills:
+                plan = [self.batch_targets[track_id] for track_id in self.selector.get_locked_targets()]
+                position = self.planner.insert_position(plan, tracked_object)
+                select_commands.append(self.selector.insert_target(tracked_object.track_id, position))
+                self.batch_targets[tracked_object.track_id] = (tracked_object, pri_score)
+
+        action_plan = self.planner.build_action_plan([self.batch_targets[track_id] for track_id in self.selector.get_locked_targets()])
+
+        logger.info(f"DecisionPipeline -> run_sequence(): ENDS, batch: {[action_intent.track_id for action_intent in action_plan]}, "
+                    f"lost: {lost_targets}, select commands: {len(select_commands)}")
+        return action_plan, select_commands
+
+
+
+    def _sync_batch(self, active_tracked_agg_objects: List[TrackedGarbage]) -> int:
+        """
+        Aligns `batch_targets` with the selector's locked batch (released targets leave it, restored ids are looked up in the
+        active objects) and drops the targets which are no longer tracked. Returns the number of dropped targets.
+        """
+        locked_ids = self.selector.get_locked_targets()
+        missing = set(locked_ids) - set(self.batch_targets)
+        if missing:
+            # Restored lock (mission resume): the score at lock time is unknown.
+            for tracked_object in active_tracked_agg_objects:
+                if tracked_object.track_id in missing:
+                    self.batch_targets[tracked_object.track_id] = (tracked_object, 0.0)
+
+        lost_targets = 0
+        for track_id in locked_ids:
+            entry = self.batch_targets.get(track_id)
+            # The object of a reused table row may belong to another track.
+            if entry is None or entry[0].track_id != track_id or entry[0].state not in (TrackedState.STABLE, TrackedState.SELECTED):
+                self.selector.drop_target(track_id)
+                lost_targets += 1
+
+        self.batch_targets = {track_id: self.batch_targets[track_id] for track_id in self.selector.get_locked_targets()}
+        return lost_targets
+
+
+
+    @staticmethod
+    def _best_candidates(ranked_objects: Union[RankedCandidates, List[Tuple[Optional[TrackedGarbage], float]]], limit: int) -> List[Tuple[TrackedGarbage, float]]:
+        if not ranked_objects:
+            return []
+        best_objects = ranked_objects.ranked(limit) if isinstance(ranked_objects, RankedCandidates) else ranked_objects[:limit]
+        return [(tracked_object, pri_score) for tracked_object, pri_score in best_objects if tracked_object is not None]
+
+
+
+    def _rank(self, active_tracked_agg_objects: List[TrackedGarbage]) -> Union[RankedCandidates, List[Tuple[Optional[TrackedGarbage], float]]]:
+        """
+        Steps 1-4: eligible objects ranked by priority score (fused kernel, or the step-by-step filters for plain objects).
+        """
+        ranked_objects: Union[RankedCandidates, List[Tuple[Optional[TrackedGarbage], float]]] = self.kernel.update(active_tracked_agg_objects)
+        if ranked_objects is None:
+            ranked_objects = self._rank_step_by_step(active_tracked_agg_objects)
+
+        if ranked_objects:
+            best_objects = ranked_objects.ranked(RANKED_LOG_LIMIT) if isinstance(ranked_objects, RankedCandidates) else ranked_objects[:RANKED_LOG_LIMIT]
+            logger.info(
+                f"DecisionPipeline -> Ranked objects ({len(ranked_objects)}), best: " + ", ".join(
+                    f"(id={obj.track_id}, score={score:.2f})" for obj, score in best_objects if obj is not None
+                )
+            )
+        return ranked_objects
+
+
+
+    def _rank_step_by_step(self, active_tracked_agg_objects: List[TrackedGarbage]) -> List[Tuple[Optional[TrackedGarbage], float]]:
+        """
+        Steps 1-4 one after another, for objects which are not views of the aggregator's track table (or only a few of them).
+        """
+        # Step1: Filtering out only STABLE objects.
+        stable_tracked_objects = self.filter.filter_detections(active_tracked_agg_objects)
+
+        # Step2: Applying Hard Gate / Rule-based Filtering
+        valid_objects = self.rule_filter.apply_hard_rules(stable_tracked_objects)
+        if not valid_objects:
+            return []
+
+        # Step3: Applying Soft Intelligence / Reasoning
+        # returns List[(TrackedGarbage, priority_score)]
+        ranked_objects = self.reasoner.calculate_priority_score(valid_objects)
+
+        # Step4: Sorting the (tracked object, priority_score) dictionary w.r.t priority score in descending order
+        ranked_objects.sort(key = lambda x: x[1], reverse = True)
+        return ranked_objects
@@ -1,31 +1,46 @@
-from typing import List, Optional, Tuple
+import numpy as np
+from typing import List, Optional, Tuple, Union
 from src.common.logging import logger
+from src.common.projection.convert_camera_to_world import CameraToWorldProjector
 from src.fish.stage1_vision.entity import TrackedGarbage
 from src.fish.stage2_decision.entity import ActionIntent
+from src.fish.stage2_decision.ranking import RankedCandidates
+from src.fish.stage2_decision.sequencer import PickupSequencer
 
 
 class ActionPlanner:
     """
     Builds ActionIntent only for the locked target.
+
+    Sequencing mode (`planner.sequencing`): plans an ordered batch of up to `max_targets` targets, in the shortest pickup order over
+    their world positions (`PickupSequencer`), and builds 1 ActionIntent per target of the batch.
+
+    The lateral (x) and distance (y) proxies of the world frame do not share a scale (x in [-1, 1], y ~0.01-0.1 with the default projector):
+    x is multiplied by `planner.lateral_weight` (same role as `reasoner.travel.lateral_weight`) before any route length is measured,
+    otherwise the route would order the targets by left / right position only.
     """
 
-    def __init__(self, planner_cfg):
+    def __init__(self, planner_cfg, projector: Optional[CameraToWorldProjector] = None):
         self.max_targets: int = planner_cfg.max_targets
+        self.sequencing: bool = bool(planner_cfg.get("sequencing")) and self.max_targets > 1
+        self.sequencer = PickupSequencer(exact_max_targets = planner_cfg.get("exact_max_targets") or 6)
+        self.projector = projector                                                  # world positions of the targets, None: rank order
+        self.lateral_weight: float = planner_cfg.get("lateral_weight") or 0.02      # lateral proxy -> distance proxy scale
 
 
-    def build_action_intents(self, ranked_objects: List[Tuple[Optional[TrackedGarbage], float]], locked_track_id: Optional[int]) -> Optional[ActionIntent]:
+    def build_action_intents(self, ranked_objects: Union[RankedCandidates, List[Tuple[Optional[TrackedGarbage], float]]], locked_track_id: Optional[int]) -> Optional[ActionIntent]:
         """
         Builds action intent for the locked target.
         
         :param self: Belongs to the ActionPlanner class.
-        :param ranked_objects: List of ranked tracked objects.
+        :param ranked_objects: Ranked candidates (indexed heap, looked up by track id), or list of ranked tracked objects.
         :param locked_track_id: Track_id of the locked target object.
         :type locked_track_id: int
         :return: List of action intents.
         :rtype: List[ActionIntent]
         """
         logger.info(f"build_action_intents(): STARTS")
-        logger.info(f"ranked_objects: {ranked_objects}, locked_id: {locked_track_id}")
+        logger.info(f"ranked_objects: {len(ranked_objects)}, locked_id: {locked_track_id}")       # not the objects: their repr costs O(objects)
 
         if locked_track_id is None:
             logger.info(f"No object is locked")
@@ -35,7 +50,12 @@ class ActionPlanner:
             logger.info("No objects are present")
             return None
 
-        for object, pri_score in ranked_objects:
+        if isinstance(ranked_objects, RankedCandidates):
+            candidates = [ranked_objects.get(locked_track_id) or (None, 0.0)]           # O(1) lookup by track id
+        else:
+            candidates = ranked_objects
+
+        for object, pri_score in candidates:
             if object == None:
                 continue
 
@@ -55,3 +75,61 @@ class ActionPlanner:
         return None
     
 
+    def plan_batch(self, candidates: List[Tuple[TrackedGarbage, float]]) -> List[Tuple[TrackedGarbage, float]]:
+        """
+        Orders the targets of a new batch for pickup (shortest route from the Fish machine over their world positions).
+
+        :param self: Belongs to the ActionPlanner class.
+        :param candidates: (object, priority score) of the best candidates, at most `max_targets`.
+        :type candidates: List[Tuple[TrackedGarbage, float]]
+        :return: The same (object, priority score), in pickup order.
+        :rtype: List[Tuple[TrackedGarbage, float]]
+        """
+        if len(candidates) <= 1 or self.projector is None:
+            return list(candidates)
+
+        order = self.sequencer.order(self._world_positions([tracked_object for tracked_object, _ in candidates]))
+        return [candidates[idx] for idx in order]
+
+
+    def insert_position(self, plan: List[Tuple[TrackedGarbage, float]], tracked_object: TrackedGarbage) -> int:
+        """
+        Position of a new target in a planned batch which lengthens its route the least (the order of the others is kept).
+        """
+        if not plan or self.projector is None:
+            return len(plan)
+
+        positions = self._world_positions([planned_object for planned_object, _ in plan] + [tracked_object])
+        return self.sequencer.insert(positions, list(range(len(plan))), len(plan))
+
+
+    def build_action_plan(self, plan: List[Tuple[TrackedGarbage, float]]) -> List[ActionIntent]:
+        """
+        Builds the action intents of a locked batch, in pickup order (the 1st one is the locked target).
+
+        :param self: Belongs to the ActionPlanner class.
+        :param plan: (object, priority score at lock time) of the locked targets, in pickup order.
+        :type plan: List[Tuple[TrackedGarbage, float]]
+        :return: List of action intents.
+        :rtype: List[ActionIntent]
+        """
+        action_plan = [
+            ActionIntent(
+                track_id = tracked_object.track_id,
+                class_name = tracked_object.class_name,
+                priority_score = pri_score,
+                bbox = tracked_object.bbox,
+                reason = f"Locked batch target {position + 1}/{len(plan)}"
+            )
+            for position, (tracked_object, pri_score) in enumerate(plan)
+        ]
+        logger.info(f"ActionPlanner -> build_action_plan(): targets: {[action_intent.track_id for action_intent in action_plan]}")
+        return action_plan
+
+
+    def _world_positions(self, tracked_objects: List[TrackedGarbage]) -> np.ndarray:
+        """
+        Robot-centric world positions (N, 2) as (lateral x * `lateral_weight`, distance y) of the objects: both axes on the distance scale.
+        """
+        lateral, distance = self.projector.project_boxes(np.array([tracked_object.bbox for tracked_object in tracked_objects], dtype = np.int64))
+        return np.stack([lateral * self.lateral_weight, distance], axis = 1)
@@ -0,0 +1,166 @@
+# Aim: Incremental ranking of the decision candidates: indexed max-heap of priority scores, keyed by track id.
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.fish.stage1_vision.entity import TrackedGarbage
+
+
+class RankedCandidates:
+    """
+    Eligible objects and their priority scores, kept across frames and updated only for the tracks which changed.
+
+        - `best()`: highest score, O(1) (the heap root). `update()` / `remove()`: O(log n).
+        - `get(track_id)`: O(1), through the position index (track id -> heap slot).
+        - Ties: the object which became a candidate first wins (entry order kept while the object stays a candidate).
+
+    Heap entries are lists [-score, entry order, track id, object], compared on (-score, entry order) only (the order is unique).
+    """
+    def __init__(self):
+        self._heap: List[list] = []
+        self._position: Dict[int, int] = {}
+        self._next_order: int = 0
+
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._position
+
+
+    def best(self) -> Optional[Tuple[TrackedGarbage, float]]:
+        """
+        Provides the (object, score) with the highest score, None if there is no candidate.
+        """
+        if not self._heap:
+            return None
+        entry = self._heap[0]
+        return entry[3], -entry[0]
+
+
+    def get(self, track_id: int) -> Optional[Tuple[TrackedGarbage, float]]:
+        """
+        Provides the (object, score) of 1 track, None if it is not a candidate.
+        """
+        position = self._position.get(track_id)
+        if position is None:
+            return None
+        entry = self._heap[position]
+        return entry[3], -entry[0]
+
+
+    def ranked(self, limit: Optional[int] = None) -> List[Tuple[TrackedGarbage, float]]:
+        """
+        Provides the (object, score) of the candidates, highest score first (the `limit` best ones if given).
+        """
+        entries = heapq.nsmallest(limit, self._heap) if limit is not None else sorted(self._heap)
+        return [(entry[3], -entry[0]) for entry in entries]
+
+
+    def update(self, track_id: int, score: float, tracked_object: TrackedGarbage):
+        """
+        Adds the track as a candidate, or changes its score.
+        """
+        position = self._position.get(track_id)
+        if position is None:
+            self._heap.append([-score, self._next_order, track_id, tracked_object])
+            self._next_order += 1
+            position = len(self._heap) - 1
+            self._position[track_id] = position
+            self._sift_up(position)
+            return
+
+        entry = self._heap[position]
+        previous, entry[0], entry[3] = entry[0], -score, tracked_object
+        if entry[0] < previous:
+            self._sift_up(position)
+        elif entry[0] > previous:
+            self._sift_down(position)
+
+
+    def remove(self, track_id: int):
+        """
+        Removes the track from the candidates (no-op if it is not one).
+        """
+        position = self._position.pop(track_id, None)
+        if position is None:
+            return
+
+        last = self._heap.pop()
+        if position == len(self._heap):
+            return
+        self._heap[position] = last
+        self._position[last[2]] = position
+        self._sift_up(position)
+        self._sift_down(self._position[last[2]])
+
+
+    def apply(self, updates: Iterable[Tuple[int, float, TrackedGarbage]], removals: Iterable[int]):
+        """
+        Applies the changes of 1 frame. When they touch a large part of the heap (dense scene, every track detected),
+        the heap is rebuilt in O(n) instead of O(changes * log n).
+
+        :param self: Belongs to the RankedCandidates class.
+        :param updates: (track id, score, object) of the eligible changed tracks.
+        :param removals: Track ids which are no longer eligible.
+        """
+        updates, removals = list(updates), list(removals)
+        if len(updates) + len(removals) <= len(self._heap) // 4 + 8:
+            for track_id in removals:
+                self.remove(track_id)
+            for track_id, score, tracked_object in updates:
+                self.update(track_id, score, tracked_object)
+            return
+
+        removed = set(removals)
+        heap = [entry for entry in self._heap if entry[2] not in removed]
+        position = {entry[2]: idx for idx, entry in enumerate(heap)}
+        for track_id, score, tracked_object in updates:
+            idx = position.get(track_id)
+            if idx is None:
+                position[track_id] = len(heap)
+                heap.append([-score, self._next_order, track_id, tracked_object])
+                self._next_order += 1
+            else:
+                heap[idx][0], heap[idx][3] = -score, tracked_object
+
+        heapq.heapify(heap)
+        self._heap = heap
+        self._position = {entry[2]: idx for idx, entry in enumerate(heap)}
+
+
+    def clear(self):
+        self._heap = []
+        self._position = {}
+
+
+    def _sift_up(self, position: int):
+        heap, entry = self._heap, self._heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if not entry < heap[parent]:
+                break
+            heap[position] = heap[parent]
+            self._position[heap[position][2]] = position
+            position = parent
+        heap[position] = entry
+        self._position[entry[2]] = position
+
+
+    def _sift_down(self, position: int):
+        heap, entry, size = self._heap, self._heap[position], len(self._heap)
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[position] = heap[child]
+            self._position[heap[position][2]] = position
+            position = child
+        heap[position] = entry
+        self._position[entry[2]] = position
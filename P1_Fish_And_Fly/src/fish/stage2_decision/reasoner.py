@@ -5,23 +5,41 @@
 
 # Decision signals we used in the Reasoner subsystem are:
 # 1. Class weight
-# 2. Age
-# 3. Confidence
+# 2. Age (frames seen, or seconds tracked)
+# 3. Confidence (mean, EMA or windowed)
+# 4. Travel cost (distance, lateral offset and turn from the navigator's heading), subtracted: cheap-to-reach targets first
 
 from typing import List, Tuple, Optional
 from src.common.logging import logger
+from src.common.projection.convert_camera_to_world import CameraToWorldProjector
 from src.fish.stage1_vision.entity import TrackedGarbage
+from src.fish.stage1_vision.track_table import CONFIDENCE_STATISTICS
+from src.fish.stage2_decision.travel import TravelCostEstimator
 
 
+DEFAULT_CLASS_WEIGHT = 0.5                  # class score of a class missing from `class_weights`
+
 class PriorityReasoner:
     """
     Calculate a priority score for tracked garbages.
     """
-    def __init__(self, reasoner_cfg):
+    def __init__(self, reasoner_cfg, projector: Optional[CameraToWorldProjector] = None):
         # Getting decision signals from the set Decision configuration.
         self.class_weights = reasoner_cfg.class_weights
         self.age_weight = reasoner_cfg.age_weight
+        self.age_weight_per_second: Optional[float] = reasoner_cfg.get("age_weight_per_second")     # if set, age score from seconds tracked
         self.conf_weight = reasoner_cfg.conf_weight
+        self.confidence: str = reasoner_cfg.get("confidence") or "mean"                              # confidence statistic of the score
+
+        if self.confidence not in CONFIDENCE_STATISTICS:
+            raise ValueError(f"Unknown confidence statistic: {self.confidence}, supported: {list(CONFIDENCE_STATISTICS)}")
+        self.confidence_attribute: str = CONFIDENCE_STATISTICS[self.confidence]
+
+        # Travel cost signal: only with a weight and a projector (same world frame as the Action module).
+        self.travel_weight: float = reasoner_cfg.get("travel_weight") or 0.0
+        self.travel: Optional[TravelCostEstimator] = None
+        if self.travel_weight and projector is not None:
+            self.travel = TravelCostEstimator(projector, reasoner_cfg.get("travel") or {})
 
 
     # Calculates Priority score for the tracked aggregated objects.
@@ -37,17 +55,23 @@ class PriorityReasoner:
         """
         logger.info(f"calculate_priority_score(): STARTS, Tracked objects: {len(tracked_objects)}")
         priority_scored_objects: List[Tuple[Optional[TrackedGarbage], float]]= []
+        travel_costs = self.travel.object_costs(tracked_objects) if self.travel else None
 
-        for object in tracked_objects:
+        for idx, object in enumerate(tracked_objects):
             # If object is not found in the class_names dict list, assigning class_score = 0.5 (by default)
-            class_score = self.class_weights.get(object.class_name, 0.5)       
+            class_score = self.class_weights.get(object.class_name, DEFAULT_CLASS_WEIGHT)
             
             # Calculating Weighted Decision Signals, using formula [decision signal * weighted score]
-            age_score = object.age * self.age_weight                            
-            confidence_score = object.avg_confidence * self.conf_weight         
+            if self.age_weight_per_second is not None:
+                age_score = object.age_seconds * self.age_weight_per_second
+            else:
+                age_score = object.age * self.age_weight
+            confidence_score = getattr(object, self.confidence_attribute) * self.conf_weight
 
             # Decision Signals combined via weighted Scoring to produce a Priority Score.
             priority_score: int = class_score + age_score + confidence_score
+            if travel_costs is not None:
+                priority_score = priority_score - travel_costs[idx] * self.travel_weight
 
             # Adding current(object, priority_score) to the final list.
             priority_scored_objects.append((object, priority_score))
@@ -2,13 +2,15 @@
 # It is a filter system with a defined set of rules, to filter out the unstable detections.
 
 # Set of rules for the Rule subsystem are:-
-# 1. Rule1: Minimum Age(Number of frames apperared) of a detection.
-# 2. Rule2: Minimum Confidence of a detection.
+# 1. Rule1: Minimum Age(Number of frames apperared, or seconds tracked) of a detection.
+# 2. Rule2: Minimum Confidence(mean, EMA or windowed) of a detection.
 # 3. Rule3: Allowed classes of a detection.
 
-from typing import List
+import numpy as np
+from typing import List, Optional
 from src.common.logging import logger
 from src.fish.stage1_vision.entity import TrackedGarbage
+from src.fish.stage1_vision.track_table import table_rows, CONFIDENCE_STATISTICS
 
 
 class RuleFilter:
@@ -17,8 +19,14 @@ class RuleFilter:
     """
     def __init__(self, rules_cfg):
         self.min_age: int =  rules_cfg.min_age
+        self.min_age_seconds: Optional[float] = rules_cfg.get("min_age_seconds")     # if set, replaces min_age (frame-rate independent)
         self.min_conf: float = rules_cfg.min_conf
+        self.confidence: str = rules_cfg.get("confidence") or "mean"                 # confidence statistic of Rule2
         self.allowed_classes: List[str] = rules_cfg.allowed_classes
+
+        if self.confidence not in CONFIDENCE_STATISTICS:
+            raise ValueError(f"Unknown confidence statistic: {self.confidence}, supported: {list(CONFIDENCE_STATISTICS)}")
+        self.confidence_attribute: str = CONFIDENCE_STATISTICS[self.confidence]
         
     
     # Applies HARD GATE(set of rules) to filter unstable detections, from the tracked aggregated detections from the Vision Module.
@@ -34,17 +42,35 @@ class RuleFilter:
         """
         logger.info(f"apply_hard_rules(): STARTS, initial detections: {len(tracked_objects)}")
 
+        # Views of the aggregator's track table: the 3 rules as 1 mask over its columns.
+        rows = table_rows(tracked_objects)
+        if rows is not None:
+            table, row_ids = rows
+            old_enough = (table.age_seconds(row_ids) >= self.min_age_seconds) if self.min_age_seconds is not None else (table.age[row_ids] >= self.min_age)
+            keep = (
+                old_enough
+                & (table.confidence_statistic(row_ids, self.confidence) >= self.min_conf)
+                & np.isin(table.class_name[row_ids], list(self.allowed_classes))
+            ).tolist()
+            filtered_objects = [obj for obj, passed in zip(tracked_objects, keep) if passed]
+
+            logger.info(f"apply_hard_rules(): ENDS, final filtered detections: {len(filtered_objects)}")
+            return filtered_objects
+
         filtered_objects: List[TrackedGarbage] = []
         
         # Filtering the tracked aggregated list of detections.
         for object in tracked_objects:
 
-            # Rule1: If object appeared in lesser frames than the set minimum age, then ignore the detection.
-            if object.age < self.min_age:
+            # Rule1: If object appeared in lesser frames (or is tracked for less time) than the set minimum age, then ignore the detection.
+            if self.min_age_seconds is not None:
+                if object.age_seconds < self.min_age_seconds:
+                    continue
+            elif object.age < self.min_age:
                 continue
 
             # Rule2: If object has lesser confidence than the set minimum confidence, then ignore the detection.
-            if object.avg_confidence < self.min_conf:
+            if getattr(object, self.confidence_attribute) < self.min_conf:
                 continue
 
             # Rule3: If the object is not in the set allowed classes, then ignore the detection.
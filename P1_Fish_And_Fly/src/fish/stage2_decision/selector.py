@@ -1,29 +1,31 @@
 # NOTE: This is pure decision memory, not vision memory.
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Union
 
 from src.common.logging import logger
 
 from src.fish.stage1_vision.entity import TrackedGarbage
 from src.fish.stage2_decision.command import LifeCycleCommand, LifeCycleAction
+from src.fish.stage2_decision.ranking import RankedCandidates
 from src.fish.stage3_action.entity import ActionFeedback, ActionStatus
 
 
 
 class SelectionLock:
     """
-    Maintains a single active target lock.
+    Maintains a single active target lock, or a batch lock (ordered targets collected one after another).
     Responsible Only for selection and release.
     """
     def __init__(self):
         self.active_track_id : Optional[int] = None
+        self.batch: List[int] = []                                      # locked targets in pickup order, the 1st one is `active_track_id`
 
 
-    def select_target(self, ranked_objects: List[Tuple[Optional[TrackedGarbage], float]]) -> Optional[LifeCycleCommand]:
+    def select_target(self, ranked_objects: Union[RankedCandidates, List[Tuple[Optional[TrackedGarbage], float]]]) -> Optional[LifeCycleCommand]:
         """
         Selects highest priority object if no active lock exists.
         
         :param self: Belongs to the SelectionLock class.
-        :param ranked_objects: List of tracked objects, sorted w.r.t priority score.
+        :param ranked_objects: Ranked candidates (indexed heap), or list of tracked objects sorted w.r.t priority score.
         :return: Command to make Lifecycle state transitions (state -> SELECTED) in Vision Aggregator.
         :rtype: LifeCycleCommand | None
         """
@@ -39,13 +41,14 @@ class SelectionLock:
             logger.info("No stable candidates present now")
             return None
 
-        # Selecting highest priority object.
-        selected_object, _ = ranked_objects[0]
+        # Selecting highest priority object (heap root of the ranked candidates).
+        selected_object, _ = ranked_objects.best() if isinstance(ranked_objects, RankedCandidates) else ranked_objects[0]
         if selected_object is None:
             return None
         
         # Locking the highest priority object as target.
         self.active_track_id = selected_object.track_id
+        self.batch = [self.active_track_id]
 
         # New command generation.
         command = LifeCycleCommand(                                     
@@ -57,15 +60,60 @@ class SelectionLock:
         return command
     
 
+    def select_batch(self, track_ids: List[int]) -> List[LifeCycleCommand]:
+        """
+        Locks an ordered batch of targets if no active lock exists, the 1st one becomes the locked target.
+
+        :param self: Belongs to the SelectionLock class.
+        :param track_ids: Track ids of the targets, in pickup order.
+        :type track_ids: List[int]
+        :return: Commands to make Lifecycle state transitions (state -> SELECTED) in Vision Aggregator, 1 per target.
+        :rtype: List[LifeCycleCommand]
+        """
+        logger.info(f"SelectionLock -> select_batch(): STARTS, targets: {track_ids}")
+
+        if self.active_track_id or not track_ids:
+            logger.info(f"No batch is locked, locked track_id: {self.active_track_id}, targets: {len(track_ids)}")
+            return []
+
+        self.batch = list(track_ids)
+        self.active_track_id = self.batch[0]
+        commands = [LifeCycleCommand(action = LifeCycleAction.SELECT, track_id = track_id) for track_id in self.batch]
+
+        logger.info(f"SelectionLock -> select_batch(): ENDS, locked batch: {self.batch}")
+        return commands
+
+
+    def insert_target(self, track_id: int, position: int) -> LifeCycleCommand:
+        """
+        Adds a target to the locked batch at `position` (re-plan after a lost target).
+        """
+        self.batch.insert(position, track_id)
+        self.active_track_id = self.batch[0]
+        logger.info(f"SelectionLock -> insert_target(): track_id: {track_id} at position {position}, batch: {self.batch}")
+        return LifeCycleCommand(action = LifeCycleAction.SELECT, track_id = track_id)
+
+
+    def drop_target(self, track_id: int) -> None:
+        """
+        Removes a lost target from the locked batch, the next target is locked if it was the 1st one.
+        """
+        self.batch = [locked_id for locked_id in self.batch if locked_id != track_id]
+        self.active_track_id = self.batch[0] if self.batch else None
+        logger.info(f"SelectionLock -> drop_target(): track_id: {track_id}, batch: {self.batch}")
+
+
     def release_target(self) -> None:
         """
-        Releases the currently locked target.
+        Releases the currently locked target. With a batch lock, the next target of the batch becomes the locked one.
         
         :param self: Belongs to the SelectionLock class.
         """
         logger.info(f"SelectorLock -> release(): STARTS, before releasing track_id = {self.active_track_id}")
 
-        self.active_track_id = None                                     # triggered only when action_feedback status = SUCCESS / FAILED
+        # triggered only when action_feedback status = SUCCESS / FAILED
+        self.batch = self.batch[1:] if self.batch and self.batch[0] == self.active_track_id else []
+        self.active_track_id = self.batch[0] if self.batch else None
 
         logger.info(f"SelectorLock -> release(): ENDS, after releasing track_id = {self.active_track_id}")
         return
@@ -80,6 +128,40 @@ class SelectionLock:
         return self.active_track_id
 
 
+    def get_locked_targets(self) -> List[int]:
+        """
+        Provides the ids of the locked batch, in pickup order (the locked object only, without a batch).
+        """
+        if self.active_track_id is None:
+            return []
+        return list(self.batch) if self.batch and self.batch[0] == self.active_track_id else [self.active_track_id]
+
+
+    def set_locked_targets(self, track_ids: List[int]) -> None:
+        """
+        Restores a lock (mission resume): the 1st id is the locked target, the others the rest of its batch.
+        """
+        self.batch = list(track_ids)
+        self.active_track_id = self.batch[0] if self.batch else None
+
+
+    def release_restored_targets(self) -> List[LifeCycleCommand]:
+        """
+        Releases a lock restored from a snapshot (mission resume). Its targets cannot be collected: the tracker gives new ids after a
+        restore, so a restored id is never sighted again, and its SELECTED record is never a candidate (not STABLE). Kept, the lock would
+        block every later selection.
+
+        :param self: Belongs to the SelectionLock class.
+        :return: Commands to make Lifecycle state transitions (state -> UNATTEMPTED) in Vision Aggregator, 1 per released target.
+        :rtype: List[LifeCycleCommand]
+        """
+        commands = [LifeCycleCommand(action = LifeCycleAction.UNATTEMPTED, track_id = track_id) for track_id in self.get_locked_targets()]
+        self.batch = []
+        self.active_track_id = None
+        logger.info(f"SelectionLock -> release_restored_targets(): released track ids: {[command.track_id for command in commands]}")
+        return commands
+
+
 
     def handle_action_feedback(self, feedback: ActionFeedback) -> Optional[LifeCycleCommand]:
         """
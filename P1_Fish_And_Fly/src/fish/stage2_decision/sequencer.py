@@ -0,0 +1,123 @@
+# Aim: Pickup order of a batch of targets: shortest open route from the Fish machine through their world positions.
+
+import itertools
+import numpy as np
+from typing import List, Tuple
+
+from src.common.logging import logger
+
+
+class PickupSequencer:
+    """
+    Orders the targets of a batch as a short open route, starting at the Fish machine (origin of the robot-centric world frame):
+        - up to `exact_max_targets` targets: exact, every permutation is measured (6 targets: 720 routes, < 1 ms);
+        - more targets: nearest neighbour, then 2-opt (segment reversals) until no reversal shortens the route.
+
+    Distances are Euclidean: the caller puts both axes of the points on one scale (`ActionPlanner` weights the lateral proxy).
+
+    `insert()` adds 1 target to a planned route at its cheapest position: the order of the other targets is kept (incremental re-plan).
+    """
+    def __init__(self, exact_max_targets: int = 6):
+        self.exact_max_targets: int = exact_max_targets
+
+
+    def order(self, points: np.ndarray, start: Tuple[float, float] = (0.0, 0.0)) -> List[int]:
+        """
+        Provides the visiting order of the points.
+
+        :param self: Belongs to the PickupSequencer class.
+        :param points: World positions (N, 2) of the targets.
+        :type points: np.ndarray
+        :param start: Position of the Fish machine.
+        :type start: Tuple[float, float]
+        :return: Indices of the points, in visiting order.
+        :rtype: List[int]
+        """
+        count = len(points)
+        if count <= 1:
+            return list(range(count))
+
+        distances = self._distances(points, start)                          # node 0: start, node i + 1: point i
+        if count <= self.exact_max_targets:
+            routes = np.array(list(itertools.permutations(range(1, count + 1))))                      # (count!, count)
+            lengths = distances[0, routes[:, 0]] + distances[routes[:, :-1], routes[:, 1:]].sum(axis = 1)
+            route = routes[int(np.argmin(lengths))].tolist()
+        else:
+            route = self._two_opt(distances, self._nearest_neighbour(distances))
+
+        logger.info(f"PickupSequencer -> order(): targets: {count}, route length: {self._length(distances, route):.4f}")
+        return [node - 1 for node in route]
+
+
+    def insert(self, points: np.ndarray, route: List[int], new_index: int, start: Tuple[float, float] = (0.0, 0.0)) -> int:
+        """
+        Provides the position of `new_index` in `route` which lengthens the route the least.
+
+        :param self: Belongs to the PickupSequencer class.
+        :param points: World positions (N, 2) of the route's points and of the new point.
+        :type points: np.ndarray
+        :param route: Planned visiting order (indices of `points`).
+        :type route: List[int]
+        :param new_index: Index of the point to insert.
+        :type new_index: int
+        :param start: Position of the Fish machine.
+        :type start: Tuple[float, float]
+        :return: Insertion position in `route` (0: visited first).
+        :rtype: int
+        """
+        distances = self._distances(points, start)
+        nodes = [0] + [index + 1 for index in route]
+        new_node = new_index + 1
+
+        best_position, best_extra = len(route), distances[nodes[-1], new_node]          # appended at the end
+        for position in range(len(route)):
+            before, after = nodes[position], nodes[position + 1]
+            extra = distances[before, new_node] + distances[new_node, after] - distances[before, after]
+            if extra < best_extra:
+                best_position, best_extra = position, extra
+        return best_position
+
+
+    def _distances(self, points: np.ndarray, start: Tuple[float, float]) -> np.ndarray:
+        nodes = np.vstack([np.asarray(start, dtype = np.float64)[None, :], np.asarray(points, dtype = np.float64).reshape(-1, 2)])
+        return np.hypot(nodes[:, None, 0] - nodes[None, :, 0], nodes[:, None, 1] - nodes[None, :, 1])
+
+
+    @staticmethod
+    def _length(distances: np.ndarray, route) -> float:
+        previous, length = 0, 0.0
+        for node in route:
+            length += distances[previous, node]
+            previous = node
+        return length
+
+
+    @staticmethod
+    def _nearest_neighbour(distances: np.ndarray) -> List[int]:
+        remaining = set(range(1, len(distances)))
+        route, current = [], 0
+        while remaining:
+            current = min(remaining, key = lambda node: distances[current, node])
+            route.append(current)
+            remaining.remove(current)
+        return route
+
+
+    @staticmethod
+    def _two_opt(distances: np.ndarray, route: List[int]) -> List[int]:
+        """
+        Reverses route[i..j] while it shortens the open route (no edge after the last node).
+        """
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(route) - 1):
+                before = route[i - 1] if i > 0 else 0
+                for j in range(i + 1, len(route)):
+                    after = route[j + 1] if j + 1 < len(route) else None
+                    removed = distances[before, route[i]] + (distances[route[j], after] if after is not None else 0.0)
+                    added = distances[before, route[j]] + (distances[route[i], after] if after is not None else 0.0)
+                    if added < removed - 1e-12:
+                        route[i:j + 1] = reversed(route[i:j + 1])
+                        improved = True
+        return route
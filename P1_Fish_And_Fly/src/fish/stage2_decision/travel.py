@@ -0,0 +1,70 @@
+# Aim: REACHABILITY / TRAVEL COST
+# Estimated cost for the Fish machine to reach a tracked object, from its world projection (distance, lateral offset)
+# and the navigator's heading. Used by the Reasoner as a negative decision signal: cheap-to-reach targets first.
+
+import math
+import numpy as np
+from typing import List
+
+from src.common.logging import logger
+from src.common.projection.convert_camera_to_world import CameraToWorldProjector
+from src.fish.stage1_vision.entity import TrackedGarbage
+
+
+class TravelCostEstimator:
+    """
+    Travel cost = distance + lateral detour + turn, in units of the world frame's distance proxy:
+
+        - distance: forward distance proxy 'y' of the robot-centric world frame (`CameraToWorldProjector`), the value
+          the navigator compares to its reach threshold;
+        - lateral detour: |lateral 'x'| times `lateral_weight` (the 2 proxies do not share a scale);
+        - turn: angle between the bearing of the object (from its horizontal image position and the camera field of view,
+          positive to the right) and the direction the navigator is about to take (`PathNavigator.heading_offset()`),
+          times `turn_cost_per_radian`.
+
+    On a straight path an object ahead only costs its distance; when the navigator turns, objects on that side cost less.
+    """
+    def __init__(self, projector: CameraToWorldProjector, travel_cfg):
+        self.projector = projector
+        self.lateral_weight: float = travel_cfg.get("lateral_weight") or 0.0
+        self.turn_cost_per_radian: float = travel_cfg.get("turn_cost_per_radian") or 0.0
+        self.half_fov: float = math.radians(travel_cfg.get("horizontal_fov_degrees") or 90.0) / 2.0
+        self.heading_offset: float = 0.0                                    # radians, positive to the right
+
+
+    def set_heading(self, heading_offset: float) -> bool:
+        """
+        Updates the turn the navigator is about to make. Returns True if it changed (every travel cost changes).
+        """
+        if heading_offset == self.heading_offset:
+            return False
+        self.heading_offset = heading_offset
+        return True
+
+
+    def travel_costs(self, boxes: np.ndarray) -> np.ndarray:
+        """
+        Provides the travel cost of every bounding box (N, 4).
+
+        :param self: Belongs to the TravelCostEstimator class.
+        :param boxes: Bounding boxes (x1, y1, x2, y2) in original image space.
+        :type boxes: np.ndarray
+        :return: Travel cost of every box.
+        :rtype: np.ndarray
+        """
+        lateral, distance = self.projector.project_boxes(boxes)
+        bearing = lateral / self.projector.lateral_scale * self.half_fov
+        turn = np.abs((bearing - self.heading_offset + np.pi) % (2 * np.pi) - np.pi)                      # wrapped to [0, pi]
+        return distance + np.abs(lateral) * self.lateral_weight + turn * self.turn_cost_per_radian
+
+
+    def object_costs(self, tracked_objects: List[TrackedGarbage]) -> List[float]:
+        """
+        Provides the travel cost of every tracked object (1 vectorized pass).
+        """
+        if not tracked_objects:
+            return []
+        boxes = np.array([tracked_object.bbox for tracked_object in tracked_objects], dtype = np.int64)
+        costs = self.travel_costs(boxes).tolist()
+        logger.info(f"TravelCostEstimator -> object_costs(): objects: {len(costs)}, heading offset: {math.degrees(self.heading_offset):.1f} deg")
+        return costs
@@ -1,5 +1,5 @@
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 from src.common.logging import logger
 from src.common.projection.entity import WorldObject
@@ -26,6 +26,7 @@ class FishMissionPlanner:
         - Trigger navigation
         - Pause navigation when action is required
         - Resume after action feedback
+        - Collect the near targets of a locked batch in 1 navigation pause (`tick_plan()`)
 
     """
     def __init__(self, mission_cfg: Mission, bin_cfg: Bin, navigation_cfg: Navigation, cost_model_cfg: CostModel, dump_location_cfg: DumpLocation):
@@ -216,6 +217,72 @@ class FishMissionPlanner:
 
 
 
+    def tick_plan(self, action_plan: List[Tuple[ActionIntent, Optional[WorldObject]]]) -> List[ActionFeedback]:
+        """
+        Gate of Action pipeline for a locked batch (sequencing mode of the Decision module).
+
+        When the 1st target of the batch is within reach, the navigation is paused once and the targets are collected in pickup
+        order while they are within reach (the others stay locked for the next ticks). Otherwise, same as `tick()`.
+
+        :param self: Belongs to FishMissionPlanner
+        :param action_plan: (action intent, world object) of the locked targets, in pickup order.
+        :type action_plan: List[Tuple[ActionIntent, Optional[WorldObject]]]
+        :return: Action feedback of every handled target, in pickup order (1 feedback when nothing is collected).
+        :rtype: List[ActionFeedback]
+        """
+        try:
+            logger.info(f"FishMissionPlanner -> tick_plan(): STARTS, targets: {len(action_plan)}, mission phase: {self.phase}")
+
+            # A single target, or a far 1st target: 1 regular tick.
+            if len(action_plan) <= 1 or action_plan[0][1] is None or not self.navigator.target_is_near(action_plan[0][1]):
+                action_intent, world_object = action_plan[0] if action_plan else (None, None)
+                return [self.tick(action_intent, world_object)]
+
+            self.freeze_mission_data = MissionCheckpoint(
+                last_phase= self.phase,
+                last_position= self.navigator.current_position,
+                last_timestamp= time.time()
+            )
+
+            # Bin unloading before collection (same as tick()).
+            if self.bin_manager.bin_is_full():
+                self.phase = MissionPhase.UNLOADING
+
+                if self.garbage_unloader.unload_garbage(self.freeze_mission_data):
+                    logger.info(f"tick_plan(): Bin unloaded successfully")
+                    self.bin_manager.reset_bin()
+                    self.phase = self.freeze_mission_data.last_phase
+
+                else:
+                    logger.info(f"tick_plan(): Error occurred in unloading bin")
+                    self._abort_mission()
+                    return [ActionFeedback(status= ActionStatus.FAILED, track_id= None, reason= "Unloading of bin is failed")]
+
+            # 1 navigation pause for the near targets of the batch.
+            self.navigator.pause()
+            feedbacks: List[ActionFeedback] = [self._collect_target(action_plan[0][0])]
+            for action_intent, world_object in action_plan[1:]:
+                if world_object is None or not self.navigator.target_is_near(world_object):
+                    break
+                if self.bin_manager.bin_is_full() or self.phase == MissionPhase.ABORT:
+                    break
+                feedbacks.append(self._collect_target(action_intent))
+            self.navigator.resume()
+
+            if self.navigator.path_is_finished():
+                self._advance_phase()
+
+            self.tick_count += 1
+            logger.info(f"FishMissionPlanner -> tick_plan(): ENDS, tick_count: {self.tick_count}, collected in 1 pause: {len(feedbacks)}")
+            return feedbacks
+
+
+        except Exception as e:
+            logger.info(f"Error occurred in FishMissionPlanner -> tick_plan(), error: {e}")
+            raise e
+
+
+
     def _handle_target(self, action_intent: ActionIntent) -> ActionFeedback:
         """
         Handles the target, implement action execution on the identifed target(action_intent) and also handle failure.
@@ -235,28 +302,10 @@ class FishMissionPlanner:
             # 1. Pause navigation
             self.navigator.pause()
 
-            # 2. Recognize the current target.
-            self.active_target = action_intent.track_id
+            # 2-4. Collect and handle the target.
+            feedback = self._collect_target(action_intent)
 
-            # 3. Collect the target garbage.
-            feedback = self.action_pipeline.run(action_intent)
-
-            # 4. Handle the target.
-            # If target is collected successfully or after retry, reset the active target.
-            if feedback.status == ActionStatus.SUCCESS or self._handle_failure(action_intent):
-
-                # Update the feedback status to SUCCESS, if handle_failure() succeeds.
-                if feedback.status == ActionStatus.FAILED:                                          # first attempt failed but retry is success
-                    feedback.status = ActionStatus.SUCCESS                                          # refer ACTION_NOTE.md (5)
-                    feedback.reason = "Action retry is success"
-
-                # Update the bin's load by 1 collected garbage.
-                self.bin_manager.add_garbage()
-
-            # In both cases status = SUCCESS or status = FAILED, then reset the active target and resume moving forward.
-            # Reset the active target and resume moving forward.
-            self.active_target = None
-            self.retry_count = 0
+            # Resume moving forward.
             self.navigator.resume()
 
             logger.info(f"FishMisssionPlanner -> handle_target(): ENDS")
@@ -269,6 +318,41 @@ class FishMissionPlanner:
 
 
 
+    def _collect_target(self, action_intent: ActionIntent) -> ActionFeedback:
+        """
+        Collects 1 target while the navigation is paused (action execution, retries on failure, bin load).
+
+        :param self: Belongs to FishMissionPlanner
+        :param action_intent: Information of selected/locked target.
+        :type action_intent: ActionIntent
+        :return: Returns the action feedback, received from action execution(status = SUCCESS/FAILED)
+        :rtype: ActionFeedback
+        """
+        # 2. Recognize the current target.
+        self.active_target = action_intent.track_id
+
+        # 3. Collect the target garbage.
+        feedback = self.action_pipeline.run(action_intent)
+
+        # 4. Handle the target.
+        # If target is collected successfully or after retry, reset the active target.
+        if feedback.status == ActionStatus.SUCCESS or self._handle_failure(action_intent):
+
+            # Update the feedback status to SUCCESS, if handle_failure() succeeds.
+            if feedback.status == ActionStatus.FAILED:                                          # first attempt failed but retry is success
+                feedback.status = ActionStatus.SUCCESS                                          # refer ACTION_NOTE.md (5)
+                feedback.reason = "Action retry is success"
+
+            # Update the bin's load by 1 collected garbage.
+            self.bin_manager.add_garbage()
+
+        # In both cases status = SUCCESS or status = FAILED, reset the active target.
+        self.active_target = None
+        self.retry_count = 0
+        return feedback
+
+
+
     def _handle_failure(self, action_intent: ActionIntent) -> bool:
         try:
             logger.info(f"handle_failure(): STARTS")
@@ -3,7 +3,7 @@
 # This will be replaced by depth-aware and flow-aware planning in later versions.
 
 import math
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 from src.common.logging import logger
 from src.common.projection.entity import WorldObject
@@ -34,6 +34,9 @@ class PathNavigator:
         self.trajectory: list[Dict[Any, Any]] = []
         self.step_count: int = 0
 
+        self.heading: Optional[Tuple[float, float]] = None                          # unit (x, y) direction of the latest planar move (camera axis)
+        self.distance_travelled: float = 0.0                                         # every move of the mission (path steps, phase moves, unloading)
+
 
     def set_path(self, depth: float, start_position: Waypoint):
         try:
@@ -167,6 +170,9 @@ class PathNavigator:
             if distance == 0.0:
                 self.current_index += 1
                 logger.info(f"PathNavigator -> step(): Already at waypoint, advancing index.")
+                if self.path_is_finished():                                 # it was the last waypoint of the path
+                    return True
+
                 target_waypoint = self.path[self.current_index]             # set the next waypoint in the path as target.
 
                 # Calculate direction vectors (3D) again.
@@ -182,6 +188,7 @@ class PathNavigator:
 
             # 6. Check if close enough or will overshoot -> Snap to target waypoint.
             if distance <= self.reach_threshold or distance <= step_distance:
+                self._record_motion(curr_pos, target_waypoint)
                 self.current_position = target_waypoint                     # snap to waypoint first
                 self.current_index += 1                                     # update the target to next waypoint
                 logger.info(f"PathNavigator -> step(): reached target, snapping to {self.current_position}")
@@ -227,6 +234,28 @@ class PathNavigator:
             raise e
 
 
+    def heading_offset(self) -> float:
+        """
+        Turn the Fish machine has to make towards the next waypoint of the path, from its current heading (camera axis).
+
+        :param self: Belongs to the PathNavigator class.
+        :return: Signed angle in radians, positive to the right (same side as positive lateral 'x' of the world frame).
+                 0.0 when the heading is not known yet, or the machine is paused / at the end of the path.
+        :rtype: float
+        """
+        if self.heading is None or self.paused or self.current_index >= len(self.path):
+            return 0.0
+
+        target_waypoint = self.path[self.current_index]
+        dx = target_waypoint.x - self.current_position.x
+        dy = target_waypoint.y - self.current_position.y
+        if dx == 0.0 and dy == 0.0:
+            return 0.0
+
+        hx, hy = self.heading
+        return -math.atan2(hx * dy - hy * dx, hx * dx + hy * dy)                   # clockwise positive
+
+
     def target_is_near(self, world_obj: WorldObject) -> bool:
         """
         Decide if target is close enough to execute manipulation.
@@ -246,6 +275,7 @@ class PathNavigator:
             logger.info(f"PathNavigator -> move_to(): STARTS, current postion: {self.current_position}")
             # TODO: Placeholder for simulation / real control.
             
+            self._record_motion(self.current_position, target_point)
             self.current_position = target_point
 
             logger.info(f"PathNavigator -> move_to(): ENDS, final position: {self.current_position}")
@@ -258,6 +288,19 @@ class PathNavigator:
         
 
 
+    def _record_motion(self, start: Waypoint, end: Waypoint):
+        """
+        Adds the move to the distance travelled, and updates the heading when the move is not purely vertical.
+        """
+        dx, dy, dz = end.x - start.x, end.y - start.y, end.z - start.z
+        self.distance_travelled += math.sqrt(dx*dx + dy*dy + dz*dz)
+
+        planar = math.hypot(dx, dy)
+        if planar > 0.0:
+            self.heading = (dx / planar, dy / planar)
+
+
+
     # NOTE: Can be refactored into TrajectoryLogger service in future
     def _log_trajectory_point(self):
         try:
@@ -0,0 +1,192 @@
+# Aim: Benchmark the Aggregator -> Decision -> Mission planner loop on its own, by replaying recorded detections (no YOLO).
+#
+# Usage (from the project root):
+#   python -m tools.benchmark_replay --detections artifacts/replays/detections.jsonl
+#   python -m tools.benchmark_replay --sim --frames 5000 --output artifacts/benchmarks/replay.json
+#
+# Compare the JSON outputs of 2 runs to catch regressions.
+
+import os
+import json
+import time
+import logging
+import argparse
+from box import ConfigBox
+from typing import Dict, Any, Optional
+
+from src.common.logging import logger
+from src.common.config.configuration import ConfigurationManager
+from src.common.projection.world_projection import WorldProjector
+
+from src.fish.stage1_vision.aggregator import GarbageAggregator
+from src.fish.stage1_vision.io.base import VisionInput
+from src.fish.stage1_vision.io.replay import DetectionReplayInput
+from src.fish.stage1_vision.io.simulator import SimulatorInput
+
+from src.fish.stage2_decision.pipeline import DecisionPipeline
+
+from src.fish.stage3_action.entity import ActionStatus
+from src.fish.stage3_action.mission_planner import FishMissionPlanner
+
+
+
+def run_replay(vision_input: VisionInput, fish_cfg_mg: ConfigurationManager, max_frames: int, capture_fps: float = 30.0,
+               decision_cfg: Optional[ConfigBox] = None) -> Dict[str, Any]:
+    """
+    Runs the main loop (without inference and visualization) on the detections of the vision input.
+
+    :param vision_input: Source whose frame packets carry the detections.
+    :param fish_cfg_mg: Configuration manager of the Fish machine.
+    :param max_frames: Maximum number of frames to replay.
+    :param capture_fps: Capture clock of the replay: frame n is stamped n / capture_fps, so the time-based gates (idle, age, EMA)
+                        do not depend on how fast the replay runs. 0: timestamps of the packets (recorded capture times of a detections file).
+    :param decision_cfg: Decision configuration replacing the configured one (e.g. another scoring), None: configured one.
+    :return: Benchmark metrics.
+    :rtype: Dict[str, Any]
+    """
+    vision_config = fish_cfg_mg.get_vision_config()
+
+    aggregator = GarbageAggregator(vision_config.aggregation)
+    world_projector_obj = WorldProjector()
+    decision_pipeline_obj = DecisionPipeline(decision_cfg = decision_cfg or fish_cfg_mg.get_decision_config(), projector = world_projector_obj.projector)
+    mission_planner_obj = FishMissionPlanner(
+        mission_cfg = fish_cfg_mg.get_mission_config(),
+        bin_cfg = fish_cfg_mg.get_bin_manager_config(),
+        navigation_cfg = fish_cfg_mg.get_navigation_config(),
+        cost_model_cfg = fish_cfg_mg.get_cost_model_config(),
+        dump_location_cfg = fish_cfg_mg.get_dump_location_config()
+    )
+
+    stage_time = {"aggregation": 0.0, "decision": 0.0, "projection": 0.0, "action": 0.0}
+    frames = 0
+    collected = 0
+    failed = 0
+    pauses = 0                              # navigation pauses which collected (or failed) at least 1 target
+    locks = 0
+    locked_distance = 0.0                   # distance proxy of the targets at lock time (world frame), summed
+
+    vision_input.start()
+    loop_start = time.perf_counter()
+
+    while frames < max_frames and mission_planner_obj.mission_is_active():
+        packet = vision_input.read()
+        if packet is None:
+            break
+
+        detections = packet.detections or []
+        frames += 1
+
+        t0 = time.perf_counter()
+        timestamp = frames / capture_fps if capture_fps > 0 else packet.timestamp
+        active_objects = aggregator.create_garbage_aggregations(detections = detections, timestamp = timestamp)
+
+        t1 = time.perf_counter()
+        if decision_pipeline_obj.planner.sequencing:
+            action_plan, select_commands = decision_pipeline_obj.run_sequence(active_objects, heading_offset = mission_planner_obj.navigator.heading_offset())
+        else:
+            action_intent, select_command = decision_pipeline_obj.run(active_objects, heading_offset = mission_planner_obj.navigator.heading_offset())
+            action_plan = [action_intent] if action_intent else []
+            select_commands = [select_command] if select_command else []
+        action_intent = action_plan[0] if action_plan else None
+        for select_command in select_commands:
+            aggregator.apply_lifecycle_changes(select_command)
+
+        t2 = time.perf_counter()
+        world_objects, selected_world_object = world_projector_obj.transform_to_world_frame(active_objects = active_objects, action_intent = action_intent)
+        for select_command in select_commands:
+            world_object = world_objects.get(select_command.track_id)
+            if world_object is not None:
+                locks += 1
+                locked_distance += world_object.distance
+
+        t3 = time.perf_counter()
+        if mission_planner_obj.action_is_allowed():
+            targets = [(action_intent, selected_world_object)] + [(intent, world_objects.get(intent.track_id)) for intent in action_plan[1:]]
+            action_feedbacks = mission_planner_obj.tick_plan(targets)
+
+            if action_intent is not None:
+                for action_feedback in action_feedbacks:
+                    feedback_command = decision_pipeline_obj.selector.handle_action_feedback(action_feedback)
+                    if feedback_command is not None:
+                        aggregator.apply_lifecycle_changes(feedback_command)
+
+                    if action_feedback.status == ActionStatus.SUCCESS:
+                        collected += 1
+                    elif action_feedback.status == ActionStatus.FAILED:
+                        failed += 1
+                if any(action_feedback.status in (ActionStatus.SUCCESS, ActionStatus.FAILED) for action_feedback in action_feedbacks):
+                    pauses += 1
+
+        t4 = time.perf_counter()
+        stage_time["aggregation"] += t1 - t0
+        stage_time["decision"] += t2 - t1
+        stage_time["projection"] += t3 - t2
+        stage_time["action"] += t4 - t3
+
+    elapsed = time.perf_counter() - loop_start
+    vision_input.stop()
+
+    metrics = {
+        "frames": frames,
+        "elapsed_sec": round(elapsed, 4),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "stage_ms_per_frame": {stage: round(1000.0 * total / max(frames, 1), 4) for stage, total in stage_time.items()},
+        "tracks_in_memory": len(aggregator.memory),
+        "collected": collected,
+        "failed": failed,
+        "distance_travelled": round(mission_planner_obj.navigator.distance_travelled, 3),
+        "distance_per_collected": round(mission_planner_obj.navigator.distance_travelled / collected, 3) if collected else None,
+        "pauses": pauses,
+        "collected_per_pause": round((collected + failed) / pauses, 3) if pauses else None,
+        "locks": locks,
+        "locked_distance_mean": round(locked_distance / locks, 5) if locks else None,
+        "final_phase": mission_planner_obj.phase.name
+    }
+    return metrics
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Replay benchmark of the Fish decision/action loop")
+    parser.add_argument("--detections", type = str, default = None, help = "recorded per-frame detections file (JSON lines)")
+    parser.add_argument("--sim", action = "store_true", help = "use simulator ground truth instead of a recorded file")
+    parser.add_argument("--frames", type = int, default = 3000, help = "maximum frames to replay")
+    parser.add_argument("--capture-fps", type = float, default = 30.0, help = "nominal capture frame rate of the replayed frames (0: packet timestamps, recorded capture times)")
+    parser.add_argument("--output", type = str, default = None, help = "path to write the metrics as JSON")
+    parser.add_argument("--verbose", action = "store_true", help = "keep INFO logging (slows the loop down)")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+
+    fish_cfg_mg = ConfigurationManager("fish")
+    io_cfg = fish_cfg_mg.get_vision_config().io
+
+    if args.sim:
+        sim_cfg = io_cfg.sim
+        vision_input = SimulatorInput(
+            width = sim_cfg.width,
+            height = sim_cfg.height,
+            num_objects = sim_cfg.num_objects,
+            min_size = sim_cfg.min_size,
+            max_size = sim_cfg.max_size,
+            max_speed = sim_cfg.max_speed,
+            emit_detections = True,
+            seed = sim_cfg.seed,
+            class_names = fish_cfg_mg.get_garbage_class_names()
+        )
+    else:
+        vision_input = DetectionReplayInput(detections_path = args.detections or io_cfg.replay.path)
+
+    metrics = run_replay(vision_input, fish_cfg_mg, max_frames = args.frames, capture_fps = args.capture_fps)
+    print(json.dumps(metrics, indent = 2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok = True)
+        with open(args.output, "w") as f:
+            json.dump(metrics, f, indent = 2)
+
+
+
+if __name__ == "__main__":
+    main()
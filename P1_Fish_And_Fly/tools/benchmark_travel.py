@@ -0,0 +1,134 @@
+# Aim: Compare the distance travelled per collected item with and without the travel cost in the priority score,
+# on the same replayed missions (recorded detections, or simulator seeds).
+#
+# Usage (from the project root):
+#   python -m tools.benchmark_travel --sim --seeds 5 --frames 3000
+#   python -m tools.benchmark_travel --sim --objects 30 --min-size 10 --max-size 60 --output artifacts/benchmarks/travel.json
+#   python -m tools.benchmark_travel --detections artifacts/replays/detections.jsonl
+#
+# Baseline: today's scoring (`reasoner.travel_weight` = 0). Travel: the configured weight, or `--travel-weight`.
+
+import os
+import json
+import logging
+import argparse
+from box import ConfigBox
+from typing import Dict, Any, List, Callable
+
+from src.common.logging import logger
+from src.common.config.configuration import ConfigurationManager
+
+from src.fish.stage1_vision.io.base import VisionInput
+from src.fish.stage1_vision.io.replay import DetectionReplayInput
+from src.fish.stage1_vision.io.simulator import SimulatorInput
+
+from tools.benchmark_replay import run_replay
+
+
+DEFAULT_TRAVEL_WEIGHT = 10.0                # used when the configuration has no travel weight and `--travel-weight` is not given
+
+
+
+def compare_scoring(make_inputs: List[Callable[[], VisionInput]], fish_cfg_mg: ConfigurationManager, max_frames: int,
+                    travel_weight: float, capture_fps: float = 30.0) -> Dict[str, Any]:
+    """
+    Replays every mission twice: baseline scoring, then scoring with the travel cost.
+
+    :param make_inputs: 1 factory per mission, returning a new vision input (each scoring replays the same detections).
+    :param fish_cfg_mg: Configuration manager of the Fish machine.
+    :param max_frames: Maximum number of frames per mission.
+    :param travel_weight: `reasoner.travel_weight` of the travel-aware scoring.
+    :param capture_fps: Capture clock of the replay (see `run_replay()`).
+    :return: Metrics of every mission and scoring, totals and the reduction of the distance per collected item.
+    :rtype: Dict[str, Any]
+    """
+    scorings = {"baseline": 0.0, "travel": travel_weight}
+    runs: Dict[str, List[Dict[str, Any]]] = {name: [] for name in scorings}
+
+    for make_input in make_inputs:
+        for name, weight in scorings.items():
+            decision_cfg = ConfigBox(fish_cfg_mg.get_decision_config().to_dict())
+            decision_cfg.reasoner.travel_weight = weight
+            runs[name].append(run_replay(make_input(), fish_cfg_mg, max_frames = max_frames, capture_fps = capture_fps, decision_cfg = decision_cfg))
+
+    totals: Dict[str, Dict[str, Any]] = {}
+    for name, metrics in runs.items():
+        collected = sum(run["collected"] for run in metrics)
+        distance = sum(run["distance_travelled"] for run in metrics)
+        locks = sum(run["locks"] for run in metrics)
+        locked_distance = sum(run["locked_distance_mean"] * run["locks"] for run in metrics if run["locks"])
+        totals[name] = {
+            "collected": collected,
+            "distance_travelled": round(distance, 3),
+            "distance_per_collected": round(distance / collected, 4) if collected else None,
+            "locks": locks,
+            "locked_distance_mean": round(locked_distance / locks, 5) if locks else None
+        }
+
+    baseline, travel = totals["baseline"]["distance_per_collected"], totals["travel"]["distance_per_collected"]
+    reduction = round(100.0 * (baseline - travel) / baseline, 2) if baseline and travel else None
+
+    return {
+        "missions": len(make_inputs),
+        "travel_weight": travel_weight,
+        "totals": totals,
+        "distance_per_collected_reduction_pct": reduction,
+        "runs": runs
+    }
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Distance travelled per collected item, baseline vs travel-aware scoring")
+    parser.add_argument("--detections", type = str, nargs = "*", default = None, help = "recorded per-frame detections files (JSON lines), 1 mission each")
+    parser.add_argument("--sim", action = "store_true", help = "use simulator missions instead of recorded files")
+    parser.add_argument("--seeds", type = int, default = 3, help = "simulator missions (seeds from the configured seed)")
+    parser.add_argument("--objects", type = int, default = None, help = "concurrent debris blobs of the simulator (default: configured)")
+    parser.add_argument("--min-size", type = int, default = None, help = "minimum blob size in pixels (default: configured)")
+    parser.add_argument("--max-size", type = int, default = None, help = "maximum blob size in pixels (default: configured)")
+    parser.add_argument("--frames", type = int, default = 3000, help = "maximum frames per mission")
+    parser.add_argument("--capture-fps", type = float, default = 30.0, help = "nominal capture frame rate of the replayed frames (0: packet timestamps)")
+    parser.add_argument("--travel-weight", type = float, default = None, help = "travel weight of the travel-aware scoring (default: configured)")
+    parser.add_argument("--output", type = str, default = None, help = "path to write the report as JSON")
+    args = parser.parse_args()
+
+    logger.setLevel(logging.ERROR)
+
+    fish_cfg_mg = ConfigurationManager("fish")
+    io_cfg = fish_cfg_mg.get_vision_config().io
+    travel_weight = args.travel_weight or fish_cfg_mg.get_decision_config().reasoner.get("travel_weight") or DEFAULT_TRAVEL_WEIGHT
+
+    if args.sim:
+        sim_cfg = io_cfg.sim
+        class_names = fish_cfg_mg.get_garbage_class_names()
+
+        def simulator(seed: int) -> Callable[[], VisionInput]:
+            return lambda: SimulatorInput(
+                width = sim_cfg.width,
+                height = sim_cfg.height,
+                num_objects = args.objects or sim_cfg.num_objects,
+                min_size = args.min_size or sim_cfg.min_size,
+                max_size = args.max_size or sim_cfg.max_size,
+                max_speed = sim_cfg.max_speed,
+                emit_detections = True,
+                seed = seed,
+                class_names = class_names
+            )
+
+        make_inputs = [simulator(sim_cfg.seed + idx) for idx in range(args.seeds)]
+    else:
+        paths = args.detections or [io_cfg.replay.path]
+        make_inputs = [lambda path = path: DetectionReplayInput(detections_path = path) for path in paths]
+
+    report = compare_scoring(make_inputs, fish_cfg_mg, max_frames = args.frames, travel_weight = travel_weight, capture_fps = args.capture_fps)
+    print(json.dumps({name: value for name, value in report.items() if name != "runs"}, indent = 2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok = True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent = 2)
+
+
+
+if __name__ == "__main__":
+    main()